@@ -6,7 +6,7 @@ Supports multiple step types: LLM, Tool, MCP, Memory, Transform, and Conditional
 
 Module Structure:
 - mmar_carl.models: Package containing all data models (re-exports all for convenience)
-  - mmar_carl.models.enums: StepType, MemoryOperation, Language
+  - mmar_carl.models.enums: StepType, MemoryOperation, Language, SchedulerMode
   - mmar_carl.models.base: SearchStrategy, SelfCriticDecision, SelfCriticEvaluatorBase
   - mmar_carl.models.llm_client_base: LLMClientBase
   - mmar_carl.models.search: SubstringSearchStrategy, VectorSearchStrategy, ContextSearchConfig
@@ -59,6 +59,7 @@ from .models import (
     # Enums
     Language,
     MemoryOperation,
+    SchedulerMode,
     StepType,
     # Abstract base classes
     LLMClientBase,
@@ -174,6 +175,7 @@ __all__ = [
     # Enums
     "Language",
     "MemoryOperation",
+    "SchedulerMode",
     "StepType",
     # Abstract Base Classes
     "LLMClientBase",
@@ -30,6 +30,7 @@ from .models import (
     PromptTemplate,
     ReasoningContext,
     ReasoningResult,
+    SchedulerMode,
     # Step Type Enum
     StepType,
     ToolParameter,
@@ -148,6 +149,8 @@ class ReasoningChain:
         - Steps in the same batch execute in parallel with isolated memory
         - Tool registry is shared - tools MUST be stateless for thread safety
         - Memory writes are only visible to subsequent batches, not parallel siblings
+        - scheduler=SchedulerMode.STREAMING starts each step as soon as its dependencies
+          complete instead of waiting for the whole batch
 
     Note on conditional steps:
         - CONDITIONAL steps are currently informational only
@@ -167,6 +170,7 @@ class ReasoningChain:
         session_id: str | None = None,
         replan_policy: ReplanPolicy | None = None,
         metrics: Optional[list] = None,
+        scheduler: SchedulerMode | str = SchedulerMode.BATCH,
     ):
         # Normalize steps to support both legacy and new types
         self.steps: list[StepDescription | StepDescriptionBase | AnyStepDescription] = list(steps)
@@ -178,6 +182,7 @@ class ReasoningChain:
         self.trace_name = trace_name
         self.session_id = session_id
         self.replan_policy = replan_policy
+        self.scheduler = SchedulerMode(scheduler)
 
         # Set up prompt template with search configuration
         if prompt_template:
@@ -194,6 +199,7 @@ class ReasoningChain:
             enable_progress=enable_progress,
             timeout=timeout,
             replan_policy=replan_policy,
+            scheduler=self.scheduler,
         )
 
         # Store last execution result for reflection
@@ -1342,6 +1348,7 @@ LLMStepDescription(
         result = {
             "version": "1.1",  # Updated version for new step class support
             "max_workers": self.max_workers,
+            "scheduler": str(self.scheduler),
             "enable_progress": self.enable_progress,
             "metadata": self.metadata,
             "timeout": self.timeout,
@@ -1425,6 +1432,7 @@ LLMStepDescription(
         return cls(
             steps=steps,
             max_workers=data.get("max_workers", 3),
+            scheduler=data.get("scheduler", SchedulerMode.BATCH),
             enable_progress=data.get("enable_progress", False),
             metadata=data.get("metadata", {}),
             search_config=search_config,
@@ -1621,6 +1629,7 @@ class ChainBuilder:
         self.trace_name: str | None = None
         self.session_id: str | None = None
         self.replan_policy: ReplanPolicy | None = None
+        self.scheduler: SchedulerMode = SchedulerMode.BATCH
 
     def add_step(
         self,
@@ -1953,6 +1962,20 @@ class ChainBuilder:
         self.max_workers = max_workers
         return self
 
+    def with_scheduler(self, scheduler: SchedulerMode | str) -> "ChainBuilder":
+        """
+        Set DAG scheduling strategy.
+
+        Args:
+            scheduler: SchedulerMode.BATCH (level-synchronous) or SchedulerMode.STREAMING
+                       (start steps as soon as their dependencies complete)
+
+        Returns:
+            Self for method chaining
+        """
+        self.scheduler = SchedulerMode(scheduler)
+        return self
+
     def with_prompt_template(self, template: PromptTemplate) -> "ChainBuilder":
         """
         Set custom prompt template.
@@ -2081,6 +2104,7 @@ class ChainBuilder:
             trace_name=self.trace_name,
             session_id=self.session_id,
             replan_policy=self.replan_policy,
+            scheduler=self.scheduler,
         )
 
 
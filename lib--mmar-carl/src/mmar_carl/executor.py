@@ -8,6 +8,7 @@ Supports multiple step types through pluggable executors.
 import asyncio
 import copy
 import time
+import traceback
 from typing import Any, Sequence
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -18,6 +19,7 @@ from .logging_utils import (
     log_chain_start,
     log_step_complete,
     log_step_start,
+    log_warning,
 )
 from .models import (
     AnyStepDescription,
@@ -33,6 +35,7 @@ from .models import (
     ReplanRollbackTarget,
     ReplanTargetType,
     ReplanVerdict,
+    SchedulerMode,
     StepDescription,
     StepDescriptionBase,
     StepExecutionResult,
@@ -102,7 +105,9 @@ class DAGExecutor:
     Automatically parallelizes execution where dependencies allow.
 
     Note on parallel execution:
-        - Each parallel step gets an isolated copy of memory (deep copy)
+        - Each parallel step gets an isolated copy-on-write snapshot of memory;
+          only namespaces a step writes to are copied (shallowly)
+        - Values stored in memory must not be mutated in place: use memory_write
         - Tool registry is shared via shallow copy - tools MUST be stateless
         - Memory writes in parallel steps ARE merged back after batch completion
           but are NOT visible to other parallel steps in the same batch
@@ -113,19 +118,28 @@ class DAGExecutor:
         - For branching behavior, use separate chains or design dependencies accordingly
         - This is a known limitation that may be addressed in future versions
 
+    Note on scheduling:
+        - SchedulerMode.BATCH (default) runs all ready steps as one batch and waits
+          for the whole batch before looking for new ready steps
+        - SchedulerMode.STREAMING starts a step as soon as its last dependency completes,
+          keeping at most max_workers steps running; a slow step no longer stalls
+          unrelated downstream steps
+        - In streaming mode history entries are appended in completion order, and a step
+          sees memory writes of every step that completed before it was started
+        - RE-PLAN rollbacks and checkpoints behave the same in both modes; steps still
+          running when a rollback is applied are cancelled and re-scheduled
+
     Note on cancellation:
         - Call context.cancel() to request cancellation
         - Execution will stop after the current batch completes
+          (in streaming mode running steps are cancelled)
         - Partial results are returned with success=False
 
     Performance Notes:
-        For chains with large memory payloads, deep copying for parallel
-        execution can be expensive. Consider:
-
-        1. Using smaller, focused memory namespaces
-        2. Reducing max_workers if memory is huge (default is 1)
-        3. Using external state storage (Redis, etc.) for very large state
-        4. Setting max_workers=1 for memory-heavy chains to avoid deep copies
+        Memory snapshots for parallel steps are O(number of namespaces). A namespace
+        written by a step is shallow-copied on the first write, so prefer smaller,
+        focused namespaces for large payloads. RE-PLAN rollback snapshots copy
+        namespace dicts but not the stored values.
 
     Token Usage Tracking:
         Token usage is tracked per step and aggregated in ReasoningResult.
@@ -140,6 +154,7 @@ class DAGExecutor:
         enable_progress: bool = False,
         timeout: float | None = None,
         replan_policy: ReplanPolicy | None = None,
+        scheduler: SchedulerMode | str = SchedulerMode.BATCH,
     ):
         """
         Initialize the DAG executor.
@@ -149,8 +164,11 @@ class DAGExecutor:
             prompt_template: Template for generating prompts
             enable_progress: Whether to enable progress tracking
             timeout: Maximum total execution time in seconds (None = no limit)
+            replan_policy: Chain-level RE-PLAN policy (None to disable)
+            scheduler: Scheduling strategy, see SchedulerMode
         """
         self.max_workers = max_workers
+        self.scheduler = SchedulerMode(scheduler)
         self.prompt_template = prompt_template or PromptTemplate()
         self.enable_progress = enable_progress
         self.timeout = timeout
@@ -408,32 +426,7 @@ class DAGExecutor:
         context_snapshots = []
         try:
             for _ in ready_nodes:
-                snapshot = ReasoningContext(
-                    outer_context=context.outer_context,
-                    api=context.api,
-                    model=context.model,
-                    retry_max=context.retry_max,
-                    history=context.history.copy(),
-                    metadata=context.metadata.copy(),
-                    language=context.language,
-                    system_prompt=context.system_prompt,
-                    memory=copy.deepcopy(context.memory),  # Deep copy memory for isolation
-                    max_history_entries=context.max_history_entries,
-                    # Preserve callbacks
-                    on_step_start=context.on_step_start,
-                    on_step_complete=context.on_step_complete,
-                    on_progress=context.on_progress,
-                    on_llm_chunk=context.on_llm_chunk,
-                )
-                # Copy tool registry (shallow copy is fine for callables)
-                snapshot._tool_registry = context._tool_registry.copy()
-                # Copy self-critic evaluator registry
-                snapshot._self_critic_evaluator_registry = context._self_critic_evaluator_registry.copy()
-                # Copy RE-PLAN checker registry
-                snapshot._replan_checker_registry = context._replan_checker_registry.copy()
-                # Preserve cancellation state
-                snapshot._cancelled = context._cancelled
-                context_snapshots.append(snapshot)
+                context_snapshots.append(self._create_snapshot_context(context))
 
             # Execute in parallel
             tasks = [self.execute_step(node, ctx) for node, ctx in zip(ready_nodes, context_snapshots)]
@@ -445,56 +438,161 @@ class DAGExecutor:
 
             # Process results and handle exceptions
             processed_results = []
-            import traceback as _traceback
-            for i, result in enumerate(results):
+            for node, result in zip(ready_nodes, results):
                 if isinstance(result, Exception):
-                    error_tb = _traceback.format_exception(type(result), result, result.__traceback__)
-                    processed_results.append(
-                        StepExecutionResult(
-                            step_number=ready_nodes[i].step.number,
-                            step_title=ready_nodes[i].step.title,
-                            step_type=ready_nodes[i].step.step_type,
-                            result="",
-                            success=False,
-                            error_message=str(result),
-                            error_traceback="".join(error_tb),
-                        )
-                    )
+                    processed_results.append(self._exception_result(node, result))
                 else:
                     processed_results.append(result)
 
-            # Merge memory changes back from successful parallel steps
-            # Memory writes in parallel steps are now visible to subsequent batches
-            for i, result in enumerate(processed_results):
-                if result.success and context_snapshots[i].memory:
-                    for namespace, data in context_snapshots[i].memory.items():
-                        if namespace not in context.memory:
-                            context.memory[namespace] = {}
-                        # Merge the namespace data
-                        context.memory[namespace].update(data)
-
-            # Merge execution mode diagnostics from snapshot contexts.
-            context.metadata.setdefault("execution_mode_details", {})
-            for i, result in enumerate(processed_results):
-                if not result.success:
-                    continue
-                snapshot_mode_details = context_snapshots[i].metadata.get("execution_mode_details")
-                if not isinstance(snapshot_mode_details, dict):
-                    continue
-                step_key = str(result.step_number)
-                if step_key in snapshot_mode_details:
-                    context.metadata["execution_mode_details"][step_key] = snapshot_mode_details[step_key]
-
+            self._merge_snapshot_contexts(context, context_snapshots, processed_results)
             return processed_results
         finally:
-            # Close all snapshot contexts to prevent event loop issues
-            # (Each snapshot creates its own LLM clients via model_post_init)
-            # This ensures cleanup even if an exception occurs during execution
-            for snapshot in context_snapshots:
-                try:
-                    await snapshot.close()
-                except Exception:
-                    pass  # Don't fail if cleanup fails
+            await self._close_snapshot_contexts(context_snapshots)
+
+    @staticmethod
+    def _create_snapshot_context(context: ReasoningContext) -> ReasoningContext:
+        """Create an isolated copy of the context for a single step execution."""
+        snapshot = ReasoningContext(
+            outer_context=context.outer_context,
+            api=context.api,
+            model=context.model,
+            retry_max=context.retry_max,
+            history=context.history.copy(),
+            metadata=context.metadata.copy(),
+            language=context.language,
+            system_prompt=context.system_prompt,
+            max_history_entries=context.max_history_entries,
+            # Preserve callbacks
+            on_step_start=context.on_step_start,
+            on_step_complete=context.on_step_complete,
+            on_progress=context.on_progress,
+            on_llm_chunk=context.on_llm_chunk,
+        )
+        # Copy-on-write memory snapshot for isolation (no payload copying)
+        snapshot.fork_memory(context)
+        # Copy tool registry (shallow copy is fine for callables)
+        snapshot._tool_registry = context._tool_registry.copy()
+        # Copy self-critic evaluator registry
+        snapshot._self_critic_evaluator_registry = context._self_critic_evaluator_registry.copy()
+        # Copy RE-PLAN checker registry
+        snapshot._replan_checker_registry = context._replan_checker_registry.copy()
+        # Preserve cancellation state
+        snapshot._cancelled = context._cancelled
+        return snapshot
+
+    @staticmethod
+    def _exception_result(node: ExecutionNode, error: BaseException) -> StepExecutionResult:
+        """Convert an exception raised by a step into a failed step result."""
+        error_tb = traceback.format_exception(type(error), error, error.__traceback__)
+        return StepExecutionResult(
+            step_number=node.step.number,
+            step_title=node.step.title,
+            step_type=node.step.step_type,
+            result="",
+            success=False,
+            error_message=str(error),
+            error_traceback="".join(error_tb),
+        )
+
+    @staticmethod
+    def _merge_snapshot_contexts(
+        context: ReasoningContext,
+        snapshots: list[ReasoningContext],
+        results: list[StepExecutionResult],
+    ) -> None:
+        """Merge memory writes and execution mode diagnostics of successful steps back into the context."""
+        # Memory writes in parallel steps are now visible to subsequent batches
+        for snapshot, result in zip(snapshots, results):
+            if result.success:
+                context.memory_merge(snapshot)
+
+        # Merge execution mode diagnostics from snapshot contexts.
+        context.metadata.setdefault("execution_mode_details", {})
+        for snapshot, result in zip(snapshots, results):
+            if not result.success:
+                continue
+            snapshot_mode_details = snapshot.metadata.get("execution_mode_details")
+            if not isinstance(snapshot_mode_details, dict):
+                continue
+            step_key = str(result.step_number)
+            if step_key in snapshot_mode_details:
+                context.metadata["execution_mode_details"][step_key] = snapshot_mode_details[step_key]
+
+    @staticmethod
+    async def _close_snapshot_contexts(snapshots: list[ReasoningContext]) -> None:
+        # Close all snapshot contexts to prevent event loop issues
+        # (Each snapshot creates its own LLM clients via model_post_init)
+        for snapshot in snapshots:
+            try:
+                await snapshot.close()
+            except Exception:
+                pass  # Don't fail if cleanup fails
+
+    def _launch_ready_nodes(
+        self,
+        ready_nodes: list[ExecutionNode],
+        context: ReasoningContext,
+        in_flight: dict[asyncio.Task, tuple[ExecutionNode, ReasoningContext]],
+    ) -> list[ExecutionNode]:
+        """
+        Start ready nodes as background tasks while worker slots are available (streaming scheduler).
+
+        Returns:
+            list of nodes that were started
+        """
+        free_slots = max(self.max_workers, 1) - len(in_flight)
+        launched = ready_nodes[: max(free_slots, 0)]
+        for node in launched:
+            node.executing = True
+            snapshot = self._create_snapshot_context(context)
+            task = asyncio.create_task(self.execute_step(node, snapshot))
+            in_flight[task] = (node, snapshot)
+        return launched
+
+    async def _collect_completed(
+        self,
+        context: ReasoningContext,
+        in_flight: dict[asyncio.Task, tuple[ExecutionNode, ReasoningContext]],
+        timeout: float | None,
+    ) -> tuple[list[ExecutionNode], list[StepExecutionResult]]:
+        """
+        Wait until at least one in-flight node completes and merge its state (streaming scheduler).
+
+        Returns:
+            Completed nodes and their results ordered by step number; both empty on timeout
+        """
+        done, _ = await asyncio.wait(in_flight.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        completed_nodes: list[ExecutionNode] = []
+        snapshots: list[ReasoningContext] = []
+        results: list[StepExecutionResult] = []
+        for task in sorted(done, key=lambda t: in_flight[t][0].step.number):
+            node, snapshot = in_flight.pop(task)
+            node.executing = False
+            error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+            result = self._exception_result(node, error) if error is not None else task.result()
+            completed_nodes.append(node)
+            snapshots.append(snapshot)
+            results.append(result)
+
+        try:
+            self._merge_snapshot_contexts(context, snapshots, results)
+        finally:
+            await self._close_snapshot_contexts(snapshots)
+        return completed_nodes, results
+
+    async def _cancel_in_flight(self, in_flight: dict[asyncio.Task, tuple[ExecutionNode, ReasoningContext]]) -> None:
+        """Cancel running steps and discard their isolated contexts (streaming scheduler)."""
+        if not in_flight:
+            return
+        tasks = list(in_flight.keys())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        snapshots = [snapshot for _, snapshot in in_flight.values()]
+        for node, _ in in_flight.values():
+            node.executing = False
+        in_flight.clear()
+        await self._close_snapshot_contexts(snapshots)
 
     def _capture_snapshot(
         self,
@@ -509,7 +607,9 @@ class DAGExecutor:
             all_results=[result.model_copy(deep=True) for result in all_results],
             history=context.history.copy(),
             metadata=copy.deepcopy(context.metadata),
-            memory=copy.deepcopy(context.memory),
+            # Memory values are not mutated in place once shared (see ReasoningContext memory methods),
+            # so copying namespace dicts is enough to isolate the snapshot.
+            memory=context.memory_snapshot(),
         )
 
     def _restore_snapshot(
@@ -525,7 +625,7 @@ class DAGExecutor:
 
         context.history = snapshot.history.copy()
         context.metadata = copy.deepcopy(snapshot.metadata)
-        context.memory = copy.deepcopy(snapshot.memory)
+        context.memory_restore(snapshot.memory)
 
         for node in nodes:
             node.executed = node.step.number in executed_nodes
@@ -742,6 +842,12 @@ class DAGExecutor:
 
         step_by_number: dict[int, StepDescription | StepDescriptionBase | AnyStepDescription] = {step.number: step for step in steps}
 
+        # Search context queries of all steps in one batch where the strategy supports it.
+        try:
+            self.prompt_template.prefetch_context(context.outer_context, steps)
+        except Exception as e:
+            log_warning(f"Context prefetch failed, queries will be searched per step: {e}")
+
         # Build RE-PLAN checker runtimes once per chain run.
         replan_policy = self.replan_policy
         replan_checkers: list[tuple[str, Any]] = []
@@ -780,363 +886,411 @@ class DAGExecutor:
         # Ensure internal metadata containers exist.
         context.metadata.setdefault("__replan_feedback_by_step", {})
 
-        while len(executed_nodes) < len(nodes):
-            # Check for cancellation
-            if context.is_cancelled():
-                cancelled = True
-                break
-
-            # Check for timeout
-            if self.timeout is not None and (time.time() - start_time) > self.timeout:
-                raise TimeoutError(
-                    f"Chain execution timed out after {self.timeout}s. "
-                    f"Completed {len(executed_nodes)}/{len(nodes)} steps."
-                )
+        # Streaming scheduler runtime state: running step task -> (node, isolated context)
+        streaming = self.scheduler == SchedulerMode.STREAMING
+        in_flight: dict[asyncio.Task, tuple[ExecutionNode, ReasoningContext]] = {}
 
-            # Find ready nodes
-            ready_nodes = [node for node in nodes if node.step.number not in executed_nodes and node.can_execute()]
+        try:
+            while len(executed_nodes) < len(nodes):
+                # Check for cancellation
+                if context.is_cancelled():
+                    await self._cancel_in_flight(in_flight)
+                    cancelled = True
+                    break
+
+                # Check for timeout
+                if self.timeout is not None and (time.time() - start_time) > self.timeout:
+                    await self._cancel_in_flight(in_flight)
+                    raise TimeoutError(
+                        f"Chain execution timed out after {self.timeout}s. "
+                        f"Completed {len(executed_nodes)}/{len(nodes)} steps."
+                    )
 
-            if not ready_nodes:
-                # This should not happen in a valid DAG
-                remaining = [n.step.number for n in nodes if n.step.number not in executed_nodes]
-                raise ValueError(
-                    f"Deadlock detected: unable to execute steps {remaining}. "
-                    f"Check for missing dependencies or circular references."
-                )
+                # Find ready nodes
+                ready_nodes = [
+                    node
+                    for node in nodes
+                    if node.step.number not in executed_nodes and not node.executing and node.can_execute()
+                ]
 
-            batch_count += 1
-            log_batch_start(batch_count, len(ready_nodes))
-            if self.enable_progress:
-                print(f"Executing batch {batch_count} with {len(ready_nodes)} steps")
+                if not ready_nodes and not in_flight:
+                    # This should not happen in a valid DAG
+                    remaining = [n.step.number for n in nodes if n.step.number not in executed_nodes]
+                    raise ValueError(
+                        f"Deadlock detected: unable to execute steps {remaining}. "
+                        f"Check for missing dependencies or circular references."
+                    )
 
-            # Call on_progress callback if registered
-            if context.on_progress:
-                try:
-                    context.on_progress(len(executed_nodes), len(nodes))
-                except Exception:
-                    pass
+                # Call on_progress callback if registered
+                if context.on_progress:
+                    try:
+                        context.on_progress(len(executed_nodes), len(nodes))
+                    except Exception:
+                        pass
+
+                if streaming:
+                    # Capture pre-execution snapshot before starting steps (retry target).
+                    launch_snapshot = (
+                        self._capture_snapshot(
+                            executed_nodes=executed_nodes,
+                            all_results=all_results,
+                            context=context,
+                        )
+                        if replan_enabled and ready_nodes
+                        else None
+                    )
+                    launched_nodes = self._launch_ready_nodes(ready_nodes, context, in_flight)
+                    if launch_snapshot is not None:
+                        for node in launched_nodes:
+                            pre_step_snapshots[node.step.number] = launch_snapshot
+
+                    wait_timeout = None
+                    if self.timeout is not None:
+                        wait_timeout = max(0.0, self.timeout - (time.time() - start_time))
+                    completed_nodes, batch_results = await self._collect_completed(context, in_flight, wait_timeout)
+                    if not completed_nodes:
+                        # Nothing finished before the chain deadline; the timeout check above raises.
+                        continue
 
-            # Capture pre-execution snapshot for each step in this batch (retry target).
-            if replan_enabled:
-                batch_snapshot = self._capture_snapshot(
-                    executed_nodes=executed_nodes,
-                    all_results=all_results,
-                    context=context,
-                )
-                for node in ready_nodes:
-                    pre_step_snapshots[node.step.number] = batch_snapshot
-
-            # Execute batch
-            batch_results = await self.execute_batch(ready_nodes, context)
-            all_results.extend(batch_results)
-
-            # Process conditional routing decisions
-            for result in batch_results:
-                if result.success and result.step_type == StepType.CONDITIONAL:
-                    next_step = result.result_data.get("next_step")
-                    if next_step is not None:
-                        self._skip_conditional_branches(
-                            nodes, result.step_number, next_step, executed_nodes
+                    batch_count += 1
+                    log_batch_start(batch_count, len(completed_nodes))
+                    if self.enable_progress:
+                        print(f"Completed {len(completed_nodes)} steps, {len(in_flight)} still running")
+                else:
+                    batch_count += 1
+                    log_batch_start(batch_count, len(ready_nodes))
+                    if self.enable_progress:
+                        print(f"Executing batch {batch_count} with {len(ready_nodes)} steps")
+
+                    # Capture pre-execution snapshot for each step in this batch (retry target).
+                    if replan_enabled:
+                        batch_snapshot = self._capture_snapshot(
+                            executed_nodes=executed_nodes,
+                            all_results=all_results,
+                            context=context,
                         )
+                        for node in ready_nodes:
+                            pre_step_snapshots[node.step.number] = batch_snapshot
 
-            # Update history from successful results
-            # Sort by step number to maintain deterministic order
-            batch_results.sort(key=lambda r: r.step_number)
-            seen_steps = set()
-
-            for result in batch_results:
-                if result.success and result.step_number not in seen_steps:
-                    # Add the latest history entry from this step
-                    if result.updated_history:
-                        new_entry = result.updated_history[-1]
-                        # FIX: Use add_to_history() to enforce max_history_entries limit
-                        context.add_to_history(new_entry)
-                        seen_steps.add(result.step_number)
-
-            # Sync current_history with context (may have been trimmed by max_history_entries)
-            current_history = context.history.copy()
-
-            # Mark nodes as executed
-            for node in ready_nodes:
-                node.executed = True
-                executed_nodes.add(node.step.number)
+                    # Execute batch
+                    completed_nodes = ready_nodes
+                    batch_results = await self.execute_batch(ready_nodes, context)
 
-            # Store step results into metadata for downstream references ($steps.<step_number>...)
-            context.metadata.setdefault("step_results", {})
-            for result in batch_results:
-                if result.success:
-                    context.metadata["step_results"][str(result.step_number)] = {
-                        "step_number": result.step_number,
-                        "title": result.step_title,
-                        "step_type": str(result.step_type),
-                        "result": result.result,
-                        "result_data": result.result_data,
-                    }
-                    context.metadata[f"step_{result.step_number}"] = (
-                        result.result_data if result.result_data is not None else result.result
-                    )
+                all_results.extend(batch_results)
 
-            # Consume step-level RE-PLAN feedback once a step has executed.
-            feedback_map = context.metadata.get("__replan_feedback_by_step")
-            if isinstance(feedback_map, dict):
+                # Process conditional routing decisions
                 for result in batch_results:
-                    feedback_map.pop(str(result.step_number), None)
+                    if result.success and result.step_type == StepType.CONDITIONAL:
+                        next_step = result.result_data.get("next_step")
+                        if next_step is not None:
+                            self._skip_conditional_branches(
+                                nodes, result.step_number, next_step, executed_nodes
+                            )
+
+                # Update history from successful results
+                # Sort by step number to maintain deterministic order
+                batch_results.sort(key=lambda r: r.step_number)
+                seen_steps = set()
 
-            # Capture post-step checkpoint snapshots after state updates are merged.
-            if replan_enabled:
                 for result in batch_results:
-                    if not result.success:
-                        continue
-                    step = step_by_number[result.step_number]
-                    if not self._is_checkpoint_step(step):
-                        continue
-                    checkpoint_snapshot = self._capture_snapshot(
-                        executed_nodes=executed_nodes,
-                        all_results=all_results,
-                        context=context,
-                    )
-                    checkpoints.append(
-                        _CheckpointSnapshot(
-                            name=self._checkpoint_name(step),
-                            step_number=step.number,
-                            sequence=len(checkpoints) + 1,
-                            snapshot=checkpoint_snapshot,
+                    if result.success and result.step_number not in seen_steps:
+                        # Add the latest history entry from this step
+                        if result.updated_history:
+                            new_entry = result.updated_history[-1]
+                            # FIX: Use add_to_history() to enforce max_history_entries limit
+                            context.add_to_history(new_entry)
+                            seen_steps.add(result.step_number)
+
+                # Sync current_history with context (may have been trimmed by max_history_entries)
+                current_history = context.history.copy()
+
+                # Mark nodes as executed
+                for node in completed_nodes:
+                    node.executed = True
+                    executed_nodes.add(node.step.number)
+
+                # Store step results into metadata for downstream references ($steps.<step_number>...)
+                context.metadata.setdefault("step_results", {})
+                for result in batch_results:
+                    if result.success:
+                        context.metadata["step_results"][str(result.step_number)] = {
+                            "step_number": result.step_number,
+                            "title": result.step_title,
+                            "step_type": str(result.step_type),
+                            "result": result.result,
+                            "result_data": result.result_data,
+                        }
+                        context.metadata[f"step_{result.step_number}"] = (
+                            result.result_data if result.result_data is not None else result.result
                         )
-                    )
 
-            # Run chain-level RE-PLAN policy checks.
-            rollback_applied = False
-            if replan_enabled and replan_policy is not None:
-                for result in batch_results:
-                    step = step_by_number[result.step_number]
-                    if not self._should_evaluate_replan(policy=replan_policy, step=step, result=result):
-                        continue
+                # Consume step-level RE-PLAN feedback once a step has executed.
+                feedback_map = context.metadata.get("__replan_feedback_by_step")
+                if isinstance(feedback_map, dict):
+                    for result in batch_results:
+                        feedback_map.pop(str(result.step_number), None)
+
+                # Capture post-step checkpoint snapshots after state updates are merged.
+                if replan_enabled:
+                    for result in batch_results:
+                        if not result.success:
+                            continue
+                        step = step_by_number[result.step_number]
+                        if not self._is_checkpoint_step(step):
+                            continue
+                        checkpoint_snapshot = self._capture_snapshot(
+                            executed_nodes=executed_nodes,
+                            all_results=all_results,
+                            context=context,
+                        )
+                        checkpoints.append(
+                            _CheckpointSnapshot(
+                                name=self._checkpoint_name(step),
+                                step_number=step.number,
+                                sequence=len(checkpoints) + 1,
+                                snapshot=checkpoint_snapshot,
+                            )
+                        )
 
-                    budget_before = self._budget_snapshot(
-                        chain_replans=chain_replans,
-                        per_step_replans=per_step_replans,
-                        target_visits=rollback_target_visits,
-                        same_target_streak=same_target_streak,
-                    )
-                    checker_input = self._build_checker_input(
-                        result=result,
-                        step=step,
-                        context=context,
-                        checkpoints=checkpoints,
-                        budget_snapshot=budget_before,
-                        all_results=all_results,
-                    )
+                # Run chain-level RE-PLAN policy checks.
+                rollback_applied = False
+                if replan_enabled and replan_policy is not None:
+                    for result in batch_results:
+                        step = step_by_number[result.step_number]
+                        if not self._should_evaluate_replan(policy=replan_policy, step=step, result=result):
+                            continue
+
+                        budget_before = self._budget_snapshot(
+                            chain_replans=chain_replans,
+                            per_step_replans=per_step_replans,
+                            target_visits=rollback_target_visits,
+                            same_target_streak=same_target_streak,
+                        )
+                        checker_input = self._build_checker_input(
+                            result=result,
+                            step=step,
+                            context=context,
+                            checkpoints=checkpoints,
+                            budget_snapshot=budget_before,
+                            all_results=all_results,
+                        )
 
-                    votes: list[CheckerVote] = []
-                    for checker_name, checker_runtime in replan_checkers:
-                        try:
-                            verdict = await checker_runtime.evaluate(checker_input, context)
-                            if not isinstance(verdict, ReplanVerdict):
-                                raise TypeError(
-                                    f"Checker '{checker_name}' returned {type(verdict).__name__}, expected ReplanVerdict"
+                        votes: list[CheckerVote] = []
+                        for checker_name, checker_runtime in replan_checkers:
+                            try:
+                                verdict = await checker_runtime.evaluate(checker_input, context)
+                                if not isinstance(verdict, ReplanVerdict):
+                                    raise TypeError(
+                                        f"Checker '{checker_name}' returned {type(verdict).__name__}, "
+                                        "expected ReplanVerdict"
+                                    )
+                            except Exception as exc:
+                                verdict = ReplanVerdict(
+                                    action=ReplanAction.FAIL,
+                                    reason=f"RE-PLAN checker '{checker_name}' failed: {exc}",
+                                    confidence=0.0,
+                                    metadata={"checker_exception": str(exc)},
                                 )
-                        except Exception as exc:
-                            verdict = ReplanVerdict(
-                                action=ReplanAction.FAIL,
-                                reason=f"RE-PLAN checker '{checker_name}' failed: {exc}",
-                                confidence=0.0,
-                                metadata={"checker_exception": str(exc)},
-                            )
-                        votes.append(CheckerVote(checker_name=checker_name, verdict=verdict))
-
-                    aggregate = aggregate_replan_votes(votes, replan_policy.aggregation)
-                    final_action = aggregate.selected_verdict.action
-                    rollback_target = self._resolve_rollback_target(
-                        action=final_action,
-                        verdict=aggregate.selected_verdict,
-                        policy=replan_policy,
-                        current_step_number=result.step_number,
-                    )
-                    feedback = self._normalize_feedback(aggregate.selected_verdict)
-                    budget_exhausted = False
-                    event_note = ""
-
-                    if aggregate.triggered and final_action != ReplanAction.CONTINUE:
-                        projected_chain_replans = chain_replans + 1
-                        projected_step_replans = per_step_replans.get(result.step_number, 0) + 1
-
-                        rollback_target_key = rollback_target.to_key() if rollback_target else "none"
-                        projected_target_visits = rollback_target_visits.get(rollback_target_key, 0) + 1
-                        projected_streak = (
-                            same_target_streak + 1
-                            if rollback_target_key == last_rollback_target_key
-                            else 1
+                            votes.append(CheckerVote(checker_name=checker_name, verdict=verdict))
+
+                        aggregate = aggregate_replan_votes(votes, replan_policy.aggregation)
+                        final_action = aggregate.selected_verdict.action
+                        rollback_target = self._resolve_rollback_target(
+                            action=final_action,
+                            verdict=aggregate.selected_verdict,
+                            policy=replan_policy,
+                            current_step_number=result.step_number,
                         )
+                        feedback = self._normalize_feedback(aggregate.selected_verdict)
+                        budget_exhausted = False
+                        event_note = ""
+
+                        if aggregate.triggered and final_action != ReplanAction.CONTINUE:
+                            projected_chain_replans = chain_replans + 1
+                            projected_step_replans = per_step_replans.get(result.step_number, 0) + 1
+
+                            rollback_target_key = rollback_target.to_key() if rollback_target else "none"
+                            projected_target_visits = rollback_target_visits.get(rollback_target_key, 0) + 1
+                            projected_streak = (
+                                same_target_streak + 1
+                                if rollback_target_key == last_rollback_target_key
+                                else 1
+                            )
 
-                        budgets = replan_policy.budgets
-                        budget_limits: list[tuple[bool, str]] = [
-                            (
-                                budgets.max_replans_per_chain > 0
-                                and projected_chain_replans > budgets.max_replans_per_chain,
-                                f"max_replans_per_chain={budgets.max_replans_per_chain} exceeded",
-                            ),
-                            (
-                                budgets.max_replans_per_step > 0
-                                and projected_step_replans > budgets.max_replans_per_step,
+                            budgets = replan_policy.budgets
+                            budget_limits: list[tuple[bool, str]] = [
                                 (
-                                    f"max_replans_per_step={budgets.max_replans_per_step} exceeded for "
-                                    f"step {result.step_number}"
+                                    budgets.max_replans_per_chain > 0
+                                    and projected_chain_replans > budgets.max_replans_per_chain,
+                                    f"max_replans_per_chain={budgets.max_replans_per_chain} exceeded",
                                 ),
-                            ),
-                            (
-                                budgets.max_visits_per_checkpoint > 0
-                                and projected_target_visits > budgets.max_visits_per_checkpoint,
                                 (
-                                    f"max_visits_per_checkpoint={budgets.max_visits_per_checkpoint} exceeded for "
-                                    f"target {rollback_target_key}"
+                                    budgets.max_replans_per_step > 0
+                                    and projected_step_replans > budgets.max_replans_per_step,
+                                    (
+                                        f"max_replans_per_step={budgets.max_replans_per_step} exceeded for "
+                                        f"step {result.step_number}"
+                                    ),
                                 ),
-                            ),
-                            (
-                                budgets.max_same_rollback_target_repeats > 0
-                                and projected_streak > budgets.max_same_rollback_target_repeats,
                                 (
-                                    "max_same_rollback_target_repeats="
-                                    f"{budgets.max_same_rollback_target_repeats} exceeded for "
-                                    f"target {rollback_target_key}"
+                                    budgets.max_visits_per_checkpoint > 0
+                                    and projected_target_visits > budgets.max_visits_per_checkpoint,
+                                    (
+                                        f"max_visits_per_checkpoint={budgets.max_visits_per_checkpoint} exceeded for "
+                                        f"target {rollback_target_key}"
+                                    ),
                                 ),
-                            ),
-                        ]
-                        exhausted_limits = [reason for is_exhausted, reason in budget_limits if is_exhausted]
-                        if exhausted_limits:
-                            budget_exhausted = True
-                            event_note = "; ".join(exhausted_limits)
-                            if budgets.fail_on_budget_exhaustion:
-                                final_action = ReplanAction.FAIL
-                            else:
-                                final_action = ReplanAction.CONTINUE
-
-                        if final_action != ReplanAction.CONTINUE:
-                            chain_replans = projected_chain_replans
-                            per_step_replans[result.step_number] = projected_step_replans
-                            rollback_target_visits[rollback_target_key] = projected_target_visits
-                            last_rollback_target_key = rollback_target_key
-                            same_target_streak = projected_streak
-
-                        if final_action not in {ReplanAction.CONTINUE, ReplanAction.FAIL}:
-                            target_snapshot, resolved_target_key = self._resolve_target_snapshot(
-                                target=rollback_target or ReplanRollbackTarget(
-                                    target_type=ReplanTargetType.CURRENT_STEP
+                                (
+                                    budgets.max_same_rollback_target_repeats > 0
+                                    and projected_streak > budgets.max_same_rollback_target_repeats,
+                                    (
+                                        "max_same_rollback_target_repeats="
+                                        f"{budgets.max_same_rollback_target_repeats} exceeded for "
+                                        f"target {rollback_target_key}"
+                                    ),
                                 ),
-                                current_step_number=result.step_number,
-                                chain_start_snapshot=chain_start_snapshot,
-                                pre_step_snapshots=pre_step_snapshots,
-                                checkpoints=checkpoints,
-                            )
-                            if target_snapshot is None:
-                                final_action = ReplanAction.FAIL
-                                event_note = f"Unable to resolve rollback target: {resolved_target_key}"
-                            else:
-                                executed_nodes, all_results = self._restore_snapshot(
-                                    target_snapshot,
-                                    nodes=nodes,
-                                    context=context,
-                                )
-                                current_history = context.history.copy()
-                                checkpoints = [
-                                    checkpoint
-                                    for checkpoint in checkpoints
-                                    if checkpoint.step_number in executed_nodes
-                                ]
-                                pre_step_snapshots = {
-                                    step_number: snapshot
-                                    for step_number, snapshot in pre_step_snapshots.items()
-                                    if step_number in executed_nodes
-                                }
-                                rollback_applied = True
-                                if feedback:
-                                    feedback_map = context.metadata.setdefault("__replan_feedback_by_step", {})
-                                    if isinstance(feedback_map, dict):
-                                        existing = feedback_map.get(str(result.step_number), [])
-                                        if isinstance(existing, str):
-                                            existing_items = [existing]
-                                        elif isinstance(existing, list):
-                                            existing_items = [str(item) for item in existing if str(item).strip()]
-                                        else:
-                                            existing_items = []
-                                        merged: list[str] = []
-                                        for item in existing_items + feedback:
-                                            if item and item not in merged:
-                                                merged.append(item)
-                                        feedback_map[str(result.step_number)] = merged
-                                event_note = (
-                                    event_note or f"Rollback applied to target '{resolved_target_key}'."
-                                )
-
-                    aggregation_outcome = ReplanAggregationOutcome(
-                        strategy=replan_policy.aggregation.strategy,
-                        triggered=aggregate.triggered,
-                        trigger_count=aggregate.trigger_count,
-                        total_count=aggregate.total_count,
-                        mandatory_satisfied=aggregate.mandatory_satisfied,
-                        selected_checker=aggregate.selected_checker,
-                        selected_action=final_action,
-                    )
-                    replan_events.append(
-                        ReplanEvent(
-                            sequence=len(replan_events) + 1,
-                            step_number=result.step_number,
-                            step_title=result.step_title,
-                            checker_votes=[
-                                ReplanCheckerVote(
-                                    checker_name=vote.checker_name,
-                                    action=vote.verdict.action,
-                                    reason=vote.verdict.reason,
-                                    confidence=vote.verdict.confidence,
-                                    suggested_target=vote.verdict.suggested_target,
-                                    regeneration_hints=vote.verdict.regeneration_hints,
-                                    metadata=vote.verdict.metadata,
+                            ]
+                            exhausted_limits = [reason for is_exhausted, reason in budget_limits if is_exhausted]
+                            if exhausted_limits:
+                                budget_exhausted = True
+                                event_note = "; ".join(exhausted_limits)
+                                if budgets.fail_on_budget_exhaustion:
+                                    final_action = ReplanAction.FAIL
+                                else:
+                                    final_action = ReplanAction.CONTINUE
+
+                            if final_action != ReplanAction.CONTINUE:
+                                chain_replans = projected_chain_replans
+                                per_step_replans[result.step_number] = projected_step_replans
+                                rollback_target_visits[rollback_target_key] = projected_target_visits
+                                last_rollback_target_key = rollback_target_key
+                                same_target_streak = projected_streak
+
+                            if final_action not in {ReplanAction.CONTINUE, ReplanAction.FAIL}:
+                                target_snapshot, resolved_target_key = self._resolve_target_snapshot(
+                                    target=rollback_target or ReplanRollbackTarget(
+                                        target_type=ReplanTargetType.CURRENT_STEP
+                                    ),
+                                    current_step_number=result.step_number,
+                                    chain_start_snapshot=chain_start_snapshot,
+                                    pre_step_snapshots=pre_step_snapshots,
+                                    checkpoints=checkpoints,
                                 )
-                                for vote in votes
-                            ],
-                            aggregation=aggregation_outcome,
-                            final_action=final_action,
-                            rollback_target=rollback_target if final_action != ReplanAction.CONTINUE else None,
-                            feedback_passed=feedback if rollback_applied else [],
-                            triggering_checkers=aggregate.triggering_checkers,
-                            budget_usage=self._budget_snapshot(
-                                chain_replans=chain_replans,
-                                per_step_replans=per_step_replans,
-                                target_visits=rollback_target_visits,
-                                same_target_streak=same_target_streak,
-                            ),
-                            budget_exhausted=budget_exhausted,
-                            note=event_note,
+                                if target_snapshot is None:
+                                    final_action = ReplanAction.FAIL
+                                    event_note = f"Unable to resolve rollback target: {resolved_target_key}"
+                                else:
+                                    executed_nodes, all_results = self._restore_snapshot(
+                                        target_snapshot,
+                                        nodes=nodes,
+                                        context=context,
+                                    )
+                                    current_history = context.history.copy()
+                                    checkpoints = [
+                                        checkpoint
+                                        for checkpoint in checkpoints
+                                        if checkpoint.step_number in executed_nodes
+                                    ]
+                                    pre_step_snapshots = {
+                                        step_number: snapshot
+                                        for step_number, snapshot in pre_step_snapshots.items()
+                                        if step_number in executed_nodes
+                                    }
+                                    rollback_applied = True
+                                    if feedback:
+                                        feedback_map = context.metadata.setdefault("__replan_feedback_by_step", {})
+                                        if isinstance(feedback_map, dict):
+                                            existing = feedback_map.get(str(result.step_number), [])
+                                            if isinstance(existing, str):
+                                                existing_items = [existing]
+                                            elif isinstance(existing, list):
+                                                existing_items = [str(item) for item in existing if str(item).strip()]
+                                            else:
+                                                existing_items = []
+                                            merged: list[str] = []
+                                            for item in existing_items + feedback:
+                                                if item and item not in merged:
+                                                    merged.append(item)
+                                            feedback_map[str(result.step_number)] = merged
+                                    event_note = (
+                                        event_note or f"Rollback applied to target '{resolved_target_key}'."
+                                    )
+
+                        aggregation_outcome = ReplanAggregationOutcome(
+                            strategy=replan_policy.aggregation.strategy,
+                            triggered=aggregate.triggered,
+                            trigger_count=aggregate.trigger_count,
+                            total_count=aggregate.total_count,
+                            mandatory_satisfied=aggregate.mandatory_satisfied,
+                            selected_checker=aggregate.selected_checker,
+                            selected_action=final_action,
                         )
-                    )
-
-                    if final_action == ReplanAction.FAIL:
-                        replan_failed = True
-                        replan_fail_message = (
-                            event_note
-                            or aggregate.selected_verdict.reason
-                            or f"RE-PLAN policy requested fail at step {result.step_number}"
-                        )
-                        all_results.append(
-                            StepExecutionResult(
+                        replan_events.append(
+                            ReplanEvent(
+                                sequence=len(replan_events) + 1,
                                 step_number=result.step_number,
                                 step_title=result.step_title,
-                                step_type=result.step_type,
-                                result="",
-                                success=False,
-                                error_message=f"RE-PLAN failure: {replan_fail_message}",
-                                execution_time=0.0,
-                                updated_history=context.history.copy(),
+                                checker_votes=[
+                                    ReplanCheckerVote(
+                                        checker_name=vote.checker_name,
+                                        action=vote.verdict.action,
+                                        reason=vote.verdict.reason,
+                                        confidence=vote.verdict.confidence,
+                                        suggested_target=vote.verdict.suggested_target,
+                                        regeneration_hints=vote.verdict.regeneration_hints,
+                                        metadata=vote.verdict.metadata,
+                                    )
+                                    for vote in votes
+                                ],
+                                aggregation=aggregation_outcome,
+                                final_action=final_action,
+                                rollback_target=rollback_target if final_action != ReplanAction.CONTINUE else None,
+                                feedback_passed=feedback if rollback_applied else [],
+                                triggering_checkers=aggregate.triggering_checkers,
+                                budget_usage=self._budget_snapshot(
+                                    chain_replans=chain_replans,
+                                    per_step_replans=per_step_replans,
+                                    target_visits=rollback_target_visits,
+                                    same_target_streak=same_target_streak,
+                                ),
+                                budget_exhausted=budget_exhausted,
+                                note=event_note,
                             )
                         )
-                        break
 
-                    if rollback_applied:
-                        break
+                        if final_action == ReplanAction.FAIL:
+                            replan_failed = True
+                            replan_fail_message = (
+                                event_note
+                                or aggregate.selected_verdict.reason
+                                or f"RE-PLAN policy requested fail at step {result.step_number}"
+                            )
+                            all_results.append(
+                                StepExecutionResult(
+                                    step_number=result.step_number,
+                                    step_title=result.step_title,
+                                    step_type=result.step_type,
+                                    result="",
+                                    success=False,
+                                    error_message=f"RE-PLAN failure: {replan_fail_message}",
+                                    execution_time=0.0,
+                                    updated_history=context.history.copy(),
+                                )
+                            )
+                            break
+
+                        if rollback_applied:
+                            break
 
-            if replan_failed:
-                break
-            if rollback_applied:
-                continue
+                if replan_failed:
+                    break
+                if rollback_applied:
+                    # Steps still running were started from state that has just been rolled back.
+                    await self._cancel_in_flight(in_flight)
+                    continue
+        finally:
+            # RE-PLAN failure, errors and cancellation of execute() itself: steps still running are abandoned.
+            await self._cancel_in_flight(in_flight)
 
         # Calculate final stats
         total_time = time.time() - start_time
@@ -1251,6 +1405,9 @@ class DAGExecutor:
             if node.step.number in executed_nodes:
                 continue  # Already executed
 
+            if node.executing:
+                continue  # Already started by the streaming scheduler
+
             # Check if this step is reachable from the target next_step
             if not self._is_reachable_from_target(
                 node.step.number, next_step, conditional_step, step_by_number
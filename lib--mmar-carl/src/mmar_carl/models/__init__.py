@@ -3,7 +3,7 @@ Core data models for CARL reasoning system.
 
 This module re-exports all models for backward compatibility.
 For new code, prefer importing from the specific submodules:
-- mmar_carl.models.enums: StepType, MemoryOperation, Language
+- mmar_carl.models.enums: StepType, MemoryOperation, Language, SchedulerMode
 - mmar_carl.models.base: SearchStrategy, SelfCriticDecision, SelfCriticEvaluatorBase
 - mmar_carl.models.llm_client_base: SearchStrategy, SelfCriticDecision, SelfCriticEvaluatorBase
 - mmar_carl.models.search: SubstringSearchStrategy, VectorSearchStrategy, ContextSearchConfig
@@ -18,7 +18,7 @@ For new code, prefer importing from the specific submodules:
 # flake8: noqa: F401
 
 # Enums
-from .enums import Language, MemoryOperation, StepType
+from .enums import Language, MemoryOperation, SchedulerMode, StepType
 
 # Abstract base classes
 from .base import SearchStrategy, SelfCriticDecision, SelfCriticEvaluatorBase
@@ -112,6 +112,7 @@ __all__ = [
     "StepType",
     "MemoryOperation",
     "Language",
+    "SchedulerMode",
     # Abstract base classes
     "LLMClientBase",
     "SearchStrategy",
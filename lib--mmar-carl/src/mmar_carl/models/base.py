@@ -75,3 +75,20 @@ class SearchStrategy(ABC):
             String containing relevant context found for each query
         """
         pass
+
+    # Whether extract_context_many() is cheaper than one extract_context() call per query
+    batched: bool = False
+
+    def extract_context_many(self, outer_context: str, queries: List[str], **kwargs) -> List[str]:
+        """
+        Extract context for several queries at once.
+
+        Args:
+            outer_context: The full context data to search through
+            queries: List of queries to find relevant context
+            **kwargs: Additional strategy-specific parameters
+
+        Returns:
+            Relevant context for each query, in the order of queries
+        """
+        return [self.extract_context(outer_context, [query], **kwargs) for query in queries]
@@ -121,6 +121,11 @@ class ReasoningContext(BaseModel):
     # RE-PLAN checker registry
     _replan_checker_registry: dict[str, ReplanCheckerBase] = PrivateAttr(default_factory=dict)
 
+    # Memory namespaces whose dicts are shared with another context (copy-on-write, see fork_memory)
+    _memory_shared: set[str] = PrivateAttr(default_factory=set)
+    # (namespace, key) of lists created by memory_append in this context and not shared since: appended in place
+    _memory_owned_lists: set[tuple[str, str]] = PrivateAttr(default_factory=set)
+
     # === Serialization: Exclude callbacks from JSON/dict output ===
     @field_serializer(
         "on_step_start",
@@ -353,6 +358,58 @@ class ReasoningContext(BaseModel):
             self.register_self_critic_evaluator(default_name, LLMSelfCriticEvaluator())
 
     # === Memory Methods ===
+    #
+    # Memory namespaces can be shared copy-on-write between contexts (see fork_memory).
+    # Writes go through _writable_memory_namespace(), which copies a shared namespace
+    # dict before its first modification. Stored values are never mutated in place, except
+    # lists this context owns (see memory_append), so callers must treat values returned by
+    # memory_read() as read-only.
+
+    def fork_memory(self, source: "ReasoningContext") -> None:
+        """
+        Make this context's memory a copy-on-write snapshot of source's memory.
+
+        The snapshot costs O(number of namespaces): payloads are not copied. A namespace
+        is materialised (shallow-copied) in either context only when it is first written.
+        """
+        self.memory = dict(source.memory)
+        self._memory_shared = set(self.memory)
+        self._memory_owned_lists = set()
+        source._memory_shared.update(source.memory)
+        source._memory_owned_lists.clear()
+
+    def memory_snapshot(self) -> dict[str, dict[str, Any]]:
+        """Shallow copy of memory (e.g. for a checkpoint); its lists are not appended to in place afterwards."""
+        self._memory_owned_lists.clear()
+        return {namespace: dict(data) for namespace, data in self.memory.items()}
+
+    def memory_restore(self, snapshot: dict[str, dict[str, Any]]) -> None:
+        """Replace memory with a copy of a snapshot taken by memory_snapshot()."""
+        self.memory = {namespace: dict(data) for namespace, data in snapshot.items()}
+        self._memory_owned_lists.clear()
+
+    def _writable_memory_namespace(self, namespace: str) -> dict[str, Any]:
+        """Get a namespace dict that is safe to modify, materialising it if shared."""
+        if namespace in self._memory_shared:
+            self._memory_shared.discard(namespace)
+            if namespace in self.memory:
+                self.memory[namespace] = dict(self.memory[namespace])
+        if namespace not in self.memory:
+            self.memory[namespace] = {}
+        return self.memory[namespace]
+
+    def memory_merge(self, source: "ReasoningContext") -> None:
+        """
+        Merge namespaces modified in a forked context back into this context.
+
+        Namespaces the forked context never wrote to are skipped; deletions are not propagated.
+        """
+        for namespace, data in source.memory.items():
+            if namespace in source._memory_shared:
+                continue
+            self._writable_memory_namespace(namespace).update(data)
+            self._memory_owned_lists.difference_update((namespace, key) for key in data)
+        source._memory_owned_lists.clear()
 
     def memory_read(self, key: str, namespace: str = "default", default: Any = None) -> Any:
         """Read a value from memory."""
@@ -361,25 +418,26 @@ class ReasoningContext(BaseModel):
 
     def memory_write(self, key: str, value: Any, namespace: str = "default") -> None:
         """Write a value to memory."""
-        if namespace not in self.memory:
-            self.memory[namespace] = {}
-        self.memory[namespace][key] = value
+        self._writable_memory_namespace(namespace)[key] = value
+        self._memory_owned_lists.discard((namespace, key))
 
     def memory_append(self, key: str, value: Any, namespace: str = "default") -> None:
         """Append a value to a list in memory (creates list if not exists)."""
-        if namespace not in self.memory:
-            self.memory[namespace] = {}
-        if key not in self.memory[namespace]:
-            self.memory[namespace][key] = []
-        if isinstance(self.memory[namespace][key], list):
-            self.memory[namespace][key].append(value)
-        else:
+        ns = self._writable_memory_namespace(namespace)
+        current = ns.get(key, [])
+        if not isinstance(current, list):
             raise ValueError(f"Memory key '{key}' is not a list")
+        if (namespace, key) not in self._memory_owned_lists:
+            # Copy once: the list may be shared with forked contexts or snapshots, later appends go in place
+            current = ns[key] = list(current)
+            self._memory_owned_lists.add((namespace, key))
+        current.append(value)
 
     def memory_delete(self, key: str, namespace: str = "default") -> bool:
         """Delete a value from memory. Returns True if key existed."""
         if namespace in self.memory and key in self.memory[namespace]:
-            del self.memory[namespace][key]
+            del self._writable_memory_namespace(namespace)[key]
+            self._memory_owned_lists.discard((namespace, key))
             return True
         return False
 
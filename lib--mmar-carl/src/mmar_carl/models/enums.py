@@ -32,3 +32,10 @@ class Language(StrEnum):
 
     RUSSIAN = "ru"
     ENGLISH = "en"
+
+
+class SchedulerMode(StrEnum):
+    """Scheduling strategy for DAG execution."""
+
+    BATCH = "batch"  # Level-synchronous: wait for the whole ready batch before scheduling more (default)
+    STREAMING = "streaming"  # Event-driven: start a step as soon as its last dependency completes
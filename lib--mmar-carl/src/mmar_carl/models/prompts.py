@@ -2,13 +2,15 @@
 Prompt templates for CARL reasoning system.
 """
 
-from typing import Union
+import json
+from typing import Sequence, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
+from .base import SearchStrategy
 from .config import ContextQuery
 from .enums import Language
-from .search import ContextSearchConfig, SubstringSearchStrategy, VectorSearchStrategy
+from .search import ContextSearchConfig, SubstringSearchStrategy, VectorSearchStrategy, _context_digest
 from .steps import AnyStepDescription, StepDescription, StepDescriptionBase
 
 
@@ -50,10 +52,106 @@ class PromptTemplate(BaseModel):
         description="Template for including history in prompts in English",
     )
 
+    # Context prefetched by prefetch_context(): (strategy key, query text) -> extracted context
+    _prefetched_context: dict[tuple[str, str], str] = PrivateAttr(default_factory=dict)
+    _prefetched_context_digest: str | None = PrivateAttr(default=None)
+
+    def _resolve_query(self, query_item: Union[ContextQuery, str]) -> tuple[str, str, SearchStrategy]:
+        """
+        Resolve query text and search strategy for a single query.
+
+        Returns:
+            Tuple of (query text, strategy key, strategy); queries with equal strategy keys
+            are searched with identically configured strategies
+        """
+        # Handle both string queries and ContextQuery objects
+        if isinstance(query_item, str):
+            query_text = query_item
+            query_strategy = None
+            query_config = {}
+        else:  # ContextQuery object
+            query_text = query_item.query
+            query_strategy = query_item.search_strategy
+            query_config = query_item.search_config or {}
+
+        # Use query-specific strategy or default chain strategy
+        if query_strategy:
+            strategy_key = f"{query_strategy}:{json.dumps(query_config, sort_keys=True, default=str)}"
+            if query_strategy == "vector":
+                strategy: SearchStrategy = VectorSearchStrategy(
+                    embedding_model=query_config.get("embedding_model", self.search_config.embedding_model),
+                    index_type=query_config.get("index_type", "flat"),
+                    similarity_threshold=query_config.get("similarity_threshold", 0.7),
+                    max_results=query_config.get("max_results", 5),
+                    metric=query_config.get("metric", "cosine"),
+                )
+            else:  # substring
+                strategy = SubstringSearchStrategy(
+                    case_sensitive=query_config.get("case_sensitive", False),
+                    min_word_length=query_config.get("min_word_length", 2),
+                    max_matches_per_query=query_config.get("max_matches_per_query", 3),
+                )
+        else:
+            # Use default chain strategy
+            strategy_key = "default"
+            strategy = self.search_config.get_strategy()
+
+        return query_text, strategy_key, strategy
+
+    def _search_queries(
+        self, outer_context: str, queries: list[Union[ContextQuery, str]], batched_only: bool = False
+    ) -> dict[tuple[str, str], str]:
+        """
+        Search queries grouped by strategy, one extract_context_many() call per group.
+
+        Args:
+            outer_context: The full context data to search through
+            queries: Queries to search
+            batched_only: Search only queries whose strategy supports batching
+
+        Returns:
+            Mapping (strategy key, query text) -> extracted context
+        """
+        groups: dict[str, tuple[SearchStrategy, list[str]]] = {}
+        for query_item in queries:
+            query_text, strategy_key, strategy = self._resolve_query(query_item)
+            if batched_only and not strategy.batched:
+                continue
+            _, group_queries = groups.setdefault(strategy_key, (strategy, []))
+            if query_text not in group_queries:
+                group_queries.append(query_text)
+
+        found: dict[tuple[str, str], str] = {}
+        for strategy_key, (strategy, group_queries) in groups.items():
+            results = strategy.extract_context_many(outer_context, group_queries)
+            for query_text, result in zip(group_queries, results):
+                found[(strategy_key, query_text)] = result
+        return found
+
+    def prefetch_context(
+        self, outer_context: str, steps: Sequence[StepDescription | StepDescriptionBase | AnyStepDescription]
+    ) -> None:
+        """
+        Search context queries of all steps in advance, batched per strategy.
+
+        Only strategies that support batching (e.g. vector search) are prefetched: all their
+        queries across the chain are embedded in one call and searched in one index search.
+        Results are reused by extract_context_from_queries() for the same outer_context.
+        """
+        queries = [query for step in steps for query in (getattr(step, "step_context_queries", None) or [])]
+        self._prefetched_context = {}
+        self._prefetched_context_digest = None
+        if not queries:
+            return
+        self._prefetched_context = self._search_queries(outer_context, queries, batched_only=True)
+        self._prefetched_context_digest = _context_digest(outer_context)
+
     def extract_context_from_queries(self, outer_context: str, queries: list[Union[ContextQuery, str]]) -> str:
         """
         Extract relevant context from outer_context using queries (RAG-like functionality).
 
+        Queries sharing a strategy configuration are searched in a single batch.
+
         Args:
             outer_context: The full context data to search through
             queries: List of queries to find relevant context (strings or ContextQuery objects)
@@ -64,42 +162,17 @@ class PromptTemplate(BaseModel):
         if not queries:
             return "No specific context queries defined"
 
-        relevant_contexts = []
-        for query_item in queries:
-            # Handle both string queries and ContextQuery objects
-            if isinstance(query_item, str):
-                query_text = query_item
-                query_strategy = None
-                query_config = {}
-            else:  # ContextQuery object
-                query_text = query_item.query
-                query_strategy = query_item.search_strategy
-                query_config = query_item.search_config or {}
-
-            # Use query-specific strategy or default chain strategy
-            if query_strategy:
-                if query_strategy == "vector":
-                    strategy = VectorSearchStrategy(
-                        embedding_model=query_config.get("embedding_model", self.search_config.embedding_model),
-                        index_type=query_config.get("index_type", "flat"),
-                        similarity_threshold=query_config.get("similarity_threshold", 0.7),
-                        max_results=query_config.get("max_results", 5),
-                    )
-                else:  # substring
-                    strategy = SubstringSearchStrategy(
-                        case_sensitive=query_config.get("case_sensitive", False),
-                        min_word_length=query_config.get("min_word_length", 2),
-                        max_matches_per_query=query_config.get("max_matches_per_query", 3),
-                    )
-            else:
-                # Use default chain strategy
-                strategy = self.search_config.get_strategy()
-
-            # Extract context for this specific query
-            result = strategy.extract_context(outer_context, [query_text])
-            relevant_contexts.append(result)
-
-        return "\n\n".join(relevant_contexts)
+        prefetched: dict[tuple[str, str], str] = {}
+        if self._prefetched_context:
+            digest = _context_digest(outer_context)
+            if digest == self._prefetched_context_digest:
+                prefetched = self._prefetched_context
+
+        resolved = [self._resolve_query(query_item)[:2] for query_item in queries]
+        missing = [query_item for query_item, key in zip(queries, resolved) if (key[1], key[0]) not in prefetched]
+        found = {**prefetched, **self._search_queries(outer_context, missing)} if missing else prefetched
+
+        return "\n\n".join(found[(strategy_key, query_text)] for query_text, strategy_key in resolved)
 
     def format_step_prompt(
         self, step: StepDescription | StepDescriptionBase | AnyStepDescription, outer_context: str = "", language: Language = Language.RUSSIAN
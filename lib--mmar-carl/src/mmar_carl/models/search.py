@@ -2,8 +2,13 @@
 Search strategies for context extraction in CARL reasoning system.
 """
 
+import hashlib
+import heapq
+import threading
 import warnings
-from typing import Any, Dict, List, Literal, Optional, TYPE_CHECKING
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Generic, Iterable, List, Literal, NamedTuple, Optional, TypeVar, TYPE_CHECKING
 
 from pydantic import BaseModel, Field
 
@@ -13,8 +18,140 @@ if TYPE_CHECKING:
     pass
 
 
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Maximum number of distinct (context, model, index) combinations kept in the index cache
+VECTOR_INDEX_CACHE_SIZE = 16
+
+# Maximum number of distinct (context, case sensitivity) combinations kept in the token index cache
+SUBSTRING_INDEX_CACHE_SIZE = 16
+
+# Maximum number of query words whose substring matches are kept per token index
+WORD_LINES_CACHE_SIZE = 1024
+
+T = TypeVar("T")
+
+
+def _context_digest(outer_context: str) -> str:
+    """Content hash used to key per-context caches."""
+    return hashlib.sha256(outer_context.encode("utf-8")).hexdigest()
+
+
+class _ContextIndexCache(Generic[T]):
+    """Process-wide, thread-safe LRU of indexes built over outer contexts."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[tuple[Any, ...], T]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: tuple[Any, ...], build: Callable[[], T]) -> T:
+        """Get a cached index or build it (outside the lock) and cache it."""
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is not None:
+                self._items.move_to_end(key)
+                return cached
+
+        built = build()
+        with self._lock:
+            self._items[key] = built
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return built
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+@lru_cache(maxsize=None)
+def _get_text_embedding_model(model_name: str) -> Any:
+    """Load a FastEmbed model once per process (model loading dominates embedding cost)."""
+    from fastembed import TextEmbedding
+
+    return TextEmbedding(model_name)
+
+
+class _VectorIndex(NamedTuple):
+    """FAISS index built over the chunks of one outer_context."""
+
+    index: Any
+    documents: List[str]
+
+
+class _SubstringIndex:
+    """
+    Token index over the non-empty lines of one outer_context.
+
+    Query words never contain whitespace, so a word occurs in a line exactly when it occurs
+    in one of the line's whitespace-separated tokens. Lines where a word is a whole token come
+    straight from the posting lists; when they already give enough lines, only the lines before
+    the last of them are checked for the word inside longer tokens. Otherwise the distinct
+    tokens (the vocabulary) are scanned once per word, with the result kept in a bounded LRU.
+    """
+
+    def __init__(self, outer_context: str, case_sensitive: bool):
+        self.case_sensitive = case_sensitive
+        self.lines = [line.strip() for line in outer_context.split("\n") if line.strip()]
+        self._postings: dict[str, list[int]] = {}
+        for line_number, line in enumerate(self.lines):
+            for token in dict.fromkeys(self._line_text(line).split()):
+                self._postings.setdefault(token, []).append(line_number)
+        # per instance, so that it's dropped together with the index
+        self.word_lines = lru_cache(maxsize=WORD_LINES_CACHE_SIZE)(self._scan_word_lines)
+
+    def _line_text(self, line: str) -> str:
+        return line if self.case_sensitive else line.lower()
+
+    def _scan_word_lines(self, word: str) -> list[int]:
+        """Sorted numbers of lines containing word as a substring."""
+        matched: set[int] = set()
+        for token, line_numbers in self._postings.items():
+            if word in token:
+                matched.update(line_numbers)
+        return sorted(matched)
+
+    @staticmethod
+    def _first_distinct(line_numbers: Iterable[int], limit: int) -> list[int]:
+        found: list[int] = []
+        for line_number in line_numbers:
+            if not found or line_number != found[-1]:
+                found.append(line_number)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def first_matching_lines(self, words: List[str], limit: int) -> List[str]:
+        """First `limit` lines (in context order) containing any of the words."""
+        words = list(dict.fromkeys(words))
+        exact = self._first_distinct(heapq.merge(*(self._postings.get(word, []) for word in words)), limit)
+        if exact and len(exact) >= limit:
+            # any other match comes before the last exact one: check just those lines
+            prefix = (
+                line_number
+                for line_number in range(exact[-1])
+                if any(word in self._line_text(self.lines[line_number]) for word in words)
+            )
+            found = self._first_distinct(heapq.merge(prefix, exact), limit)
+        else:
+            found = self._first_distinct(heapq.merge(*(self.word_lines(word) for word in words)), limit)
+        return [self.lines[line_number] for line_number in found]
+
+
+_vector_index_cache: _ContextIndexCache[_VectorIndex] = _ContextIndexCache(VECTOR_INDEX_CACHE_SIZE)
+_substring_index_cache: _ContextIndexCache[_SubstringIndex] = _ContextIndexCache(SUBSTRING_INDEX_CACHE_SIZE)
+
+
 class SubstringSearchStrategy(SearchStrategy):
-    """Substring-based search strategy."""
+    """
+    Substring-based search strategy.
+
+    A line matches a query when any query word (of at least min_word_length characters)
+    is a substring of the line. Lines are looked up in a token index that is built once
+    per distinct outer_context and shared process-wide.
+    """
 
     def __init__(self, case_sensitive: bool = False, min_word_length: int = 2, max_matches_per_query: int = 3):
         """
@@ -29,30 +166,26 @@ class SubstringSearchStrategy(SearchStrategy):
         self.min_word_length = min_word_length
         self.max_matches_per_query = max_matches_per_query
 
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop all cached token indexes."""
+        _substring_index_cache.clear()
+
+    def _get_index(self, outer_context: str) -> _SubstringIndex:
+        key = (_context_digest(outer_context), self.case_sensitive)
+        return _substring_index_cache.get_or_build(key, lambda: _SubstringIndex(outer_context, self.case_sensitive))
+
     def extract_context(self, outer_context: str, queries: List[str], **kwargs) -> str:
         """Extract context using substring search."""
         if not queries:
             return "No specific context queries defined"
 
+        index = self._get_index(outer_context)
         relevant_contexts = []
         for query in queries:
-            lines = outer_context.split("\n")
-            relevant_lines = []
-
-            for line in lines:
-                line_content = line.strip()
-                if not line_content:
-                    continue
-
-                query_text = query if self.case_sensitive else query.lower()
-                line_text = line_content if self.case_sensitive else line_content.lower()
-
-                # Check if any word from query appears in the line
-                query_words = query_text.split()
-                if any(word in line_text for word in query_words if len(word) >= self.min_word_length):
-                    relevant_lines.append(line_content)
-                    if len(relevant_lines) >= self.max_matches_per_query:
-                        break
+            query_text = query if self.case_sensitive else query.lower()
+            query_words = [word for word in query_text.split() if len(word) >= self.min_word_length]
+            relevant_lines = index.first_matching_lines(query_words, self.max_matches_per_query)
 
             if relevant_lines:
                 context_snippet = " | ".join(relevant_lines)
@@ -64,7 +197,16 @@ class SubstringSearchStrategy(SearchStrategy):
 
 
 class VectorSearchStrategy(SearchStrategy):
-    """Vector-based search strategy using FAISS."""
+    """
+    Vector-based search strategy using FAISS.
+
+    Similarity depends on metric:
+        - "cosine" (default): embeddings are L2-normalized and searched with an inner-product
+          index, so the score is the cosine similarity and similarity_threshold is meaningful
+        - "l2": raw embeddings in an L2 index, score is 1 / (1 + euclidean distance)
+    """
+
+    batched = True
 
     def __init__(
         self,
@@ -72,6 +214,7 @@ class VectorSearchStrategy(SearchStrategy):
         index_type: Literal["flat", "ivf"] = "flat",
         similarity_threshold: float = 0.7,
         max_results: int = 5,
+        metric: Literal["cosine", "l2"] = "cosine",
     ):
         """
         Initialize vector search strategy.
@@ -81,6 +224,7 @@ class VectorSearchStrategy(SearchStrategy):
             index_type: Type of FAISS index ("flat" or "ivf")
             similarity_threshold: Minimum similarity score (0-1)
             max_results: Maximum number of results to return
+            metric: Similarity metric ("cosine" or "l2")
 
         Raises:
             ImportError: If vector-search dependencies are not installed
@@ -100,15 +244,28 @@ class VectorSearchStrategy(SearchStrategy):
         self.index_type = index_type
         self.similarity_threshold = similarity_threshold
         self.max_results = max_results
+        self.metric = metric
         self._index = None
         self._documents: List[str] = []
 
+    @property
+    def model_name(self) -> str:
+        """FastEmbed model name (bare sentence-transformers names are accepted)."""
+        if not self.embedding_model:
+            return DEFAULT_EMBEDDING_MODEL
+        if "/" not in self.embedding_model:
+            return f"sentence-transformers/{self.embedding_model}"
+        return self.embedding_model
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop all cached vector indexes (embedding models stay loaded)."""
+        _vector_index_cache.clear()
+
     def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for texts."""
         try:
-            from fastembed import TextEmbedding
-
-            model = TextEmbedding("sentence-transformers/all-MiniLM-L6-v2")
+            model = _get_text_embedding_model(self.model_name)
             # Convert generator to list and then to list of lists
             embeddings = list(model.embed(texts))
             return embeddings
@@ -135,13 +292,86 @@ class VectorSearchStrategy(SearchStrategy):
 
         return embeddings
 
+    @staticmethod
+    def _split_documents(outer_context: str) -> List[str]:
+        """Split context into non-empty line chunks for indexing."""
+        lines = outer_context.split("\n")
+        return [line.strip() for line in lines if line.strip()]
+
+    def _index_cache_key(self, outer_context: str) -> tuple[str, ...]:
+        """Cache key: content hash of outer_context plus everything that affects the index."""
+        return (_context_digest(outer_context), "lines", self.model_name, self.index_type, self.metric)
+
+    def _embed_matrix(self, texts: List[str]) -> Any:
+        """Embed texts into a float32 matrix (L2-normalized for the cosine metric)."""
+        import numpy as np
+
+        matrix = np.ascontiguousarray(np.array(self._get_embeddings(texts), dtype="float32"))
+        if self.metric == "cosine":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.maximum(norms, 1e-12)
+        return matrix
+
+    def _build_index(self, documents: List[str]) -> Any:
+        """Embed documents and build a FAISS index over them."""
+        import faiss
+
+        doc_embeddings = self._embed_matrix(documents)
+
+        dimension = doc_embeddings.shape[1]
+        faiss_metric = faiss.METRIC_INNER_PRODUCT if self.metric == "cosine" else faiss.METRIC_L2
+        if self.index_type == "flat":
+            index = faiss.IndexFlatIP(dimension) if self.metric == "cosine" else faiss.IndexFlatL2(dimension)
+        else:  # ivf
+            quantizer = faiss.IndexFlatIP(dimension) if self.metric == "cosine" else faiss.IndexFlatL2(dimension)
+            nlist = max(1, min(100, len(doc_embeddings) // 10))
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss_metric)
+            index.train(doc_embeddings)
+
+        index.add(doc_embeddings)
+        return index
+
+    def _scores_to_similarity(self, scores: Any) -> Any:
+        """Convert raw FAISS scores to similarities where higher is better."""
+        import numpy as np
+
+        if self.metric == "cosine":
+            return scores
+        # IndexFlatL2 returns squared euclidean distances
+        return 1.0 / (1.0 + np.sqrt(np.maximum(scores, 0.0)))
+
+    def _get_index(self, outer_context: str) -> _VectorIndex | None:
+        """
+        Get the index for outer_context, building it on first use.
+
+        Indexes are shared process-wide, so all steps and queries of a chain (and other
+        chains over the same document) embed the context only once.
+        """
+
+        def build() -> _VectorIndex:
+            documents = self._split_documents(outer_context)
+            return _VectorIndex(index=self._build_index(documents) if documents else None, documents=documents)
+
+        vector_index = _vector_index_cache.get_or_build(self._index_cache_key(outer_context), build)
+        return vector_index if vector_index.documents else None
+
     def extract_context(self, outer_context: str, queries: List[str], **kwargs) -> str:
         """Extract context using vector similarity search."""
         if not queries:
             return "No specific context queries defined"
+        return "\n".join(self.extract_context_many(outer_context, queries, **kwargs))
+
+    def extract_context_many(self, outer_context: str, queries: List[str], **kwargs) -> List[str]:
+        """
+        Extract context for all queries with one embedding call and one index search.
+
+        Thresholding and top-k selection are done on the whole result matrix.
+        """
+        if not queries:
+            return []
 
         try:
-            import faiss
+            import faiss  # noqa: F401
         except ImportError:
             # Fallback to substring search if FAISS not available
             warnings.warn(
@@ -151,59 +381,38 @@ class VectorSearchStrategy(SearchStrategy):
                 stacklevel=2
             )
             fallback_strategy = SubstringSearchStrategy()
-            return fallback_strategy.extract_context(outer_context, queries, **kwargs)
+            return fallback_strategy.extract_context_many(outer_context, queries, **kwargs)
 
-        # Split context into chunks for indexing
-        lines = outer_context.split("\n")
-        self._documents = [line.strip() for line in lines if line.strip()]
-
-        if not self._documents:
-            return "No context available for vector search"
+        vector_index = self._get_index(outer_context)
+        if vector_index is None:
+            return ["No context available for vector search"] * len(queries)
+        self._index = vector_index.index
+        self._documents = vector_index.documents
 
-        # Create embeddings for documents
-        doc_embeddings = self._get_embeddings(self._documents)
         import numpy as np
 
-        doc_embeddings = np.array(doc_embeddings).astype("float32")
+        # Embed all queries at once and search the whole query matrix in one call
+        query_embeddings = self._embed_matrix(queries)
+        scores, indices = self._index.search(query_embeddings, self.max_results)
 
-        # Build FAISS index
-        dimension = doc_embeddings.shape[1]
-        if self.index_type == "flat":
-            self._index = faiss.IndexFlatL2(dimension)
-        else:  # ivf
-            quantizer = faiss.IndexFlatL2(dimension)
-            self._index = faiss.IndexIVFFlat(quantizer, dimension, min(100, len(doc_embeddings) // 10))
-
-        self._index.add(doc_embeddings)
-
-        # Generate embeddings for queries and search
-        query_embeddings = self._get_embeddings(queries)
-        query_embeddings = np.array(query_embeddings).astype("float32")
+        # FAISS returns results ordered best-first; -1 marks missing results
+        similarities = self._scores_to_similarity(scores)
+        keep = (indices >= 0) & (similarities >= self.similarity_threshold)
+        # Only the 3 best passing results are shown per query
+        keep &= np.cumsum(keep, axis=1) <= 3
 
         relevant_contexts = []
-        for i, query in enumerate(queries):
-            if self.index_type == "flat":
-                distances, indices = self._index.search(query_embeddings[i : i + 1], self.max_results)
-            else:
-                distances, indices = self._index.search(query_embeddings[i : i + 1], self.max_results)
-
-            # Filter by similarity threshold
-            filtered_results = []
-            for dist, idx in zip(distances[0], indices[0]):
-                # Convert L2 distance to similarity (lower distance = higher similarity)
-                similarity = max(0.0, 1.0 - (dist / (dist + 1e-8)))
-                if similarity >= self.similarity_threshold:
-                    filtered_results.append((similarity, idx))
-
-            # Sort by similarity (descending) and format results
-            filtered_results.sort(reverse=True)
-            if filtered_results:
-                context_parts = [f"{result:.3f}:{self._documents[idx]}" for result, idx in filtered_results]
-                relevant_contexts.append(f"Query '{query}': {' | '.join(context_parts[:3])}")
+        for query, query_keep, query_similarities, query_indices in zip(queries, keep, similarities, indices):
+            if query_keep.any():
+                context_parts = [
+                    f"{similarity:.3f}:{self._documents[idx]}"
+                    for similarity, idx in zip(query_similarities[query_keep], query_indices[query_keep])
+                ]
+                relevant_contexts.append(f"Query '{query}': {' | '.join(context_parts)}")
             else:
                 relevant_contexts.append(f"Query '{query}': No similar content found")
 
-        return "\n".join(relevant_contexts)
+        return relevant_contexts
 
 
 class ContextSearchConfig(BaseModel):
@@ -223,6 +432,7 @@ class ContextSearchConfig(BaseModel):
                 index_type=vector_config.get("index_type", "flat"),
                 similarity_threshold=vector_config.get("similarity_threshold", 0.7),
                 max_results=vector_config.get("max_results", 5),
+                metric=vector_config.get("metric", "cosine"),
             )
         else:  # substring
             substring_config = self.substring_config or {}
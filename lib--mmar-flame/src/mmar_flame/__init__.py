@@ -3,11 +3,17 @@
 Flexible and Fast Moderation Engine
 """
 
-from .moderator import Moderator
+from .matcher import KeywordMatcher
+from .moderator import Moderator, ModeratorGroup
+from .normalizer import Normalizer, get_normalizer
 
 
 __version__ = "1.0.0"
 
 __all__ = [
-    "Moderator"
+    "KeywordMatcher",
+    "Moderator",
+    "ModeratorGroup",
+    "Normalizer",
+    "get_normalizer",
 ]
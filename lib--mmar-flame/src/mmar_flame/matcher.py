@@ -0,0 +1,55 @@
+from collections.abc import Collection, Iterable
+
+
+class _Node:
+    __slots__ = ("children", "labels")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.labels: set[str] = set()
+
+
+class KeywordMatcher:
+    """
+    Keywords of many labels compiled once into a trie over lemmas.
+    `match` walks the trie from every word of the text, so all n-gram sizes of all labels
+    are checked in one pass, without materializing n-gram lists.
+    """
+
+    def __init__(self) -> None:
+        self._root = _Node()
+        self._full_texts: dict[str, set[str]] = {}
+        self.max_ngram_size = 0
+        self.labels: set[str] = set()
+
+    def add(self, label: str, keywords: Iterable[str], ngrams_sizes: Collection[int], full_text: bool) -> None:
+        """
+        Keyword of `n` words matches an n-gram of the text if `n` is in `ngrams_sizes`;
+        with `full_text` any keyword also matches the whole text.
+        """
+        self.labels.add(label)
+        for keyword in keywords:
+            if full_text:
+                self._full_texts.setdefault(keyword, set()).add(label)
+            words = keyword.split(" ")
+            if len(words) not in ngrams_sizes:
+                continue
+            node = self._root
+            for word in words:
+                node = node.children.setdefault(word, _Node())
+            node.labels.add(label)
+            self.max_ngram_size = max(self.max_ngram_size, len(words))
+
+    def match(self, words: list[str], labels: Collection[str] | None = None) -> set[str]:
+        """Labels matched by `words`; stops early once all of `labels` (if given) are found."""
+        found = set(self._full_texts.get(" ".join(words), ()))
+        for start in range(len(words)):
+            if labels is not None and found.issuperset(labels):
+                break
+            node = self._root
+            for word in words[start : start + self.max_ngram_size]:
+                node = node.children.get(word)
+                if node is None:
+                    break
+                found |= node.labels
+        return found
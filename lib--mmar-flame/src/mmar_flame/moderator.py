@@ -1,30 +1,49 @@
+from collections.abc import Collection
 from pathlib import Path
 import ujson as json
-import re
-import pymorphy3
 from nltk.util import ngrams as nltk_ngrams
-from transliterate import translit
+
+from .matcher import KeywordMatcher
+from .normalizer import Normalizer, get_normalizer
+
+FULL_TEXT = -1
+MAX_NGRAM_SIZE = 3
+
+
+def _split_ngrams_sizes(ngrams_sizes: tuple[int, ...], max_ngram_size: int = MAX_NGRAM_SIZE) -> tuple[set[int], bool]:
+    """n-gram sizes and full-text flag, as `Moderator.check` treats them: sizes after one above the max are ignored."""
+    sizes = set()
+    for ngram_size in ngrams_sizes:
+        if ngram_size > max_ngram_size:
+            break
+        sizes.add(ngram_size)
+    return {size for size in sizes if size > 0}, FULL_TEXT in sizes
 
 
 class Moderator:
-    def __init__(self, *, keywords: set[str], lang: str = "ru", ngrams_sizes: tuple[int] = (-1, 1, 2, 3)) -> None:
+    def __init__(
+        self,
+        *,
+        keywords: set[str],
+        lang: str = "ru",
+        ngrams_sizes: tuple[int, ...] = (-1, 1, 2, 3),
+        normalizer: Normalizer | None = None,
+    ) -> None:
         self.keywords: set[str] = keywords
         self.lang: str = lang
-        self.morph = pymorphy3.MorphAnalyzer(lang=lang)
-        self.ngrams_sizes: tuple[int] = ngrams_sizes
+        # shared between moderators of the same language unless given explicitly
+        self.normalizer = normalizer or get_normalizer(lang)
+        self.morph = self.normalizer.morph
+        self.ngrams_sizes: tuple[int, ...] = ngrams_sizes
+        self.matcher = KeywordMatcher()
+        self.matcher.add("", keywords, *_split_ngrams_sizes(ngrams_sizes))
 
     def evaluate(self, *, text: str) -> bool:
-        n_grams = {ngram_size: self._text_to_n_grams(text, n=ngram_size) for ngram_size in self.ngrams_sizes}
-        if self.check(self.keywords, n_grams, max_ngram_size=3):
-            return True
-        return False
+        return bool(self.matcher.match(self.normalizer.normalize(text), labels={""}))
 
-    def _text_to_n_grams(self, input_text: str, n: int =-1) -> list[str]:
+    def _text_to_n_grams(self, input_text: str, n: int = -1) -> list[str]:
         """n=-1 is for full text"""
-        text = input_text.lower()
-        text = translit(text, self.lang)
-        text = re.sub(r"[^a-zа-я0-9_]+", " ", text).strip()
-        words = [self.morph.parse(word)[0].normal_form for word in text.split()]
+        words = self.normalizer.normalize(input_text)
         if n == -1:
             return [" ".join(words)]
         return [" ".join(ngram) for ngram in nltk_ngrams(words, n)]
@@ -40,4 +59,47 @@ class Moderator:
 
     @staticmethod
     def load_keywords(keywords_path: Path) -> set[str]:
-        return set(json.loads(keywords_path.read_text()))
\ No newline at end of file
+        return set(json.loads(keywords_path.read_text()))
+
+
+class ModeratorGroup:
+    """
+    Moderators under labels, evaluated together: the text is normalized once per language
+    and matched once against the keywords of all labels.
+    """
+
+    def __init__(self, moderators: dict[str, Moderator]) -> None:
+        self.moderators = moderators
+        # label groups sharing a normalizer, each with one matcher over all their keyword lists
+        self._groups: list[tuple[Normalizer, KeywordMatcher]] = []
+        for label, moderator in moderators.items():
+            matcher = next((m for n, m in self._groups if n is moderator.normalizer), None)
+            if matcher is None:
+                matcher = KeywordMatcher()
+                self._groups.append((moderator.normalizer, matcher))
+            matcher.add(label, moderator.keywords, *_split_ngrams_sizes(moderator.ngrams_sizes))
+
+    def evaluate(self, *, label: str, text: str) -> bool:
+        return self.evaluate_many(labels=[label], text=text)[label]
+
+    def evaluate_many(self, *, labels: Collection[str] | None = None, text: str) -> dict[str, bool]:
+        """Results for `labels` (all labels if None) in one pass over the text."""
+        labels = list(self.moderators) if labels is None else list(labels)
+        unknown = [label for label in labels if label not in self.moderators]
+        if unknown:
+            raise ValueError(f"Labels not found: {unknown}")
+        found: set[str] = set()
+        for normalizer, matcher in self._groups:
+            requested = matcher.labels.intersection(labels)
+            if requested:
+                found |= matcher.match(normalizer.normalize(text), labels=requested)
+        return {label: label in found for label in labels}
+
+    def evaluate_batch(self, *, labels: Collection[str] | None = None, texts: list[str]) -> dict[str, list[bool]]:
+        """`evaluate_many` over `texts`, by label; repeated texts are evaluated once."""
+        labels = list(self.moderators) if labels is None else list(labels)
+        evaluated: dict[str, dict[str, bool]] = {}
+        for text in texts:
+            if text not in evaluated:
+                evaluated[text] = self.evaluate_many(labels=labels, text=text)
+        return {label: [evaluated[text][label] for text in texts] for label in labels}
@@ -0,0 +1,37 @@
+import re
+from functools import cache, lru_cache
+
+import pymorphy3
+from transliterate import translit
+
+NON_WORD_RE = re.compile(r"[^a-zа-я0-9_]+")
+
+
+class Normalizer:
+    """
+    Text -> lemmas: lowercase, transliterate, drop punctuation, lemmatize every word.
+    Lemmas are memoized in a bounded LRU cache: user messages reuse a small vocabulary,
+    and `pymorphy3` parsing dominates moderation time.
+    """
+
+    def __init__(self, lang: str = "ru", lemma_cache_size: int = 100_000) -> None:
+        self.lang = lang
+        self.morph = pymorphy3.MorphAnalyzer(lang=lang)
+        self.lemmatize = lru_cache(maxsize=lemma_cache_size)(self._lemmatize)
+
+    def _lemmatize(self, word: str) -> str:
+        return self.morph.parse(word)[0].normal_form
+
+    def normalize(self, text: str) -> list[str]:
+        text = translit(text.lower(), self.lang)
+        text = NON_WORD_RE.sub(" ", text).strip()
+        return [self.lemmatize(word) for word in text.split()]
+
+    def cache_info(self):
+        return self.lemmatize.cache_info()
+
+
+@cache
+def get_normalizer(lang: str = "ru") -> Normalizer:
+    """Normalizer shared by all moderators of the language: one `MorphAnalyzer` and one lemma cache."""
+    return Normalizer(lang=lang)
@@ -1,4 +1,4 @@
-from mmar_mapi.file_storage import FileStorageAPI, FileStorageBasic, FileStorage, ResourceId
+from mmar_mapi.file_storage import FileStorageAPI, FileStorageBasic, FileStorage, FileUpload, ResourceId
 from mmar_mapi.models.base import Base
 from mmar_mapi.models.chat import Chat, Context, ChatMessage, AIMessage, HumanMessage, MiscMessage, make_content, Content, BaseMessage
 from mmar_mapi.models.enums import MTRSLabelEnum, DiagnosticsXMLTagEnum, MTRSXMLTagEnum, DoctorChoiceXMLTagEnum, UncertaintyXMLTagEnum
@@ -25,6 +25,7 @@ __all__ = [
     "FileStorage",
     "FileStorageBasic",
     "FileStorageAPI",
+    "FileUpload",
     "HumanMessage",
     "MTRSLabelEnum",
     "MTRSXMLTagEnum",
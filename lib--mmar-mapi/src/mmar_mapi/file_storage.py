@@ -1,14 +1,26 @@
+import asyncio
 import json
+import mmap
+import os
+import sqlite3
 import string
+import threading
+from collections.abc import Iterator
+from concurrent.futures import Executor
+from contextlib import contextmanager
 from datetime import datetime
 from hashlib import md5
 from pathlib import Path
+from uuid import uuid4
 from zipfile import ZipFile, is_zipfile
 
 ResourceId = str
 ASCII_DIGITS_SPECIAL = set(string.ascii_lowercase + string.digits + "-")
 SUFFIX_DIR = ".dir"
 SUFFIX_METADATA = ".metadata"
+INDEX_NAME = ".index.sqlite3"
+# two levels of 256 directories: millions of files leave tens of entries per directory
+SHARD_DEPTH = 2
 
 
 def _validate_exist(files_dir):
@@ -29,6 +41,112 @@ def generate_fname(content, dtype):
     return fname
 
 
+def _make_tmp_path(files_dir: Path) -> Path:
+    # hidden and unique: never taken for a resource, safe for concurrent writers
+    return files_dir / f".{uuid4().hex}.tmp"
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    tmp_path = _make_tmp_path(path.parent)
+    try:
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def _open_mmap(path: Path) -> Iterator[mmap.mmap | bytes]:
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # empty files can't be mapped
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+class MetadataIndex:
+    """
+    Metadata of all resources in one SQLite table, keyed by the content-addressed file name.
+    Uses the rollback journal (not WAL): the storage directory may be a volume shared by several containers.
+    """
+
+    def __init__(self, path: Path, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS resources "
+            "(name TEXT PRIMARY KEY, fname TEXT, update_date TEXT, size INTEGER, origin TEXT) WITHOUT ROWID"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._local.connection = connection
+        return connection
+
+    def set(self, name: str, metadata: dict) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?)",
+            (name, metadata["fname"], metadata["update_date"], metadata["size"], metadata["origin"]),
+        )
+
+    def get(self, name: str) -> dict | None:
+        row = self._connection().execute(
+            "SELECT fname, update_date, size, origin FROM resources WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        fname, update_date, size, origin = row
+        return {"fname": fname, "update_date": update_date, "size": size, "origin": origin}
+
+
+class FileUpload:
+    """
+    File uploaded in chunks: they are spooled to a temporary file inside the storage while the digest
+    is computed, and `commit` atomically renames the file to its content address.
+    """
+
+    def __init__(self, storage: "FileStorage", fname: str, origin: str | None = None):
+        self.dtype = fname.rsplit(".", 1)[-1]
+        _validate_dtype(self.dtype)
+        self.storage = storage
+        self.fname = fname
+        self.origin = origin
+        self.size = 0
+        self.resource_id: ResourceId | None = None
+        self._hash = md5()
+        self._tmp_path = _make_tmp_path(storage.files_dir)
+        self._file = self._tmp_path.open("wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> ResourceId:
+        self._file.close()
+        name = f"{self._hash.hexdigest()}.{self.dtype}"
+        self.resource_id = self.storage._store(name, self.fname, self.size, self.origin, tmp_path=self._tmp_path)
+        return self.resource_id
+
+    def abort(self) -> None:
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "FileUpload":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.resource_id is None:
+            self.abort()
+
+
 class FileStorageAPI:
     def upload_maybe(self, content: bytes | str | None, fname: str) -> ResourceId | None:
         raise NotImplementedError
@@ -45,12 +163,20 @@ class FileStorageAPI:
     async def upload_async(self, content: bytes | str, fname: str) -> ResourceId:
         raise NotImplementedError
 
+    def open_upload(self, fname: str, origin: str | None = None) -> FileUpload:
+        """Upload without holding the content in memory: `write` chunks, then `commit` (or `abort`)."""
+        raise NotImplementedError
+
     def upload_dir(self, resource_ids: list[ResourceId], dir_name: str="") -> ResourceId:
         raise NotImplementedError
 
     def download(self, resource_id: ResourceId) -> bytes:
         raise NotImplementedError
 
+    def open_mmap(self, resource_id: ResourceId):
+        """Context manager with a read-only memory map of the file: large blobs are read without copying."""
+        raise NotImplementedError
+
     async def download_async(self, resource_id: ResourceId) -> bytes:
         raise NotImplementedError
 
@@ -89,6 +215,9 @@ class FileStorageBasic(FileStorageAPI):
     async def download_async(self, resource_id: ResourceId) -> bytes:
         return self.download(resource_id)
 
+    def open_mmap(self, resource_id: ResourceId):
+        return _open_mmap(Path(resource_id))
+
     def download_text(self, resource_id: ResourceId) -> str:
         return Path(resource_id).read_text(encoding="utf-8")
 
@@ -124,14 +253,61 @@ class FileStorageBasic(FileStorageAPI):
 
 
 class FileStorage(FileStorageAPI):
-    def __init__(self, files_dir):
+    """
+    Content-addressed storage: files are named by the md5 of their content and placed in
+    hash-prefix shard directories (`ab/cd/abcd....pdf`), metadata is kept in a SQLite index.
+    Identical content is stored once, files appear only through atomic renames.
+    Resources of the former flat layout (with `.metadata` sidecars) are still found and read.
+    """
+
+    def __init__(self, files_dir, shard_depth: int = SHARD_DEPTH, executor: Executor | None = None):
         self.files_dir = Path(files_dir)
         self.files_dir.mkdir(exist_ok=True, parents=True)
         _validate_exist(self.files_dir)
-
-    def _generate_fname_path(self, content: bytes, dtype: str):
-        fpath = self.files_dir / generate_fname(content, dtype)
-        return fpath
+        self.shard_depth = shard_depth
+        # async methods run the blocking I/O here (the loop's default executor if None)
+        self.executor = executor
+        self.index = MetadataIndex(self.files_dir / INDEX_NAME)
+
+    async def _run_async(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def _shard_path(self, name: str) -> Path:
+        shards = [name[2 * level : 2 * level + 2] for level in range(self.shard_depth)]
+        return self.files_dir.joinpath(*shards, name)
+
+    def _find_existing(self, name: str) -> Path | None:
+        for fpath in (self._shard_path(name), self.files_dir / name):
+            if fpath.exists():
+                return fpath
+        return None
+
+    def _store(
+        self,
+        name: str,
+        fname: str,
+        size: int,
+        origin: str | None,
+        *,
+        content: bytes | None = None,
+        tmp_path: Path | None = None,
+    ) -> ResourceId:
+        """Put `content` (or the written `tmp_path`) under `name` unless it's already stored, and index the metadata."""
+        fpath = self._find_existing(name)
+        if fpath is not None:
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+        else:
+            fpath = self._shard_path(name)
+            fpath.parent.mkdir(parents=True, exist_ok=True)
+            # readers never see a partially written file
+            if tmp_path is not None:
+                os.replace(tmp_path, fpath)
+            else:
+                _write_atomic(fpath, content)
+        update_date = f"{datetime.now():%Y-%m-%d--%H-%M-%S}"
+        self.index.set(name, {"fname": fname, "update_date": update_date, "size": size, "origin": origin})
+        return str(fpath)
 
     def upload_maybe(self, content: bytes | str | None, fname: str) -> ResourceId | None:
         if not content:
@@ -145,17 +321,16 @@ class FileStorage(FileStorageAPI):
 
         dtype = fname.rsplit(".", 1)[-1]
         _validate_dtype(dtype)
-        fpath = self._generate_fname_path(content, dtype)
-        fpath.write_bytes(content)
-
-        fpath_md = fpath.with_suffix(SUFFIX_METADATA)
-        update_date = f"{datetime.now():%Y-%m-%d--%H-%M-%S}"
-        metadata = {"fname": fname, "update_date": update_date, "size": len(content), "origin": origin}
-        fpath_md.write_text(json.dumps(metadata, ensure_ascii=False))
+        return self._store(generate_fname(content, dtype), fname, len(content), origin, content=content)
 
-        return str(fpath)
+    def open_upload(self, fname: str, origin: str | None = None) -> FileUpload:
+        return FileUpload(self, fname, origin)
 
     def get_metadata(self, resource_id: ResourceId) -> dict | None:
+        metadata = self.index.get(Path(resource_id).name)
+        if metadata is not None:
+            return metadata
+        # resources uploaded before the index
         metadata_path = Path(resource_id).with_suffix(SUFFIX_METADATA)
         if not metadata_path.exists():
             return None
@@ -168,7 +343,7 @@ class FileStorage(FileStorageAPI):
         return metadata.get("fname")
 
     async def upload_async(self, content: bytes | str, fname: str) -> ResourceId:
-        return self.upload(content, fname)
+        return await self._run_async(self.upload, content, fname)
 
     def upload_dir(self, resource_ids: list[ResourceId], dir_name: str="") -> ResourceId:
         content = "\n".join(resource_ids)
@@ -179,7 +354,10 @@ class FileStorage(FileStorageAPI):
         return Path(resource_id).read_bytes()
 
     async def download_async(self, resource_id: ResourceId) -> bytes:
-        return self.download(resource_id)
+        return await self._run_async(self.download, resource_id)
+
+    def open_mmap(self, resource_id: ResourceId):
+        return _open_mmap(Path(resource_id))
 
     def download_text(self, resource_id: ResourceId) -> str:
         return Path(resource_id).read_text(encoding="utf-8")
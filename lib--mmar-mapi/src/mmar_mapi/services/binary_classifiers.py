@@ -4,3 +4,7 @@ class BinaryClassifiersAPI:
 
     def evaluate(self, *, classifier: str | None = None, text: str) -> bool:
         raise NotImplementedError
+
+    def evaluate_batch(self, *, classifiers: list[str], texts: list[str]) -> dict[str, list[bool]]:
+        """Every classifier over every text in one call: `result[classifier][i]` is the label of `texts[i]`."""
+        raise NotImplementedError
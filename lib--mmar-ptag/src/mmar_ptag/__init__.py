@@ -1,2 +1,5 @@
 from .ptag_framework import ptag_client, ptag_attach
-from .io_grpc import grpc_server, deploy_server
+from .ptag_framework_aio import ptag_client_aio, ptag_attach_aio
+from .io_grpc import grpc_server, deploy_server, grpc_server_aio, deploy_server_aio, serve_aio
+from .ptag_cache import ptag_cached, PTAGCacheConfig
+from .ptag_channel_pool import ChannelPoolConfig
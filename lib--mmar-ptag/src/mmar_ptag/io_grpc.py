@@ -1,3 +1,4 @@
+import asyncio
 from concurrent import futures
 from types import SimpleNamespace
 from typing import Any, Callable, Protocol, Type
@@ -6,7 +7,10 @@ import grpc
 from loguru import logger
 
 from mmar_mimpl import init_logger
+from mmar_ptag.ptag_cache import PTAGCacheConfig
+from mmar_ptag.ptag_channel_pool import ChannelPoolConfig
 from mmar_ptag.ptag_framework import ptag_attach
+from mmar_ptag.ptag_framework_aio import ptag_attach_aio
 
 
 class ConfigLogger(Protocol):
@@ -23,17 +27,19 @@ class ConfigServer(Protocol):
 
 
 def grpc_server(*, port: int, max_workers: int) -> grpc.Server:
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers), options=ChannelPoolConfig().server_options()
+    )
     server.add_insecure_port(f"[::]:{port}")
     return server
 
 
-def deploy_server(
+def _prepare_deployment(
     config_server: ConfigServer | Callable[[], ConfigServer],
     service: Any | Callable[..., Any] | Type,
-    config: Any | Callable[[], Any] | None = None,
-    initialize_logger: bool = True,
-) -> None:
+    config: Any | Callable[[], Any] | None,
+    initialize_logger: bool,
+) -> tuple[ConfigServer, Any]:
     # normalize config_server and config if they are callables
     if callable(config_server):
         config_server = config_server()
@@ -52,9 +58,56 @@ def deploy_server(
             service = service(config)
         except TypeError:
             service = service()
+    return config_server, service
+
+
+def deploy_server(
+    config_server: ConfigServer | Callable[[], ConfigServer],
+    service: Any | Callable[..., Any] | Type,
+    config: Any | Callable[[], Any] | None = None,
+    initialize_logger: bool = True,
+    caches: dict[str, PTAGCacheConfig | None] | None = None,
+) -> None:
+    config_server, service = _prepare_deployment(config_server, service, config, initialize_logger)
 
     server = grpc_server(port=config_server.port, max_workers=config_server.max_workers)
-    ptag_attach(server, service)
+    ptag_attach(server, service, caches=caches)
     server.start()
     logger.info(f"Server started, listening on {config_server.port}")
     server.wait_for_termination()
+
+
+def grpc_server_aio(*, port: int) -> grpc.aio.Server:
+    server = grpc.aio.server(options=ChannelPoolConfig().server_options())
+    server.add_insecure_port(f"[::]:{port}")
+    return server
+
+
+async def serve_aio(
+    config_server: ConfigServer, service: Any, caches: dict[str, PTAGCacheConfig | None] | None = None
+) -> None:
+    """
+    Run an already instantiated service on a grpc.aio server until termination.
+    `async def` methods are awaited natively, sync ones run in a pool of `max_workers` threads.
+    """
+    executor = futures.ThreadPoolExecutor(max_workers=config_server.max_workers)
+    server = grpc_server_aio(port=config_server.port)
+    ptag_attach_aio(server, service, executor=executor, caches=caches)
+    await server.start()
+    logger.info(f"Server (aio) started, listening on {config_server.port}")
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(grace=None)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def deploy_server_aio(
+    config_server: ConfigServer | Callable[[], ConfigServer],
+    service: Any | Callable[..., Any] | Type,
+    config: Any | Callable[[], Any] | None = None,
+    initialize_logger: bool = True,
+    caches: dict[str, PTAGCacheConfig | None] | None = None,
+) -> None:
+    config_server, service = _prepare_deployment(config_server, service, config, initialize_logger)
+    asyncio.run(serve_aio(config_server, service, caches=caches))
@@ -0,0 +1,322 @@
+"""Server-side result cache for PTAG methods: single-flight, byte-bounded LRU with TTL, optional shared disk.
+
+Caching is declared per method, usually on the service interface:
+
+    class DocumentExtractorAPI:
+        @ptag_cached(max_bytes=256 * 2**20, ttl=3600)
+        def extract(self, *, resource_id: ResourceId) -> ResourceId | None: ...
+
+and can be overridden when attaching the service: `ptag_attach(server, service, caches={"extract": None})`.
+
+Entries are keyed by the method name and the validated arguments re-serialized to JSON
+(so the key doesn't depend on the codec or on the `trace_id`), values are JSON-encoded results.
+Errors are never cached.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from mmar_mimpl import TRACE_ID
+from mmar_utils.utils_inspect import FuncMetadata
+
+PTAG_CACHE_ATTR = "__ptag_cache__"
+NULL_JSON = b"null"
+
+
+@dataclass(frozen=True)
+class PTAGCacheConfig:
+    max_bytes: int = 64 * 2**20
+    ttl: float | None = None
+    # directory shared between workers; entries are written with atomic renames
+    disk_dir: str | None = None
+    max_disk_bytes: int | None = None
+    single_flight: bool = True
+    # `None` results often mean "failed, try later" (e.g. `-> ResourceId | None`)
+    cache_none: bool = True
+
+
+def ptag_cached(
+    *,
+    max_bytes: int = PTAGCacheConfig.max_bytes,
+    ttl: float | None = None,
+    disk_dir: str | None = None,
+    max_disk_bytes: int | None = None,
+    single_flight: bool = True,
+    cache_none: bool = True,
+):
+    """Mark a service (interface) method as cached on the PTAG server side; the method itself is unchanged."""
+    config = PTAGCacheConfig(
+        max_bytes=max_bytes,
+        ttl=ttl,
+        disk_dir=disk_dir,
+        max_disk_bytes=max_disk_bytes,
+        single_flight=single_flight,
+        cache_none=cache_none,
+    )
+
+    def decorator(func):
+        setattr(func, PTAG_CACHE_ATTR, config)
+        return func
+
+    return decorator
+
+
+def find_cache_configs(service_object, names) -> dict[str, PTAGCacheConfig]:
+    """Collect `@ptag_cached` configs of methods, looking through the whole class hierarchy (interfaces included)."""
+    configs = {}
+    for name in names:
+        for cls in type(service_object).__mro__:
+            config = getattr(cls.__dict__.get(name), PTAG_CACHE_ATTR, None)
+            if config is not None:
+                configs[name] = config
+                break
+    return configs
+
+
+def make_cache_key(func_metadata: FuncMetadata, input_kwargs: dict) -> str:
+    args = tuple("" if am.name == TRACE_ID else input_kwargs[am.name] for am in func_metadata.args_metadata)
+    args_bytes = func_metadata.args_adapter.dump_json(args)
+    return hashlib.sha256(func_metadata.name.encode() + b"\0" + args_bytes).hexdigest()
+
+
+class MemoryResultCache:
+    """LRU over encoded results, bounded by the total size of values."""
+
+    def __init__(self, max_bytes: int, ttl: float | None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (time.monotonic(), value)
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _pop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self.size -= len(value)
+
+
+class DiskResultCache:
+    """Files named by key; shared by workers on the same host, expired by mtime, trimmed by oldest access."""
+
+    def __init__(self, directory: str | Path, ttl: float | None, max_bytes: int | None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._size = self._scan_size()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _entries(self):
+        # skips temporary files being written (".<key>.<pid>.<tid>.tmp")
+        return (path for path in self.directory.glob("*/[!.]*"))
+
+    def _scan_size(self) -> int:
+        return sum(path.stat().st_size for path in self._entries() if path.is_file())
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            value = path.read_bytes()
+            # access time for eviction; mtime stays the creation time for ttl
+            os.utime(path, (time.time(), path.stat().st_mtime))
+            return value
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(value)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += len(value)
+            if self.max_bytes is not None and self._size > self.max_bytes:
+                self._trim()
+
+    def _trim(self) -> None:
+        # other workers write to the same directory: recount instead of trusting the local counter
+        files = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_atime, stat.st_size, path))
+        self._size = sum(size for _, size, _ in files)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in sorted(files):
+            if self._size <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+            self.evictions += 1
+
+
+class MethodCache:
+    """Cache of one method: memory LRU in front of an optional disk cache, with single-flight computation."""
+
+    def __init__(self, name: str, config: PTAGCacheConfig):
+        self.name = name
+        self.config = config
+        self.memory = MemoryResultCache(config.max_bytes, config.ttl)
+        self.disk = DiskResultCache(Path(config.disk_dir) / name, config.ttl, config.max_disk_bytes) if config.disk_dir else None
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._inflight_aio: dict[str, asyncio.Future] = {}
+
+        # Metrics
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self.memory),
+            "bytes": self.memory.size,
+            "evictions": self.memory.evictions + (self.disk.evictions if self.disk else 0),
+        }
+
+    def _lookup_memory(self, key: str) -> bytes | None:
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+        return value
+
+    def _lookup_disk(self, key: str) -> bytes | None:
+        value = self.disk.get(key) if self.disk else None
+        if value is not None:
+            self.hits += 1
+            self.disk_hits += 1
+            self.memory.set(key, value)
+        return value
+
+    def _store(self, key: str, value: bytes) -> None:
+        if value == NULL_JSON and not self.config.cache_none:
+            return
+        self.memory.set(key, value)
+        if self.disk:
+            self.disk.set(key, value)
+
+    def _log_miss(self, key: str) -> None:
+        logger.debug(f"PTAG cache `{self.name}`: miss {key[:12]}, {self.metrics()}")
+
+    def get_or_compute(self, key: str, compute: Callable[[], bytes]) -> bytes:
+        """Cached value or `compute()`; concurrent calls with the same key wait for a single computation."""
+        with self._lock:
+            value = self._lookup_memory(key)
+            if value is not None:
+                return value
+            future = self._inflight.get(key) if self.config.single_flight else None
+            if future is not None:
+                self.coalesced += 1
+            elif self.config.single_flight:
+                self._inflight[key] = leader = Future()
+        if future is not None:
+            return future.result()
+
+        try:
+            value = self._lookup_disk(key)
+            if value is None:
+                self.misses += 1
+                self._log_miss(key)
+                value = compute()
+                self._store(key, value)
+        except BaseException as ex:
+            if self.config.single_flight:
+                leader.set_exception(ex)
+            raise
+        finally:
+            if self.config.single_flight:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        if self.config.single_flight:
+            leader.set_result(value)
+        return value
+
+    async def get_or_compute_aio(self, key: str, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Same as `get_or_compute` for grpc.aio servers; disk access runs in a thread."""
+        value = self._lookup_memory(key)
+        if value is not None:
+            return value
+        future = self._inflight_aio.get(key) if self.config.single_flight else None
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+        if self.config.single_flight:
+            self._inflight_aio[key] = leader = asyncio.get_running_loop().create_future()
+
+        try:
+            value = await asyncio.to_thread(self._lookup_disk, key) if self.disk else None
+            if value is None:
+                self.misses += 1
+                self._log_miss(key)
+                value = await compute()
+                if self.disk:
+                    await asyncio.to_thread(self._store, key, value)
+                else:
+                    self._store(key, value)
+        except BaseException as ex:
+            if self.config.single_flight:
+                if isinstance(ex, asyncio.CancelledError):
+                    leader.cancel()
+                else:
+                    leader.set_exception(ex)
+                    # mark retrieved: nobody may be waiting for it
+                    leader.exception()
+            raise
+        finally:
+            if self.config.single_flight:
+                self._inflight_aio.pop(key, None)
+        if self.config.single_flight:
+            leader.set_result(value)
+        return value
@@ -0,0 +1,241 @@
+"""Client-side pool of persistent gRPC channels over the replicas of one service.
+
+Every address gets its own long-lived channel with keepalive pings. Calls are spread over
+healthy replicas (round-robin or least-loaded); a replica is unhealthy while its channel
+reports TRANSIENT_FAILURE or after a failed call, until its exponential backoff expires.
+Only the failed replica's channel is rebuilt (calls and streams still running on the old one
+finish first), the others keep their connections.
+"""
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import count
+from typing import Any, Literal
+
+import grpc
+from loguru import logger
+
+from mmar_ptag.ptag_codecs import CodecNegotiation
+
+BalancingPolicy = Literal["round_robin", "least_loaded"]
+ChannelFactory = Callable[[str], tuple[grpc.Channel, Any]]
+
+
+@dataclass(frozen=True)
+class ChannelPoolConfig:
+    balancing: BalancingPolicy = "round_robin"
+    keepalive_time_ms: int = 30_000
+    keepalive_timeout_ms: int = 10_000
+    backoff_initial: float = 0.1
+    backoff_multiplier: float = 2.0
+    backoff_max: float = 10.0
+    backoff_jitter: float = 0.2
+
+    def channel_options(self) -> list[tuple[str, Any]]:
+        return [
+            ("grpc.keepalive_time_ms", self.keepalive_time_ms),
+            ("grpc.keepalive_timeout_ms", self.keepalive_timeout_ms),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+        ]
+
+    def server_options(self) -> list[tuple[str, Any]]:
+        """
+        Server side of the keepalive: with gRPC defaults (5 min minimum ping interval, 2 strikes)
+        the server answers our idle pings with GOAWAY "too_many_pings" and the channel drops.
+        """
+        return [
+            ("grpc.http2.min_ping_interval_without_data_ms", self.keepalive_time_ms),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_ping_strikes", 0),
+        ]
+
+    def backoff(self, failures: int) -> float:
+        delay = min(self.backoff_max, self.backoff_initial * self.backoff_multiplier ** max(0, failures - 1))
+        return delay * (1 + random.uniform(-self.backoff_jitter, self.backoff_jitter))
+
+
+def parse_addresses(address: str | list[str]) -> list[str]:
+    """`"host1:port,host2:port"` or a list of addresses."""
+    addresses = address.split(",") if isinstance(address, str) else list(address)
+    addresses = [address.strip() for address in addresses if address.strip()]
+    if not addresses:
+        raise ValueError("Expected at least one address")
+    return addresses
+
+
+class Connection:
+    """Channel of an endpoint with its stub, proxies and codec negotiation, and the calls running on it."""
+
+    def __init__(self, channel: grpc.Channel, stub: Any, codec: str):
+        self.channel = channel
+        self.stub = stub
+        self.proxies: dict[str, Callable] = {}
+        # a new connection may reach another version of the peer: the codec is negotiated again
+        self.codecs = CodecNegotiation(codec)
+        # unary calls and streams not yet exhausted
+        self.in_flight = 0
+        # replaced by a new connection: closed once its last call finishes
+        self.retired = False
+
+    def close(self) -> None:
+        try:
+            self.channel.close()
+        except Exception:
+            pass
+
+
+class Endpoint:
+    """One replica: its current connection and health state."""
+
+    def __init__(self, address: str, codec: str):
+        self.address = address
+        self.codec = codec
+        self.connection: Connection | None = None
+        self.connectivity: grpc.ChannelConnectivity | None = None
+        # calls on all connections of the endpoint, for balancing
+        self.in_flight = 0
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.retry_at and self.connectivity not in (
+            grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+            grpc.ChannelConnectivity.SHUTDOWN,
+        )
+
+    def _on_connectivity(self, connectivity: grpc.ChannelConnectivity) -> None:
+        self.connectivity = connectivity
+
+    def open(self, channel_factory: ChannelFactory) -> None:
+        channel, stub = channel_factory(self.address)
+        self.connection = Connection(channel, stub, self.codec)
+        self.connectivity = None
+        # passive health check: gRPC reports connection state changes (keepalive failures included)
+        channel.subscribe(self._on_connectivity, try_to_connect=True)
+
+    def retire(self) -> None:
+        """Detach the current connection: the next call opens a new one, this one closes after its last call."""
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return
+        self.connectivity = None
+        try:
+            connection.channel.unsubscribe(self._on_connectivity)
+        except Exception:
+            pass
+        connection.retired = True
+        if connection.in_flight == 0:
+            connection.close()
+
+
+class ChannelPool:
+    def __init__(
+        self,
+        addresses: list[str],
+        channel_factory: ChannelFactory,
+        config: ChannelPoolConfig | None = None,
+        codec: str = "json",
+    ):
+        self.config = config or ChannelPoolConfig()
+        self.channel_factory = channel_factory
+        self.endpoints = [Endpoint(address, codec) for address in addresses]
+        self._counter = count()
+        self._lock = threading.Lock()
+        for endpoint in self.endpoints:
+            endpoint.open(channel_factory)
+
+    @property
+    def addresses(self) -> list[str]:
+        return [endpoint.address for endpoint in self.endpoints]
+
+    def choose(self) -> Endpoint:
+        """Pick a healthy endpoint by the balancing policy; if none is healthy, wait for the nearest retry."""
+        with self._lock:
+            now = time.monotonic()
+            healthy = [endpoint for endpoint in self.endpoints if endpoint.is_healthy(now)]
+            if healthy:
+                return self._select(healthy)
+            endpoint = min(self.endpoints, key=lambda endpoint: endpoint.retry_at)
+        delay = endpoint.retry_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return endpoint
+
+    def _select(self, endpoints: list[Endpoint]) -> Endpoint:
+        if self.config.balancing == "least_loaded":
+            start = next(self._counter)
+            # rotate before min() so ties are spread too
+            rotated = endpoints[start % len(endpoints) :] + endpoints[: start % len(endpoints)]
+            return min(rotated, key=lambda endpoint: endpoint.in_flight)
+        return endpoints[next(self._counter) % len(endpoints)]
+
+    def acquire(self, endpoint: Endpoint) -> Connection:
+        """Connection for one call (opened if the endpoint has none); `release` it when the call is over."""
+        with self._lock:
+            if endpoint.connection is None:
+                endpoint.open(self.channel_factory)
+            connection = endpoint.connection
+            connection.in_flight += 1
+            endpoint.in_flight += 1
+        return connection
+
+    def release(self, endpoint: Endpoint, connection: Connection) -> None:
+        with self._lock:
+            connection.in_flight -= 1
+            endpoint.in_flight -= 1
+            if connection.retired and connection.in_flight == 0:
+                connection.close()
+
+    @contextmanager
+    def lease(self, endpoint: Endpoint):
+        connection = self.acquire(endpoint)
+        try:
+            yield connection
+        finally:
+            self.release(endpoint, connection)
+
+    def mark_ok(self, endpoint: Endpoint) -> None:
+        if endpoint.failures:
+            with self._lock:
+                endpoint.failures = 0
+                endpoint.retry_at = 0.0
+
+    def mark_failed(self, endpoint: Endpoint, connection: Connection | None = None) -> None:
+        """
+        Back off the endpoint exponentially and retire the failed `connection` (the current one if None):
+        the next call opens a new channel, the old one is closed when its last running call finishes.
+        """
+        with self._lock:
+            endpoint.failures += 1
+            delay = self.config.backoff(endpoint.failures)
+            endpoint.retry_at = time.monotonic() + delay
+            # another thread may have replaced the failed connection already
+            if connection is None or connection is endpoint.connection:
+                endpoint.retire()
+        logger.warning(f"Address {endpoint.address} marked unavailable for {delay:.2f}s (failures: {endpoint.failures})")
+
+    def metrics(self) -> list[dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {
+                "address": endpoint.address,
+                "healthy": endpoint.is_healthy(now),
+                "connectivity": endpoint.connectivity.name if endpoint.connectivity else None,
+                "in_flight": endpoint.in_flight,
+                "failures": endpoint.failures,
+            }
+            for endpoint in self.endpoints
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            for endpoint in self.endpoints:
+                connection = endpoint.connection
+                endpoint.retire()
+                if connection is not None:
+                    connection.close()
@@ -0,0 +1,139 @@
+"""Payload codecs for PTAG: how args and results are turned into `Payload` bytes.
+
+JSON (pydantic `dump_json`/`validate_json`) is the default and the only codec old peers understand.
+Binary codecs (msgpack, CBOR) are available when their optional packages are installed.
+
+Negotiation happens through invocation metadata, so mixed-version peers keep working:
+- the client always advertises the codecs it accepts in `ptag-accept`;
+- the server answers with the first codec it supports and reports it in trailing metadata `ptag-codec`
+  (old servers answer JSON without metadata);
+- once the client has seen the server answer with its preferred codec, it also encodes requests
+  with it and marks them with `ptag-codec` (old clients never do, so servers default to JSON).
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+from pydantic import TypeAdapter
+
+CODEC_METADATA_KEY = "ptag-codec"
+ACCEPT_METADATA_KEY = "ptag-accept"
+JSON_CODEC_NAME = "json"
+
+
+class PTAGCodec(ABC):
+    name: str
+
+    @abstractmethod
+    def encode(self, adapter: TypeAdapter, obj: Any) -> bytes: ...
+
+    @abstractmethod
+    def decode(self, adapter: TypeAdapter, data: bytes) -> Any: ...
+
+
+class JsonCodec(PTAGCodec):
+    name = JSON_CODEC_NAME
+
+    def encode(self, adapter: TypeAdapter, obj: Any) -> bytes:
+        return adapter.dump_json(obj)
+
+    def decode(self, adapter: TypeAdapter, data: bytes) -> Any:
+        return adapter.validate_json(data)
+
+
+class MsgpackCodec(PTAGCodec):
+    """JSON-compatible data model (pydantic `mode="json"`) packed with msgpack."""
+
+    name = "msgpack"
+
+    def __init__(self):
+        import msgpack
+
+        self._packb = msgpack.packb
+        self._unpackb = msgpack.unpackb
+
+    def encode(self, adapter: TypeAdapter, obj: Any) -> bytes:
+        return self._packb(adapter.dump_python(obj, mode="json"))
+
+    def decode(self, adapter: TypeAdapter, data: bytes) -> Any:
+        return adapter.validate_python(self._unpackb(data))
+
+
+class CborCodec(PTAGCodec):
+    """JSON-compatible data model (pydantic `mode="json"`) packed with CBOR."""
+
+    name = "cbor"
+
+    def __init__(self):
+        import cbor2
+
+        self._dumps = cbor2.dumps
+        self._loads = cbor2.loads
+
+    def encode(self, adapter: TypeAdapter, obj: Any) -> bytes:
+        return self._dumps(adapter.dump_python(obj, mode="json"))
+
+    def decode(self, adapter: TypeAdapter, data: bytes) -> Any:
+        return adapter.validate_python(self._loads(data))
+
+
+JSON_CODEC = JsonCodec()
+CODECS: dict[str, PTAGCodec] = {JSON_CODEC_NAME: JSON_CODEC}
+
+
+def register_codec(codec: PTAGCodec) -> None:
+    CODECS[codec.name] = codec
+
+
+def get_codec(name: str | None) -> PTAGCodec:
+    if not name:
+        return JSON_CODEC
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Unknown PTAG codec `{name}`, available: {sorted(CODECS)}")
+    return codec
+
+
+def choose_codec(accept: str | None) -> PTAGCodec:
+    """Pick the first codec from a comma-separated `ptag-accept` list this side supports."""
+    for name in (accept or "").split(","):
+        codec = CODECS.get(name.strip())
+        if codec is not None:
+            return codec
+    return JSON_CODEC
+
+
+class CodecNegotiation:
+    """Client-side codec state: JSON until the server proves it speaks the preferred codec."""
+
+    def __init__(self, preferred: str = JSON_CODEC_NAME):
+        self.preferred = get_codec(preferred)
+        self.request_codec: PTAGCodec = JSON_CODEC
+        accept = [self.preferred.name] if self.preferred is not JSON_CODEC else []
+        self.accept = ",".join([*accept, JSON_CODEC_NAME])
+
+    def request_metadata(self) -> list[tuple[str, str]]:
+        metadata = [(ACCEPT_METADATA_KEY, self.accept)]
+        if self.request_codec is not JSON_CODEC:
+            metadata.append((CODEC_METADATA_KEY, self.request_codec.name))
+        return metadata
+
+    def response_codec(self, metadata) -> PTAGCodec:
+        """Resolve the codec of a response from its metadata and upgrade requests if possible."""
+        # (key, value) pairs: a tuple for sync calls, `aio.Metadata` for grpc.aio
+        name = next((value for key, value in metadata or () if key == CODEC_METADATA_KEY), None)
+        codec = get_codec(name)
+        if codec is self.preferred:
+            self.request_codec = codec
+        return codec
+
+
+def _register_optional_codecs() -> None:
+    for codec_cls in (MsgpackCodec, CborCodec):
+        try:
+            register_codec(codec_cls())
+        except ImportError:
+            pass
+
+
+_register_optional_codecs()
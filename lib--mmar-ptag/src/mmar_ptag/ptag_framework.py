@@ -1,9 +1,10 @@
 """PTAG ~ 'Pydantic Type Adapter GRPC'"""
 
+import functools
 import types
-from collections.abc import Callable
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Callable, Generator, Iterable, Iterator
 from contextlib import contextmanager
-from typing import Generic, TypeVar, cast
+from typing import Any, Generic, NamedTuple, TypeVar, cast, get_args, get_origin
 
 from google.protobuf.message import Message
 from grpc import Channel, RpcError, ServicerContext, StatusCode, insecure_channel
@@ -18,12 +19,26 @@ from mmar_utils.utils_inspect import (
     get_full_name,
     prettify_arg_metadata,
 )
-
+from pydantic import TypeAdapter
+
+from mmar_ptag.ptag_cache import MethodCache, PTAGCacheConfig, find_cache_configs, make_cache_key
+from mmar_ptag.ptag_channel_pool import BalancingPolicy, ChannelPool, ChannelPoolConfig, parse_addresses
+from mmar_ptag.ptag_codecs import (
+    ACCEPT_METADATA_KEY,
+    CODEC_METADATA_KEY,
+    JSON_CODEC_NAME,
+    CodecNegotiation,
+    PTAGCodec,
+    choose_codec,
+    get_codec,
+)
 from mmar_ptag.ptag_pb2 import PTAGRequest, PTAGResponse
 from mmar_ptag.ptag_pb2_grpc import PTAGServiceServicer, PTAGServiceStub, add_PTAGServiceServicer_to_server
 
 T = TypeVar("T")
 
+STREAM_ORIGINS = {Iterator, Iterable, Generator, AsyncIterator, AsyncIterable, AsyncGenerator}
+
 
 @contextmanager
 def nothing(*args, **kwargs):
@@ -74,16 +89,61 @@ def check_valid_trace_id_in_metadatas(metadatas: Metadatas):
         check_valid_trace_id_in_func(fm)
 
 
+def stream_item_type(func_metadata: FuncMetadata) -> Any | None:
+    """Element type for methods returning `Iterator[T]` / `AsyncIterator[T]` (server-streamed), else None."""
+    result_type = func_metadata.result_type
+    if get_origin(result_type) not in STREAM_ORIGINS:
+        return None
+    args = get_args(result_type)
+    return args[0] if args else Any
+
+
+def stream_adapters(metadatas: Metadatas) -> dict[str, TypeAdapter]:
+    adapters = {}
+    for name, fm in metadatas.items():
+        item_type = stream_item_type(fm)
+        if item_type is not None:
+            adapters[name] = TypeAdapter(item_type)
+    return adapters
+
+
 def as_str(obj: str | bytes) -> str:
     return obj if isinstance(obj, str) else obj.decode()
 
 
+class PreparedCall(NamedTuple):
+    method: Callable
+    method_metadata: FuncMetadata
+    trace_id: str
+    request_codec: PTAGCodec
+    response_codec: PTAGCodec
+
+
 class WrappedPTAGService(PTAGServiceServicer):
-    def __init__(self, service_object):
+    def __init__(self, service_object, caches: dict[str, PTAGCacheConfig | None] | None = None):
         self.methods, self.metadatas = extract_and_validate_obj_methods_metadatas(service_object)
         check_valid_trace_id_in_metadatas(self.metadatas)
-
-    def Invoke(self, request: Message, context: ServicerContext):
+        self.stream_adapters = stream_adapters(self.metadatas)
+        self.caches = self._create_caches(service_object, caches or {})
+
+    def _create_caches(self, service_object, overrides: dict[str, PTAGCacheConfig | None]) -> dict[str, MethodCache]:
+        configs = find_cache_configs(service_object, self.metadatas) | overrides
+        caches = {}
+        for name, config in configs.items():
+            if config is None:
+                continue
+            if name not in self.metadatas:
+                raise ValueError(f"Cache configured for unknown method `{name}`")
+            if name in self.stream_adapters:
+                raise ValueError(f"Cache is not supported for streaming method `{name}`")
+            logger.info(f"PTAG cache for `{name}`: {config}")
+            caches[name] = MethodCache(name, config)
+        return caches
+
+    def cache_metrics(self) -> dict[str, dict]:
+        return {name: cache.metrics() for name, cache in self.caches.items()}
+
+    def _prepare_call(self, request: Message, context: ServicerContext, streaming: bool = False) -> PreparedCall | None:
         method_name = request.FunctionName
         method = self.methods.get(method_name)
         method_metadata = self.metadatas.get(method_name)
@@ -91,71 +151,234 @@ class WrappedPTAGService(PTAGServiceServicer):
         if method_metadata is None:
             context.set_code(StatusCode.NOT_FOUND)
             context.set_details(f"Method {method_name} not found")
-            return PTAGResponse()
+            return None
 
-        # [args_bytes] -(args_adapter.validate)-> [args] -(method)-> [result] -(result_adapter.dump)-> [result_bytes]
-        args_adapter = method_metadata.args_adapter
-        result_adapter = method_metadata.result_adapter
+        if (method_name in self.stream_adapters) != streaming:
+            expected, actual = ("InvokeStream", "Invoke") if not streaming else ("Invoke", "InvokeStream")
+            context.set_code(StatusCode.FAILED_PRECONDITION)
+            context.set_details(f"Method {method_name} should be called with {expected}, not {actual}")
+            return None
 
         metadata = dict(context.invocation_metadata())
         trace_id = as_str(metadata.get(TRACE_ID, TRACE_ID_DEFAULT))
         try:
-            input_obj = args_adapter.validate_json(request.Payload)
-            input_names = (am.name for am in method_metadata.args_metadata)
-            input_kwargs = dict(zip(input_names, input_obj))
+            request_codec = get_codec(metadata.get(CODEC_METADATA_KEY))
+        except ValueError as ex:
+            context.set_code(StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(ex))
+            return None
+        response_codec = choose_codec(metadata.get(ACCEPT_METADATA_KEY))
+        return PreparedCall(method, method_metadata, trace_id, request_codec, response_codec)
+
+    @staticmethod
+    def _decode_kwargs(request: Message, prepared: PreparedCall) -> dict:
+        method_metadata = prepared.method_metadata
+        input_obj = prepared.request_codec.decode(method_metadata.args_adapter, request.Payload)
+        input_names = (am.name for am in method_metadata.args_metadata)
+        return dict(zip(input_names, input_obj))
+
+    @staticmethod
+    def _codec_metadata(codec: PTAGCodec) -> tuple:
+        return ((CODEC_METADATA_KEY, codec.name),) if codec.name != JSON_CODEC_NAME else ()
+
+    def _encode_response(self, context: ServicerContext, prepared: PreparedCall, output_obj) -> PTAGResponse:
+        method_metadata, codec = prepared.method_metadata, prepared.response_codec
+        payload = codec.encode(method_metadata.result_adapter, output_obj)
+        if codec_metadata := self._codec_metadata(codec):
+            context.set_trailing_metadata(codec_metadata)
+        return PTAGResponse(FunctionName=method_metadata.name, Payload=payload)
+
+    def _encode_cached_response(self, context: ServicerContext, prepared: PreparedCall, result_json: bytes) -> PTAGResponse:
+        # cached results are stored as JSON: re-encode only for other codecs
+        if prepared.response_codec.name == JSON_CODEC_NAME:
+            return PTAGResponse(FunctionName=prepared.method_metadata.name, Payload=result_json)
+        output_obj = prepared.method_metadata.result_adapter.validate_json(result_json)
+        return self._encode_response(context, prepared, output_obj)
+
+    def _encode_item(self, prepared: PreparedCall, item) -> PTAGResponse:
+        name = prepared.method_metadata.name
+        payload = prepared.response_codec.encode(self.stream_adapters[name], item)
+        return PTAGResponse(FunctionName=name, Payload=payload)
+
+    @staticmethod
+    def _fail(context: ServicerContext, trace_id: str, ex: Exception) -> PTAGResponse:
+        with installed_trace_id(trace_id=trace_id):
+            logger.exception(f"Failed to process request: {ex}")
+        context.set_code(StatusCode.INTERNAL)
+        context.set_details(str(ex))
+        return PTAGResponse()
+
+    def Invoke(self, request: Message, context: ServicerContext):
+        prepared = self._prepare_call(request, context)
+        if prepared is None:
+            return PTAGResponse()
+        trace_id = prepared.trace_id
+
+        # [args_bytes] -(args_adapter.validate)-> [args] -(method)-> [result] -(result_adapter.dump)-> [result_bytes]
+        try:
+            input_kwargs = self._decode_kwargs(request, prepared)
+
+            cache = self.caches.get(prepared.method_metadata.name)
+            if cache is not None:
+                result_json = cache.get_or_compute(
+                    make_cache_key(prepared.method_metadata, input_kwargs),
+                    lambda: self._call_json(prepared, input_kwargs),
+                )
+                return self._encode_cached_response(context, prepared, result_json)
 
             with installed_trace_id(trace_id=trace_id):
-                output_obj = method(**input_kwargs)
+                output_obj = prepared.method(**input_kwargs)
 
-            payload = result_adapter.dump_json(output_obj)
-            return PTAGResponse(FunctionName=method_name, Payload=payload)
+            return self._encode_response(context, prepared, output_obj)
         except Exception as e:
+            return self._fail(context, trace_id, e)
+
+    @staticmethod
+    def _call_json(prepared: PreparedCall, input_kwargs: dict) -> bytes:
+        with installed_trace_id(trace_id=prepared.trace_id):
+            output_obj = prepared.method(**input_kwargs)
+        return prepared.method_metadata.result_adapter.dump_json(output_obj)
+
+    def InvokeStream(self, request: Message, context: ServicerContext):
+        prepared = self._prepare_call(request, context, streaming=True)
+        if prepared is None:
+            return
+        trace_id = prepared.trace_id
+
+        # [args_bytes] -> [args] -(method)-> [item, item, ...] -(item_adapter.dump)-> [frame, frame, ...]
+        try:
+            input_kwargs = self._decode_kwargs(request, prepared)
+            # headers go out right away: the client learns the codec before the first item
+            context.send_initial_metadata(self._codec_metadata(prepared.response_codec))
+
             with installed_trace_id(trace_id=trace_id):
-                logger.exception(f"Failed to process request: {e}")
-            context.set_code(StatusCode.INTERNAL)
-            context.set_details(str(e))
-            return PTAGResponse()
+                for item in prepared.method(**input_kwargs):
+                    yield self._encode_item(prepared, item)
+        except Exception as e:
+            self._fail(context, trace_id, e)
 
 
-def make_proxy(grpc_stub, func_metadata: FuncMetadata):
+def build_request(
+    func_metadata: FuncMetadata, args: tuple, kwargs: dict, codecs: CodecNegotiation
+) -> tuple[PTAGRequest, list]:
     # only **kwargs supported
+    if args:
+        raise ValueError(f"Func `{func_metadata.name}`: only kwargs supported, but args found: `{args}`")
+    kw_get_or_pop = kwargs.get if func_metadata.has_arg(TRACE_ID) else kwargs.pop
+    trace_id = kw_get_or_pop(TRACE_ID, None) or TRACE_ID_VAR.get()
+    metadata = [(TRACE_ID, trace_id)] if trace_id else []
+    metadata.extend(codecs.request_metadata())
+
+    bound_args = bind_args_to_tuple(func_metadata.args_metadata, kwargs=kwargs)
+    args_bytes = codecs.request_codec.encode(func_metadata.args_adapter, bound_args)
+    request = PTAGRequest(FunctionName=func_metadata.name, Payload=args_bytes)
+    return request, metadata
+
+
+def decode_response(func_metadata: FuncMetadata, response: PTAGResponse, codec: PTAGCodec):
+    return codec.decode(func_metadata.result_adapter, response.Payload)
+
+
+def make_proxy(grpc_stub, func_metadata: FuncMetadata, codecs: CodecNegotiation | None = None):
     # [args] -(args_adapter.dump)-> [args_bytes] -(send)-> [result_bytes] -(return_adapter.validate)-> [result]
+    codecs = codecs or CodecNegotiation()
+    item_type = stream_item_type(func_metadata)
+    if item_type is not None:
+        return _make_stream_proxy(grpc_stub, func_metadata, codecs, TypeAdapter(item_type))
+
     def proxy(self, *args, **kwargs):
-        if args:
-            raise ValueError(f"Func `{func_metadata.name}`: only kwargs supported, but args found: `{args}`")
-        kw_get_or_pop = kwargs.get if func_metadata.has_arg(TRACE_ID) else kwargs.pop
-        trace_id = kw_get_or_pop(TRACE_ID, None) or TRACE_ID_VAR.get()
-        metadata = [(TRACE_ID, trace_id)] if trace_id else []
-
-        args = bind_args_to_tuple(func_metadata.args_metadata, kwargs=kwargs)
-        args_bytes = func_metadata.args_adapter.dump_json(args)
-        request = PTAGRequest(FunctionName=func_metadata.name, Payload=args_bytes)
-        response = grpc_stub.Invoke(request, metadata=metadata)
-        result_bytes = response.Payload
-        result = func_metadata.result_adapter.validate_json(result_bytes)
-        return result
+        request, metadata = build_request(func_metadata, args, kwargs, codecs)
+        response, call = grpc_stub.Invoke.with_call(request, metadata=metadata)
+        codec = codecs.response_codec(call.trailing_metadata())
+        return decode_response(func_metadata, response, codec)
 
     return proxy
 
 
+def _iterate_stream(call, first, item_adapter: TypeAdapter, codec: PTAGCodec):
+    try:
+        if first is None:
+            return
+        yield codec.decode(item_adapter, first.Payload)
+        for response in call:
+            yield codec.decode(item_adapter, response.Payload)
+    finally:
+        # stop the server-side iteration if the consumer breaks early
+        call.cancel()
+
+
+def _make_stream_proxy(grpc_stub, func_metadata: FuncMetadata, codecs: CodecNegotiation, item_adapter: TypeAdapter):
+    # [args] -> [args_bytes] -(send)-> [frame, frame, ...] -(item_adapter.validate)-> Iterator[item]
+    def proxy(self, *args, **kwargs):
+        request, metadata = build_request(func_metadata, args, kwargs, codecs)
+        call = grpc_stub.InvokeStream(request, metadata=metadata)
+        codec = codecs.response_codec(call.initial_metadata())
+        # the first frame is fetched eagerly, so connection errors surface here (and can be retried)
+        first = next(call, None)
+        return _iterate_stream(call, first, item_adapter, codec)
+
+    return proxy
+
+
+class _LeasedStream:
+    """Stream result that holds its pool connection until it is exhausted, closed or dropped."""
+
+    def __init__(self, items: Iterator, release: Callable[[], None]):
+        self._items = items
+        self._release: Callable[[], None] | None = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._items)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        release, self._release = self._release, None
+        if release is None:
+            return
+        try:
+            self._items.close()
+        finally:
+            release()
+
+    def __del__(self):
+        self.close()
+
+
 ChannelStubFunc = Callable[[str], tuple[Channel, PTAGServiceStub]]
 
 
-def _create_insecure_channel_stub(address):
-    channel = insecure_channel(address)
+def _create_insecure_channel_stub(address, options=None):
+    channel = insecure_channel(address, options=options)
     stub = PTAGServiceStub(channel)
     return channel, stub
 
 
 class ClientProxy(Generic[T]):
+    """
+    Client for one service, possibly deployed as several replicas: `address` is one address,
+    a comma-separated string or a list. Calls are balanced over a pool of persistent channels.
+    """
+
     def __init__(
         self,
         service_interface: type[T],
-        address,
+        address: str | list[str],
         channel_stub_func: ChannelStubFunc | None = None,
         reconnect_attempts: int = 5,
+        codec: str = JSON_CODEC_NAME,
+        pool_config: ChannelPoolConfig | None = None,
     ):
-        self.channel_stub_func = channel_stub_func or _create_insecure_channel_stub
+        pool_config = pool_config or ChannelPoolConfig()
+        self.channel_stub_func = channel_stub_func or functools.partial(
+            _create_insecure_channel_stub, options=pool_config.channel_options()
+        )
+        self.codec = codec
         if not isinstance(service_interface, type):
             si_name = type(service_interface).__name__
             raise ValueError(
@@ -169,28 +392,18 @@ class ClientProxy(Generic[T]):
         check_valid_trace_id_in_metadatas(metadatas)
         self.metadatas = metadatas
 
-        self.address = address
-        self._channel, self._stub = self.channel_stub_func(self.address)
+        self.pool = ChannelPool(parse_addresses(address), self.channel_stub_func, pool_config, codec=codec)
+        self.address = ",".join(self.pool.addresses)
         self._set_proxy_methods()
 
     def _set_proxy_methods(self):
         for mm in self.metadatas.values():
-            proxy = make_proxy(self._stub, mm)
-            # Store the actual method name on the proxy function for reconnection
-            proxy.__ptag_method_name__ = mm.name
-            proxy_wrapped = self._wrap_method_with_reconnect(proxy)
+            proxy_wrapped = self._wrap_method_with_reconnect(mm)
             bound_func = types.MethodType(proxy_wrapped, self)
             setattr(self, mm.name, bound_func)
 
-    def _reconnect(self, attempt: int):
-        """Close existing channel and create a new one."""
-        try:
-            self._channel.close()
-        except Exception:
-            pass
-        self._channel, self._stub = self.channel_stub_func(self.address)
-        self._set_proxy_methods()
-        logger.info(f"Address {self.address} reconnected (attempt {attempt})...")
+    def close(self):
+        self.pool.close()
 
     @staticmethod
     def _is_retryable_error(ex: Exception) -> bool:
@@ -221,42 +434,56 @@ class ClientProxy(Generic[T]):
             return "Cannot invoke RPC on closed channel!" in str(ex)
         return False
 
-    def _wrap_method_with_reconnect(self, raw_method):
-        method_name = getattr(raw_method, "__ptag_method_name__", raw_method.__name__)
+    def _wrap_method_with_reconnect(self, func_metadata: FuncMetadata):
+        method_name = func_metadata.name
+        streaming = stream_item_type(func_metadata) is not None
 
         def wrapped(proxy_self, *args, **kwargs):
+            pool = proxy_self.pool
             for attempt in range(proxy_self.reconnect_attempts + 1):
+                # another replica if any is healthy, otherwise waits out the backoff of the failed one
+                endpoint = pool.choose()
+                connection = pool.acquire(endpoint)
                 try:
-                    if attempt > 0:
-                        proxy_self._reconnect(attempt)
-                        # After reconnection, use the new stub directly via raw_method
-                        # We need to recreate raw_method with the updated stub
-                        func_metadata = proxy_self.metadatas[method_name]
-                        raw_proxy = make_proxy(proxy_self._stub, func_metadata)
-                        return raw_proxy(proxy_self, *args, **kwargs)
-                    return raw_method(proxy_self, *args, **kwargs)
-                except Exception as ex:
-                    if not proxy_self._is_retryable_error(ex):
+                    raw_proxy = connection.proxies.get(method_name)
+                    if raw_proxy is None:
+                        raw_proxy = make_proxy(connection.stub, func_metadata, connection.codecs)
+                        connection.proxies[method_name] = raw_proxy
+                    result = raw_proxy(proxy_self, *args, **dict(kwargs))
+                except BaseException as ex:
+                    pool.release(endpoint, connection)
+                    if not isinstance(ex, Exception) or not proxy_self._is_retryable_error(ex):
                         raise
+                    pool.mark_failed(endpoint, connection)
                     logger.error(
-                        f"Address {proxy_self.address} error "
+                        f"Address {endpoint.address} error "
                         f"(attempt {attempt + 1}/{proxy_self.reconnect_attempts + 1}): {ex}"
                     )
+                else:
+                    pool.mark_ok(endpoint)
+                    if streaming:
+                        # the stream keeps the connection busy until it is exhausted
+                        return _LeasedStream(result, functools.partial(pool.release, endpoint, connection))
+                    pool.release(endpoint, connection)
+                    return result
 
             raise Exception(f"Address {proxy_self.address} failed after {proxy_self.reconnect_attempts + 1} attempts")
 
+        wrapped.__name__ = method_name
         return wrapped
 
     def __str__(self):
         return f"ptag-client('{get_full_name(self.service_interface)}' -> '{self.address}')"
 
 
-def ptag_attach(server, service_object):
+def ptag_attach(server, service_object, caches: dict[str, PTAGCacheConfig | None] | None = None) -> WrappedPTAGService:
     """
     Attach a service object implementing the interface to a gRPC server.
+    `caches` overrides `@ptag_cached` configs per method name (None disables caching of the method).
     """
-    service = WrappedPTAGService(service_object)
+    service = WrappedPTAGService(service_object, caches=caches)
     add_PTAGServiceServicer_to_server(service, server)
+    return service
 
 
 def _is_valid_address(address) -> bool:
@@ -278,10 +505,23 @@ def _try_fix_address(address: int | str):
     return address
 
 
-def ptag_client(service_interface: type[T], address: str, reconnect_attempts: int = 5) -> T:
+def ptag_client(
+    service_interface: type[T],
+    address: str | list[str],
+    reconnect_attempts: int = 5,
+    codec: str = JSON_CODEC_NAME,
+    balancing: BalancingPolicy = "round_robin",
+    pool_config: ChannelPoolConfig | None = None,
+) -> T:
     """
     Create a dynamic client for the given interface at the provided gRPC address.
+    Several replicas may be passed as a list or as `"host1:port,host2:port"`: calls are balanced
+    (`round_robin` or `least_loaded`) over healthy ones, failed replicas are retried with exponential backoff.
+    `codec` is the preferred payload codec, used once the server confirms it supports it (JSON otherwise).
     """
-    address = _try_fix_address(address)
-    proxy = ClientProxy(service_interface, address, reconnect_attempts=reconnect_attempts)
+    addresses = [_try_fix_address(address) for address in parse_addresses(address)]
+    pool_config = pool_config or ChannelPoolConfig(balancing=balancing)
+    proxy = ClientProxy(
+        service_interface, addresses, reconnect_attempts=reconnect_attempts, codec=codec, pool_config=pool_config
+    )
     return cast(T, proxy)
@@ -0,0 +1,309 @@
+"""PTAG on grpc.aio: native `async def` services and awaitable client proxies."""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import types
+from concurrent.futures import Executor
+from collections.abc import AsyncIterator
+from typing import Generic, TypeVar, cast
+
+from google.protobuf.message import Message
+from grpc import aio
+from loguru import logger
+from mmar_mimpl import installed_trace_id
+from mmar_utils.utils_inspect import FuncMetadata, extract_interface_metadatas, get_full_name
+from pydantic import TypeAdapter
+
+from mmar_ptag.ptag_cache import PTAGCacheConfig, make_cache_key
+from mmar_ptag.ptag_channel_pool import ChannelPoolConfig
+from mmar_ptag.ptag_codecs import JSON_CODEC_NAME, CodecNegotiation
+from mmar_ptag.ptag_framework import (
+    ChannelStubFunc,
+    ClientProxy,
+    PreparedCall,
+    WrappedPTAGService,
+    _try_fix_address,
+    build_request,
+    check_valid_trace_id_in_metadatas,
+    decode_response,
+    stream_item_type,
+)
+from mmar_ptag.ptag_pb2 import PTAGResponse
+from mmar_ptag.ptag_pb2_grpc import PTAGServiceStub, add_PTAGServiceServicer_to_server
+
+T = TypeVar("T")
+
+_STREAM_END = object()
+
+
+class WrappedPTAGServiceAio(WrappedPTAGService):
+    """
+    grpc.aio servicer: `async def` methods are awaited on the event loop,
+    sync methods run in `executor` (the loop's default executor if None).
+    """
+
+    def __init__(
+        self,
+        service_object,
+        executor: Executor | None = None,
+        caches: dict[str, PTAGCacheConfig | None] | None = None,
+    ):
+        super().__init__(service_object, caches=caches)
+        self.executor = executor
+        self.async_methods = {name for name, method in self.methods.items() if inspect.iscoroutinefunction(method)}
+
+    async def _call(self, method_name: str, method, input_kwargs: dict):
+        if method_name in self.async_methods:
+            return await method(**input_kwargs)
+        # copy context so trace_id (and logger context) reach the worker thread
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, method, **input_kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    async def Invoke(self, request: Message, context: aio.ServicerContext):
+        prepared = self._prepare_call(request, context)
+        if prepared is None:
+            return PTAGResponse()
+        trace_id = prepared.trace_id
+
+        try:
+            input_kwargs = self._decode_kwargs(request, prepared)
+
+            cache = self.caches.get(prepared.method_metadata.name)
+            if cache is not None:
+                result_json = await cache.get_or_compute_aio(
+                    make_cache_key(prepared.method_metadata, input_kwargs),
+                    lambda: self._call_json_aio(prepared, input_kwargs),
+                )
+                return self._encode_cached_response(context, prepared, result_json)
+
+            with installed_trace_id(trace_id=trace_id):
+                output_obj = await self._call(prepared.method_metadata.name, prepared.method, input_kwargs)
+
+            return self._encode_response(context, prepared, output_obj)
+        except Exception as e:
+            return self._fail(context, trace_id, e)
+
+    async def _call_json_aio(self, prepared: PreparedCall, input_kwargs: dict) -> bytes:
+        with installed_trace_id(trace_id=prepared.trace_id):
+            output_obj = await self._call(prepared.method_metadata.name, prepared.method, input_kwargs)
+        return prepared.method_metadata.result_adapter.dump_json(output_obj)
+
+    async def _iterate(self, method, input_kwargs: dict) -> AsyncIterator:
+        if inspect.isasyncgenfunction(method):
+            async for item in method(**input_kwargs):
+                yield item
+            return
+        # sync generators are advanced in the executor, one item at a time
+        ctx = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        iterator = await loop.run_in_executor(self.executor, functools.partial(ctx.run, method, **input_kwargs))
+        while (item := await loop.run_in_executor(self.executor, ctx.run, next, iterator, _STREAM_END)) is not _STREAM_END:
+            yield item
+
+    async def InvokeStream(self, request: Message, context: aio.ServicerContext):
+        prepared = self._prepare_call(request, context, streaming=True)
+        if prepared is None:
+            return
+        trace_id = prepared.trace_id
+
+        try:
+            input_kwargs = self._decode_kwargs(request, prepared)
+            await context.send_initial_metadata(self._codec_metadata(prepared.response_codec))
+
+            with installed_trace_id(trace_id=trace_id):
+                async for item in self._iterate(prepared.method, input_kwargs):
+                    yield self._encode_item(prepared, item)
+        except Exception as e:
+            self._fail(context, trace_id, e)
+
+
+def make_proxy_aio(grpc_stub, func_metadata: FuncMetadata, codecs: CodecNegotiation | None = None):
+    codecs = codecs or CodecNegotiation()
+
+    async def proxy(self, *args, **kwargs):
+        request, metadata = build_request(func_metadata, args, kwargs, codecs)
+        call = grpc_stub.Invoke(request, metadata=metadata)
+        response = await call
+        codec = codecs.response_codec(await call.trailing_metadata())
+        return decode_response(func_metadata, response, codec)
+
+    return proxy
+
+
+async def open_stream_aio(grpc_stub, func_metadata: FuncMetadata, args, kwargs, codecs: CodecNegotiation):
+    """
+    Start an `InvokeStream` call and read its first frame, so connection errors surface before any item is yielded.
+    Returns the call, the first frame (`aio.EOF` for an empty stream) and the resolved codec.
+    """
+    request, metadata = build_request(func_metadata, args, kwargs, codecs)
+    call = grpc_stub.InvokeStream(request, metadata=metadata)
+    codec = codecs.response_codec(await call.initial_metadata())
+    first = await call.read()
+    return call, first, codec
+
+
+async def iterate_stream_aio(call, first, item_adapter: TypeAdapter, codec) -> AsyncIterator:
+    try:
+        response = first
+        while response is not aio.EOF:
+            yield codec.decode(item_adapter, response.Payload)
+            response = await call.read()
+    finally:
+        # stop the server-side iteration if the consumer breaks early
+        call.cancel()
+
+
+def _create_insecure_channel_stub_aio(address):
+    channel = aio.insecure_channel(address, options=ChannelPoolConfig().channel_options())
+    stub = PTAGServiceStub(channel)
+    return channel, stub
+
+
+class AsyncClientProxy(Generic[T]):
+    """
+    Client with awaitable methods: `await client.method(**kwargs)`.
+    Methods returning `AsyncIterator[T]` / `Iterator[T]` are server-streamed: `async for item in client.method(...)`.
+    The channel is created lazily inside the running event loop.
+    """
+
+    def __init__(
+        self,
+        service_interface: type[T],
+        address,
+        channel_stub_func: ChannelStubFunc | None = None,
+        reconnect_attempts: int = 5,
+        codec: str = JSON_CODEC_NAME,
+    ):
+        self.channel_stub_func = channel_stub_func or _create_insecure_channel_stub_aio
+        self.codec = codec
+        self.codecs = CodecNegotiation(codec)
+        if not isinstance(service_interface, type):
+            si_name = type(service_interface).__name__
+            raise ValueError(
+                f"Expected type, found: {type(service_interface)}. "
+                f"Probably you passed ptag_client_aio({si_name}(), ...) instead of ptag_client_aio({si_name}, ...)"
+            )
+        self.service_interface = service_interface
+        self.reconnect_attempts = reconnect_attempts
+
+        metadatas = extract_interface_metadatas(service_interface)
+        check_valid_trace_id_in_metadatas(metadatas)
+        self.metadatas = metadatas
+
+        self.address = address
+        self._channel = None
+        self._stub = None
+        self._set_proxy_methods()
+
+    def _set_proxy_methods(self):
+        for mm in self.metadatas.values():
+            if stream_item_type(mm) is not None:
+                proxy_wrapped = self._wrap_stream_with_reconnect(mm)
+            else:
+                proxy_wrapped = self._wrap_method_with_reconnect(mm)
+            setattr(self, mm.name, types.MethodType(proxy_wrapped, self))
+
+    def _get_stub(self):
+        if self._stub is None:
+            self._channel, self._stub = self.channel_stub_func(self.address)
+        return self._stub
+
+    async def _reconnect(self, attempt: int):
+        """Close existing channel and create a new one."""
+        await self.close()
+        self._get_stub()
+        # the peer may have been replaced by another version: negotiate the codec again
+        self.codecs = CodecNegotiation(self.codec)
+        logger.info(f"Address {self.address} reconnected (attempt {attempt})...")
+
+    async def close(self):
+        channel, self._channel, self._stub = self._channel, None, None
+        if channel is not None:
+            try:
+                await channel.close()
+            except Exception:
+                pass
+
+    def _wrap_method_with_reconnect(self, func_metadata: FuncMetadata):
+        async def wrapped(proxy_self, *args, **kwargs):
+            for attempt in range(proxy_self.reconnect_attempts + 1):
+                try:
+                    if attempt > 0:
+                        await proxy_self._reconnect(attempt)
+                    raw_proxy = make_proxy_aio(proxy_self._get_stub(), func_metadata, proxy_self.codecs)
+                    return await raw_proxy(proxy_self, *args, **dict(kwargs))
+                except Exception as ex:
+                    if not ClientProxy._is_retryable_error(ex):
+                        raise
+                    logger.error(
+                        f"Address {proxy_self.address} error "
+                        f"(attempt {attempt + 1}/{proxy_self.reconnect_attempts + 1}): {ex}"
+                    )
+
+            raise Exception(f"Address {proxy_self.address} failed after {proxy_self.reconnect_attempts + 1} attempts")
+
+        wrapped.__name__ = func_metadata.name
+        return wrapped
+
+    def _wrap_stream_with_reconnect(self, func_metadata: FuncMetadata):
+        item_adapter = TypeAdapter(stream_item_type(func_metadata))
+
+        async def wrapped(proxy_self, *args, **kwargs):
+            # only opening the stream is retried: items already yielded can't be replayed
+            for attempt in range(proxy_self.reconnect_attempts + 1):
+                try:
+                    if attempt > 0:
+                        await proxy_self._reconnect(attempt)
+                    stub = proxy_self._get_stub()
+                    call, first, codec = await open_stream_aio(
+                        stub, func_metadata, args, dict(kwargs), proxy_self.codecs
+                    )
+                    break
+                except Exception as ex:
+                    if not ClientProxy._is_retryable_error(ex):
+                        raise
+                    logger.error(
+                        f"Address {proxy_self.address} error "
+                        f"(attempt {attempt + 1}/{proxy_self.reconnect_attempts + 1}): {ex}"
+                    )
+            else:
+                raise Exception(f"Address {proxy_self.address} failed after {proxy_self.reconnect_attempts + 1} attempts")
+
+            async for item in iterate_stream_aio(call, first, item_adapter, codec):
+                yield item
+
+        wrapped.__name__ = func_metadata.name
+        return wrapped
+
+    def __str__(self):
+        return f"ptag-client-aio('{get_full_name(self.service_interface)}' -> '{self.address}')"
+
+
+def ptag_attach_aio(
+    server: aio.Server,
+    service_object,
+    executor: Executor | None = None,
+    caches: dict[str, PTAGCacheConfig | None] | None = None,
+) -> WrappedPTAGServiceAio:
+    """
+    Attach a service object implementing the interface to a grpc.aio server.
+    Sync methods of the service are offloaded to `executor`, `caches` is the same as for `ptag_attach`.
+    """
+    service = WrappedPTAGServiceAio(service_object, executor=executor, caches=caches)
+    add_PTAGServiceServicer_to_server(service, server)
+    return service
+
+
+def ptag_client_aio(
+    service_interface: type[T], address: str, reconnect_attempts: int = 5, codec: str = JSON_CODEC_NAME
+) -> T:
+    """
+    Create a dynamic client with awaitable methods for the given interface at the provided gRPC address.
+    `codec` is the preferred payload codec, used once the server confirms it supports it (JSON otherwise).
+    """
+    address = _try_fix_address(address)
+    proxy = AsyncClientProxy(service_interface, address, reconnect_attempts=reconnect_attempts, codec=codec)
+    return cast(T, proxy)
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14mmar_ptag/ptag.proto\"4\n\x0bPTAGRequest\x12\x14\n\x0c\x46unctionName\x18\x01 \x01(\t\x12\x0f\n\x07Payload\x18\x02 \x01(\x0c\"5\n\x0cPTAGResponse\x12\x14\n\x0c\x46unctionName\x18\x01 \x01(\t\x12\x0f\n\x07Payload\x18\x02 \x01(\x0c\x32\x34\n\x0bPTAGService\x12%\n\x06Invoke\x12\x0c.PTAGRequest\x1a\r.PTAGResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14mmar_ptag/ptag.proto\"4\n\x0bPTAGRequest\x12\x14\n\x0c\x46unctionName\x18\x01 \x01(\t\x12\x0f\n\x07Payload\x18\x02 \x01(\x0c\"5\n\x0cPTAGResponse\x12\x14\n\x0c\x46unctionName\x18\x01 \x01(\t\x12\x0f\n\x07Payload\x18\x02 \x01(\x0c\x32\x63\n\x0bPTAGService\x12%\n\x06Invoke\x12\x0c.PTAGRequest\x1a\r.PTAGResponse\x12-\n\x0cInvokeStream\x12\x0c.PTAGRequest\x1a\r.PTAGResponse0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -36,5 +36,5 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_PTAGRESPONSE']._serialized_start=78
   _globals['_PTAGRESPONSE']._serialized_end=131
   _globals['_PTAGSERVICE']._serialized_start=133
-  _globals['_PTAGSERVICE']._serialized_end=185
+  _globals['_PTAGSERVICE']._serialized_end=232
 # @@protoc_insertion_point(module_scope)
@@ -39,6 +39,11 @@ class PTAGServiceStub(object):
                 request_serializer=mmar__ptag_dot_ptag__pb2.PTAGRequest.SerializeToString,
                 response_deserializer=mmar__ptag_dot_ptag__pb2.PTAGResponse.FromString,
                 _registered_method=True)
+        self.InvokeStream = channel.unary_stream(
+                '/PTAGService/InvokeStream',
+                request_serializer=mmar__ptag_dot_ptag__pb2.PTAGRequest.SerializeToString,
+                response_deserializer=mmar__ptag_dot_ptag__pb2.PTAGResponse.FromString,
+                _registered_method=True)
 
 
 class PTAGServiceServicer(object):
@@ -50,6 +55,13 @@ class PTAGServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def InvokeStream(self, request, context):
+        """for methods returning Iterator[T] / AsyncIterator[T]: one response per element
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_PTAGServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +70,11 @@ def add_PTAGServiceServicer_to_server(servicer, server):
                     request_deserializer=mmar__ptag_dot_ptag__pb2.PTAGRequest.FromString,
                     response_serializer=mmar__ptag_dot_ptag__pb2.PTAGResponse.SerializeToString,
             ),
+            'InvokeStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.InvokeStream,
+                    request_deserializer=mmar__ptag_dot_ptag__pb2.PTAGRequest.FromString,
+                    response_serializer=mmar__ptag_dot_ptag__pb2.PTAGResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'PTAGService', rpc_method_handlers)
@@ -95,3 +112,30 @@ class PTAGService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def InvokeStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/PTAGService/InvokeStream',
+            mmar__ptag_dot_ptag__pb2.PTAGRequest.SerializeToString,
+            mmar__ptag_dot_ptag__pb2.PTAGResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
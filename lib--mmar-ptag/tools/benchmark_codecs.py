@@ -0,0 +1,98 @@
+"""Benchmark PTAG payload codecs on realistic Chat and DocExtractionOutput payloads.
+
+Measures encode (client args / server result) and decode (validation on the other side)
+for every registered codec. Requires `mmar-mapi`; binary codecs need `msgpack` / `cbor2`.
+
+    python tools/benchmark_codecs.py --messages 200 --pages 100 --repeat 50
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pydantic import TypeAdapter
+
+from mmar_mapi.models.chat import AIMessage, Chat, Context, HumanMessage
+from mmar_mapi.services.document_extractor import (
+    DocExtractionOutput,
+    DocExtractionSpec,
+    ExtractedMarkdown,
+    ExtractedPicture,
+    ExtractedTable,
+)
+from mmar_ptag.ptag_codecs import CODECS
+
+LOREM = (
+    "Пациент жалуется на головную боль и слабость в течение трех дней. "
+    "The patient reports headache and weakness for three days; no fever was observed. "
+)
+
+
+def make_chat(messages: int) -> Chat:
+    chat = Chat(context=Context(client_id="bench", user_id="42", session_id="2025-01-01-00-00-00", track_id="Bench"))
+    for ii in range(messages):
+        if ii % 2:
+            chat.add_message(AIMessage(content=LOREM * 4, state=f"STATE_{ii % 7}", extra={"action": "reply"}))
+        else:
+            chat.add_message(HumanMessage(content=[{"type": "text", "text": LOREM * 2}]))
+    return chat
+
+
+def make_extraction(pages: int) -> DocExtractionOutput:
+    markdowns = [ExtractedMarkdown(page=page, text=f"# Page {page}\n\n" + LOREM * 20) for page in range(1, pages + 1)]
+    tables = [
+        ExtractedTable(page=page, formatted_str="| a | b |\n|---|---|\n" + "| 1 | 2 |\n" * 30, caption="Table")
+        for page in range(1, pages + 1, 3)
+    ]
+    pictures = [
+        ExtractedPicture(page=page, image_resource_id=f"res-{page}", annotation="chart", width=640, height=480)
+        for page in range(1, pages + 1, 5)
+    ]
+    return DocExtractionOutput(
+        spec=DocExtractionSpec(),
+        text="\n\n".join(md.text for md in markdowns),
+        markdowns=markdowns,
+        tables=tables,
+        pictures=pictures,
+    )
+
+
+def bench(name: str, adapter: TypeAdapter, obj, repeat: int) -> None:
+    print(f"\n{name}")
+    print(f"{'codec':<10}{'size, KB':>10}{'encode, ms':>12}{'decode, ms':>12}{'total, ms':>12}")
+    for codec in CODECS.values():
+        data = codec.encode(adapter, obj)
+        assert codec.decode(adapter, data) == obj, f"{codec.name}: round-trip mismatch"
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            codec.encode(adapter, obj)
+        t_encode = (time.perf_counter() - t0) / repeat * 1000
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            codec.decode(adapter, data)
+        t_decode = (time.perf_counter() - t0) / repeat * 1000
+
+        total = t_encode + t_decode
+        print(f"{codec.name:<10}{len(data) / 1024:>10.1f}{t_encode:>12.3f}{t_decode:>12.3f}{total:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200, help="messages in the Chat payload")
+    parser.add_argument("--pages", type=int, default=100, help="pages in the DocExtractionOutput payload")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"Codecs: {', '.join(CODECS)}")
+    # args of ChatManagerAPI.get_response-like calls are tuples, results are models
+    bench(f"Chat args ({args.messages} messages)", TypeAdapter(tuple[Chat, str]), (make_chat(args.messages), ""), args.repeat)
+    bench(f"DocExtractionOutput result ({args.pages} pages)", TypeAdapter(DocExtractionOutput), make_extraction(args.pages), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,12 +22,25 @@ class PdfConfig(BaseModel):
     device: Device = "CPU"
     workers: int = 1
     empty_page_chars_threshold: int = 5
+    # consecutive pages converted by docling in one call (split where the force-OCR decision changes)
+    batch_pages: int = 16
+
+
+class CacheConfig(BaseModel):
+    """Server-side cache of `extract` results (resource ids), shared by concurrent identical requests."""
+
+    enabled: bool = True
+    max_bytes: int = 2**20
+    ttl_seconds: float | None = None
+    # shared between workers on the same host, e.g. "/mnt/data/maestro/cache/document-extractor"
+    disk_dir: str | None = None
+    max_disk_bytes: int | None = None
 
 
 class Config(BaseSettings):
     model_config = SettingsConfigDict(env_nested_delimiter="__", extra="ignore")
     files_dir: str = Field(default="/mnt/data/maestro/files")
-    cache_maxsize: int = Field(default=100, description="-1: disabled, 0: enabled infinity, 1+: etc")
+    cache: CacheConfig = Field(default_factory=CacheConfig)
     logger: LoggerConfig = LoggerConfig()
     server: ServerConfig = ServerConfig()
     pdf: PdfConfig = Field(default_factory=PdfConfig)
@@ -1,9 +1,14 @@
 import io
+import multiprocessing
 import os
 import tempfile
+import threading
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import groupby
 from pathlib import Path
-from types import SimpleNamespace
 from typing import Literal
 
 from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
@@ -32,8 +37,8 @@ from mmar_mapi.services import (
     ForceOCR,
     OutputType,
 )
-from mmar_utils import clean_and_fix_text, parallel_map
-from more_itertools import flatten
+from mmar_utils import clean_and_fix_text
+from more_itertools import chunked, flatten
 from PIL import Image as PILImage
 from pypdf import PdfReader
 
@@ -50,6 +55,7 @@ class PdfConfig:
     device: Device
     workers: int
     empty_page_chars_threshold: int
+    batch_pages: int
     output_dir: Path | None = None
 
 
@@ -69,6 +75,50 @@ def is_force_ocr(pdf_cfg: PdfConfig, engine_spec: ExtractionEngineSpec, text_bas
     return len(text_basic) < pdf_cfg.empty_page_chars_threshold
 
 
+ConverterKey = tuple[ExtractionEngineSpec, bool]
+
+
+class ConverterPool:
+    """
+    Idle converters by engine spec and force-OCR flag, kept for the life of the process:
+    docling loads its layout/table/OCR models on the first conversion of every converter.
+    Concurrent requests check out different converters.
+    """
+
+    def __init__(self, build: Callable[[ExtractionEngineSpec, bool], DocumentConverter]):
+        self.build = build
+        self._idle: dict[ConverterKey, list[DocumentConverter]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, spec: ExtractionEngineSpec, force_ocr: bool) -> Iterator[DocumentConverter]:
+        key = (spec, force_ocr)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            converter = idle.pop() if idle else None
+        if converter is None:
+            logger.info(f"Creating converter, force_ocr={force_ocr}: {spec}")
+            converter = self.build(spec, force_ocr)
+        try:
+            yield converter
+        finally:
+            with self._lock:
+                self._idle[key].append(converter)
+
+
+# extractor of a worker process, with its own warm converters
+_worker_extractor: "DoclingDocumentExtractor | None" = None
+
+
+def _init_worker(pdf_cfg: PdfConfig, files_dir: Path) -> None:
+    global _worker_extractor
+    _worker_extractor = DoclingDocumentExtractor(pdf_cfg, FileStorage(files_dir))
+
+
+def _extract_page_range_in_worker(args: tuple[FilePath, DocExtractionSpec]) -> list[DocExtractionOutput | None]:
+    return _worker_extractor._extract_page_range_safe(args)
+
+
 class DoclingDocumentExtractor:
     def __init__(self, pdf_cfg: PdfConfig, file_storage: FileStorage):
         device = pdf_cfg.device
@@ -78,6 +128,9 @@ class DoclingDocumentExtractor:
         )
         self.pdf_cfg = pdf_cfg
         self.file_storage = file_storage
+        self.converters = ConverterPool(self._setup_converter)
+        self._executor: Executor | None = None
+        self._executor_lock = threading.Lock()
         logger.info(f"Docling settings: {settings}")
         # self.chunks = pdf_cfg.chunks
 
@@ -263,65 +316,79 @@ class DoclingDocumentExtractor:
             page_range_all = spec.page_range or (1, pages_count)
             page_ranges = split_range(page_range_all, chunks=self.pdf_cfg.workers)
             args_list = [(pdf_path, spec.with_page_range(pr)) for pr in page_ranges]
-
-            outputs_list = parallel_map(
-                func=self._extract_page_range_safe,
-                items=args_list,
-                process=True,
-                max_workers=self.pdf_cfg.workers,
-                desc="OCR in parallel",
-            )
+            outputs_list = list(self._get_executor().map(_extract_page_range_in_worker, args_list))
         outputs = list(flatten(outputs_list))
         res = merge_outputs(outputs)
         return res
 
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                # workers live across requests, so their converters stay warm
+                # spawn: forking a process with running gRPC threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.pdf_cfg.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.pdf_cfg, self.file_storage.files_dir),
+                )
+            return self._executor
+
     def _extract_page_range_safe(self, args: tuple[FilePath, DocExtractionSpec]) -> list[DocExtractionOutput | None]:
         pdf_path, spec = args
         page_range = spec.page_range
         start = time.time()
-        converter = self._setup_converter(spec.engine, force_ocr=False)
-        converter_force_ocr = self._setup_converter(spec.engine, force_ocr=True)
+        texts_basic = self.__extract_basic(args)
 
-        converters = SimpleNamespace(
-            converter=converter,
-            converter_force_ocr=converter_force_ocr,
-        )
+        def batch_key(page_num: int) -> bool | None:
+            text_basic = texts_basic[page_num]
+            # None: basic extraction failed, the page is skipped
+            return None if text_basic is None else is_force_ocr(self.pdf_cfg, spec.engine, text_basic)
 
-        p_a, p_b = page_range
         outputs = []
-        for pi in range(p_a, p_b + 1):
-            spec_page = spec.with_page_range((pi, pi))
-            inner_args = (pdf_path, spec_page)
-            output = self._extract_page_safe(converters, inner_args)
-            outputs.append(output)
+        for force_ocr, group in groupby(texts_basic, key=batch_key):
+            for pages in chunked(group, self.pdf_cfg.batch_pages):
+                if force_ocr is None:
+                    # error is already logged
+                    outputs.extend(DocExtractionOutput(spec=spec.with_page_range((pi, pi))) for pi in pages)
+                    continue
+                spec_batch = spec.with_page_range((pages[0], pages[-1]))
+                outputs.extend(self._extract_batch_safe((pdf_path, spec_batch), force_ocr, texts_basic))
 
         elapsed = time.time() - start
         logger.debug(f"Processed page_range {page_range} in {elapsed:.2f} seconds")
         return outputs
 
-    def _extract_page_safe(self, converters, args: tuple[FilePath, DocExtractionSpec]) -> DocExtractionOutput | None:
+    def _extract_batch_safe(
+        self, args: tuple[FilePath, DocExtractionSpec], force_ocr: bool, texts_basic: dict[int, str | None]
+    ) -> list[DocExtractionOutput]:
+        """Pages of the batch in one conversion, page by page if it fails."""
+        pdf_path, spec = args
+        p_a, p_b = spec.page_range
+        if p_a == p_b:
+            return [self._extract_page_safe(args, force_ocr, texts_basic[p_a])]
+        try:
+            with self.converters.acquire(spec.engine, force_ocr) as converter:
+                return [self.__extract_page(converter, args)]
+        except Exception as ex:
+            logger.warning(f"Failed to extract page_range={spec.page_range}: {ex!r}, fallback to page by page")
+        return [
+            self._extract_page_safe((pdf_path, spec.with_page_range((pi, pi))), force_ocr, texts_basic[pi])
+            for pi in range(p_a, p_b + 1)
+        ]
+
+    def _extract_page_safe(
+        self, args: tuple[FilePath, DocExtractionSpec], force_ocr: bool, text_basic: str
+    ) -> DocExtractionOutput:
         pdf_path, spec = args
         page_num = spec.page_range[0]
         assert spec.page_range[0] == spec.page_range[1]
 
-        text_basic = self.__extract_basic(args)
-        if text_basic is None:
-            # error is already logged
-            return DocExtractionOutput(spec=spec)
-
-        force_ocr = is_force_ocr(self.pdf_cfg, spec.engine, text_basic)
-        if force_ocr:
-            converter = converters.converter_force_ocr
-        else:
-            converter = converters.converter
-
         try:
-            # here assumed that `extract_text()` is fast
-            # also it's possible to reuse created reader, but unlikely it'll gain significant amount of time
-
             # todo fallback to `ignore tesseract detection if fails`
             # todo check CUDA exception and retry if fails
-            return self.__extract_page(converter, args)
+            with self.converters.acquire(spec.engine, force_ocr) as converter:
+                return self.__extract_page(converter, args)
         except Exception as ex:
             if isinstance(ex, TypeError) and ex.args[0] == "'NoneType' object is not subscriptable":
                 # File "/app/ocr/.venv/lib/python3.13/site-packages/docling/models/tesseract_ocr_model.py", line 161, in __call__
@@ -332,23 +399,26 @@ class DoclingDocumentExtractor:
                 logger.exception(f"Failed to extract for page_num={page_num}, fallback to basic")
             return DocExtractionOutput(spec=spec, text=text_basic)
 
-    def __extract_basic(self, args: tuple[FilePath, DocExtractionSpec]) -> str | None:
+    def __extract_basic(self, args: tuple[FilePath, DocExtractionSpec]) -> dict[int, str | None]:
+        """Text of every page of the range by pypdf (one reader for the range), None where it failed."""
         pdf_path, spec = args
-        assert spec.page_range[0] == spec.page_range[1]
-
-        # spec, pdf_path, page_num = args
-        page_i = spec.page_range[0] - 1
+        p_a, p_b = spec.page_range
+        texts_basic: dict[int, str | None] = dict.fromkeys(range(p_a, p_b + 1))
         try:
             reader = PdfReader(pdf_path)
-            text_basic = reader.pages[page_i].extract_text().strip()
-            return text_basic
         except Exception:
-            logger.exception(f"Basic text extraction failed for page_i={page_i}")
-            return None
+            logger.exception(f"Basic text extraction failed for page_range={spec.page_range}")
+            return texts_basic
+        for page_num in texts_basic:
+            page_i = page_num - 1
+            try:
+                texts_basic[page_num] = reader.pages[page_i].extract_text().strip()
+            except Exception:
+                logger.exception(f"Basic text extraction failed for page_i={page_i}")
+        return texts_basic
 
     def __extract_page(self, converter, args: tuple[FilePath, DocExtractionSpec]) -> DocExtractionOutput:
         pdf_path, spec = args
-        assert spec.page_range[0] == spec.page_range[1]
         assert os.path.exists(pdf_path)
 
         conversion_result = converter.convert(pdf_path, page_range=spec.page_range)
@@ -1,7 +1,7 @@
 import json
 
 from loguru import logger
-from mmar_mapi import FileStorage, maybe_lru_cache
+from mmar_mapi import FileStorage
 from mmar_mapi.services import DocExtractionOutput, DocExtractionSpec, DocumentExtractorAPI, ResourceId, DOC_SPEC_DEFAULT
 
 from document_extractor.config import Config
@@ -13,14 +13,10 @@ class DocumentExtractor(DocumentExtractorAPI):
     def __init__(self, config: Config):
         self.file_storage = FileStorage(config.files_dir)
         self.docling_document_extractor = DoclingDocumentExtractor(config.pdf, file_storage=self.file_storage)
-        self._extract = maybe_lru_cache(maxsize=config.cache_maxsize, func=self._extract)
 
+    # results are cached (and concurrent identical calls coalesced) by mmar-ptag, see main.py
     @trace_duration(logger, label="extract", show_args=True)
     def extract(self, *, resource_id: ResourceId, spec: DocExtractionSpec = DOC_SPEC_DEFAULT) -> ResourceId | None:
-        return self._extract(resource_id, spec)
-
-    # todo fix workaround: right now mmar-ptag don't respect methods, decorated in __init__
-    def _extract(self, resource_id: ResourceId, spec: DocExtractionSpec) -> ResourceId | None:
         # todo validate resource_id and return None if bad
         doc_bytes = self.file_storage.download(resource_id)
         doc_type = resource_id.split(".")[-1].lower()
@@ -1,13 +1,26 @@
 import os
 
 from mmar_mimpl import init_logger
-from mmar_ptag import grpc_server, ptag_attach
+from mmar_ptag import PTAGCacheConfig, grpc_server, ptag_attach
 from loguru import logger
 
-from document_extractor.config import Config, load_config
+from document_extractor.config import CacheConfig, Config, load_config
 from document_extractor.document_extractor import DocumentExtractor
 
 
+def create_cache_config(config: CacheConfig) -> PTAGCacheConfig | None:
+    if not config.enabled:
+        return None
+    return PTAGCacheConfig(
+        max_bytes=config.max_bytes,
+        ttl=config.ttl_seconds,
+        disk_dir=config.disk_dir,
+        max_disk_bytes=config.max_disk_bytes,
+        # extract returns None on failures: don't keep them
+        cache_none=False,
+    )
+
+
 def main():
     config: Config = load_config()
     init_logger(config.logger.level)
@@ -17,7 +30,7 @@ def main():
     os.environ["GRPC_ENABLE_FORK_SUPPORT"] = "False"
 
     server = grpc_server(max_workers=config.server.max_workers, port=config.server.port)
-    ptag_attach(server, DocumentExtractor(config))
+    ptag_attach(server, DocumentExtractor(config), caches={"extract": create_cache_config(config.cache)})
     server.start()
     logger.info(f"Server started, listening on {config.server.port}")
     server.wait_for_termination()
@@ -0,0 +1,26 @@
+"""sessions listing index
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 10:12:37.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '002'
+down_revision: Union[str, Sequence[str], None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("idx__sessions__client_id__user_id__id", "sessions", ["client_id", "user_id", "id"])
+    op.drop_index("idx__sessions__client_id__user_id", table_name="sessions")
+
+
+def downgrade() -> None:
+    op.create_index("idx__sessions__client_id__user_id", "sessions", ["client_id", "user_id"])
+    op.drop_index("idx__sessions__client_id__user_id__id", table_name="sessions")
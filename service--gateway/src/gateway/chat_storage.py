@@ -1,15 +1,20 @@
+import json
+import os
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
 
 from loguru import logger
-from mmar_mapi import Chat, Context
+from mmar_mapi import Chat, ChatMessage, Context
 from mmar_utils import Either
+from pydantic import TypeAdapter
 
 from gateway.io_fs import ensure_existing_dir
 
 from .models import DBChatInfoItem, DBChatPreviews
 
+MESSAGES_ADAPTER = TypeAdapter(list[ChatMessage])
+
 
 class ChatStorageAPI(ABC):
     @abstractmethod
@@ -21,6 +26,10 @@ class ChatStorageAPI(ABC):
     @abstractmethod
     async def dump_chat(self, chat: Chat) -> None: ...
 
+    @abstractmethod
+    async def append_messages(self, chat_id: str, from_position: int, messages: list[ChatMessage]) -> None:
+        """Store `messages` at positions `from_position, from_position + 1, ...` of an existing chat."""
+
     @abstractmethod
     async def has_chat(self, context: Context) -> bool: ...
 
@@ -28,13 +37,27 @@ class ChatStorageAPI(ABC):
     async def delete_chat_by_chat_id(self, chat_id: str) -> Either[str, None]: ...
 
     @abstractmethod
-    async def load_chat_previews_by_user_id(self, client_id: str, user_id: str) -> DBChatPreviews: ...
+    async def load_chat_previews_by_user_id(
+        self, client_id: str, user_id: str, limit: int | None = None, cursor: str | None = None
+    ) -> DBChatPreviews:
+        """Chats of the user, newest first; `limit` / `cursor` for keyset pagination (ValueError on a bad cursor)."""
 
 
 class ChatStorageFS(ChatStorageAPI):
-    def __init__(self, logs_dir: str, logs_dir_archived: str | None = None):
+    """
+    Chat is stored as `<chat_id>.json` snapshot plus `<chat_id>.log.jsonl` with appended messages
+    (one `{"position": ..., "message": ...}` per line); the log is merged into the snapshot
+    every `compact_every` messages and on `dump_chat`.
+    """
+
+    def __init__(self, logs_dir: str, logs_dir_archived: str | None = None, compact_every: int = 32):
+        self.compact_every = compact_every
         self.logs_dir: Path = ensure_existing_dir(logs_dir)
         self.logs_dir_archived: Path | None = ensure_existing_dir(logs_dir_archived) if logs_dir_archived else None
+        # chat_id -> (mtime_ns, preview): chat files are parsed again only when they change
+        self._previews: dict[str, tuple[int, DBChatInfoItem]] = {}
+        # chat_id -> (files signature, stored messages count): appends don't re-read the chat
+        self._counts: dict[str, tuple[tuple[int, int], int]] = {}
 
     def _make_fpath(self, context: Context) -> Path:
         return self.logs_dir / f"{context.create_id()}.json"
@@ -42,13 +65,69 @@ class ChatStorageFS(ChatStorageAPI):
     def _get_chat_path(self, chat_id: str) -> Path:
         return self.logs_dir / f"{chat_id}.json"
 
+    @staticmethod
+    def _get_log_path(chat_path: Path) -> Path:
+        return chat_path.with_suffix(".log.jsonl")
+
+    def _read_chat(self, chat_path: Path) -> Chat:
+        chat = Chat.parse(chat_path.read_text())
+        log_path = self._get_log_path(chat_path)
+        if not log_path.exists():
+            return chat
+        for line in log_path.read_text().splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # torn last line after a crash: the message was not acknowledged
+                logger.warning(f"Skipping malformed line in {log_path}")
+                continue
+            position = entry["position"]
+            if position < len(chat.messages):
+                # already stored: a crash between compaction and log removal, or a retried append
+                if chat.messages[position].model_dump(mode="json") != entry["message"]:
+                    raise ValueError(f"Conflicting message at position {position} in {log_path}")
+                continue
+            if position > len(chat.messages):
+                raise ValueError(f"Missing messages before position {position} in {log_path}")
+            [message] = MESSAGES_ADAPTER.validate_python([entry["message"]])
+            chat.messages.append(message)
+        return chat
+
+    def _signature(self, chat_path: Path) -> tuple[int, int]:
+        log_path = self._get_log_path(chat_path)
+        log_size = log_path.stat().st_size if log_path.exists() else -1
+        return chat_path.stat().st_mtime_ns, log_size
+
+    def _stored_count(self, chat_id: str, chat_path: Path) -> int:
+        signature = self._signature(chat_path)
+        cached = self._counts.get(chat_id)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        count = len(self._read_chat(chat_path).messages)
+        self._counts[chat_id] = (signature, count)
+        return count
+
+    def _check_retried_messages(self, chat_path: Path, from_position: int, messages: list[ChatMessage]) -> None:
+        """Messages at already stored positions must be the stored ones (a retry), not another writer's ones."""
+        stored = self._read_chat(chat_path).messages[from_position : from_position + len(messages)]
+        if [message.model_dump(mode="json") for message in stored] != [
+            message.model_dump(mode="json") for message in messages
+        ]:
+            raise ValueError(f"Conflicting append to chat {chat_path.stem}: position {from_position} is already taken")
+
+    def _write_chat(self, chat_path: Path, chat: Chat) -> None:
+        tmp_path = chat_path.with_suffix(".json.tmp")
+        tmp_path.write_text(chat.model_dump_json(indent=2))
+        tmp_path.replace(chat_path)
+        self._get_log_path(chat_path).unlink(missing_ok=True)
+
     async def load_chat(self, context: Context) -> Chat:
         fpath = self._make_fpath(context)
         if not fpath.exists():
             logger.info(f"New session created, fpath: {fpath}")
             return Chat(context=context)
         try:
-            chat = Chat.parse(fpath.read_text())
+            chat = self._read_chat(fpath)
             logger.info(f"Old session loaded, fpath: {fpath}")
         except Exception:
             logger.error(f"Failed to parse chat: {fpath}")
@@ -56,8 +135,39 @@ class ChatStorageFS(ChatStorageAPI):
         return chat
 
     async def dump_chat(self, chat: Chat) -> None:
-        fpath = self._make_fpath(chat.context)
-        fpath.write_text(chat.model_dump_json(indent=2))
+        self._write_chat(self._make_fpath(chat.context), chat)
+
+    async def append_messages(self, chat_id: str, from_position: int, messages: list[ChatMessage]) -> None:
+        chat_path = self._get_chat_path(chat_id)
+        if not chat_path.exists():
+            raise ValueError(f"Chat not found: {chat_id}")
+        count = self._stored_count(chat_id, chat_path)
+        if from_position > count:
+            raise ValueError(f"Append to chat {chat_id} at {from_position}, but only {count} messages are stored")
+        if from_position < count:
+            # a retry: the already stored part must match, the rest is appended
+            self._check_retried_messages(chat_path, from_position, messages[: count - from_position])
+            messages = messages[count - from_position :]
+            from_position = count
+            if not messages:
+                return
+        log_path = self._get_log_path(chat_path)
+        lines = [
+            json.dumps({"position": from_position + ii, "message": message.model_dump(mode="json")}, ensure_ascii=False)
+            for ii, message in enumerate(messages)
+        ]
+        with log_path.open("a+b") as log_file:
+            # start on a new line if the previous append was torn
+            if log_file.seek(0, os.SEEK_END) > 0:
+                log_file.seek(-1, os.SEEK_END)
+                if log_file.read(1) != b"\n":
+                    log_file.write(b"\n")
+            log_file.write("".join(f"{line}\n" for line in lines).encode())
+
+        # compact each time the chat grows past another `compact_every` messages
+        if from_position // self.compact_every != (from_position + len(messages)) // self.compact_every:
+            self._write_chat(chat_path, self._read_chat(chat_path))
+        self._counts[chat_id] = (self._signature(chat_path), count + len(messages))
 
     async def has_chat(self, context: Context) -> bool:
         return self._make_fpath(context).exists()
@@ -80,7 +190,7 @@ class ChatStorageFS(ChatStorageAPI):
                 return f"Chat not found: {chat_id}", None
 
         try:
-            chat = Chat.parse(chat_path.read_text())
+            chat = self._read_chat(chat_path)
         except Exception as ex:
             logger.error(f"Failed to parse {chat_path}: {ex}")
             return f"Failed to parse chat: {chat_id}", None
@@ -99,28 +209,58 @@ class ChatStorageFS(ChatStorageAPI):
         if archived_path.exists():
             archived_path = self.logs_dir_archived / f"{chat_id}_{int(datetime.now().timestamp())}.json"
 
+        if self._get_log_path(chat_path).exists():
+            self._write_chat(chat_path, self._read_chat(chat_path))
         chat_path.replace(archived_path)
         return None, None
 
-    async def load_chat_previews_by_user_id(self, client_id: str, user_id: str) -> DBChatPreviews:
-        chat_ids = [p.stem for p in self.logs_dir.glob(f"client_{client_id}_user_{user_id}_session_*.json")]
+    async def load_chat_previews_by_user_id(
+        self, client_id: str, user_id: str, limit: int | None = None, cursor: str | None = None
+    ) -> DBChatPreviews:
+        # session ids are timestamps: reverse order of chat ids is newest first, the cursor is the last chat_id
+        fpaths = self.logs_dir.glob(f"client_{client_id}_user_{user_id}_session_*.json")
+        chat_ids = sorted((p.stem for p in fpaths), reverse=True)
+        if cursor is not None:
+            chat_ids = [chat_id for chat_id in chat_ids if chat_id < cursor]
+        next_cursor = None
+        if limit is not None and len(chat_ids) > limit:
+            chat_ids = chat_ids[:limit]
+            next_cursor = chat_ids[-1]
+
         chat_previews: list[DBChatInfoItem] = []
         for chat_id in chat_ids:
-            err, chat = await self.load_chat_by_chat_id(chat_id)
-            if err:
-                logger.error(f"Failed to load chat with chat_id={chat_id}: {err}")
-                continue
-            assert chat is not None
-            first_message, first_message_date = None, None
-            if len(messages := chat.messages) > 2:
-                first_message = messages[2].text
-                first_message_date = messages[2].date_time
-            chat_previews.append(
-                DBChatInfoItem(
-                    chat_id=chat_id,
-                    first_replica=first_message,
-                    first_replica_date=first_message_date,
-                    track_id=chat.context.track_id,
-                )
-            )
-        return DBChatPreviews(chat_previews=chat_previews)
+            preview = await self._load_chat_preview(chat_id)
+            if preview is not None:
+                chat_previews.append(preview)
+        return DBChatPreviews(chat_previews=chat_previews, next_cursor=next_cursor)
+
+    async def _load_chat_preview(self, chat_id: str) -> DBChatInfoItem | None:
+        chat_path = self._get_chat_path(chat_id)
+        try:
+            mtime_ns = chat_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        log_path = self._get_log_path(chat_path)
+        if log_path.exists():
+            mtime_ns = max(mtime_ns, log_path.stat().st_mtime_ns)
+        cached = self._previews.get(chat_id)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        err, chat = await self.load_chat_by_chat_id(chat_id)
+        if err:
+            logger.error(f"Failed to load chat with chat_id={chat_id}: {err}")
+            return None
+        assert chat is not None
+        first_message, first_message_date = None, None
+        if len(messages := chat.messages) > 2:
+            first_message = messages[2].text
+            first_message_date = messages[2].date_time
+        preview = DBChatInfoItem(
+            chat_id=chat_id,
+            first_replica=first_message,
+            first_replica_date=first_message_date,
+            track_id=chat.context.track_id,
+        )
+        self._previews[chat_id] = (mtime_ns, preview)
+        return preview
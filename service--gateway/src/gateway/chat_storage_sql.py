@@ -1,11 +1,13 @@
-from typing import cast
+import json
+from typing import Any, cast
 
 from loguru import logger
 from mmar_mapi import AIMessage, BaseMessage, Chat, ChatMessage, Context, HumanMessage, MiscMessage
 from mmar_utils import Either
-from sqlalchemy import delete, func, select
+from sqlalchemy import and_, delete, func, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from gateway.chat_storage import ChatStorageAPI
 from gateway.db import ContextModel, MessageModel, SqlAlchemyDatabase
@@ -17,6 +19,9 @@ MESSAGE_CLASSES: dict[str, type[BaseMessage]] = {
     "misc": MiscMessage,
 }
 
+# messages #0 and #1 are service ones, #2 is the first user replica
+FIRST_REPLICA_POSITION = 2
+
 
 def _session_to_context(session: ContextModel) -> Context:
     return Context(
@@ -40,6 +45,31 @@ def _message_to_model(msg: ChatMessage, position: int) -> MessageModel:
     )
 
 
+def _message_to_row(msg: ChatMessage, position: int, session_id: int) -> dict[str, Any]:
+    dump = msg.model_dump()
+    return {
+        "session_id": session_id,
+        "position": position,
+        "type": dump["type"],
+        "content": dump["content"],
+        "state": dump.get("state", ""),
+        "date_time": dump["date_time"],
+        "extra": dump.get("extra"),
+    }
+
+
+# columns of a message row written by `append_messages`, compared when a retry hits existing positions
+MESSAGE_ROW_FIELDS = ("type", "content", "state", "date_time", "extra")
+
+
+def _same_row(model: MessageModel, row: dict[str, Any]) -> bool:
+    # JSONB values come back as parsed JSON: compare both sides in that form
+    def as_json(value: Any) -> Any:
+        return json.loads(json.dumps(value))
+
+    return all(as_json(getattr(model, field)) == as_json(row[field]) for field in MESSAGE_ROW_FIELDS)
+
+
 def _model_to_message(model: MessageModel) -> ChatMessage:
     cls = MESSAGE_CLASSES.get(model.type)
     if cls is None:
@@ -56,6 +86,11 @@ def _model_to_message(model: MessageModel) -> ChatMessage:
     return cast(ChatMessage, cls.model_validate(data))
 
 
+def _content_to_text(content: Any) -> str:
+    # same as `message.text`, without validating the whole message
+    return BaseMessage.model_construct(content=content).text
+
+
 class ChatStorageSQL(ChatStorageAPI):
     def __init__(self, db: SqlAlchemyDatabase) -> None:
         self._db = db
@@ -131,6 +166,46 @@ class ChatStorageSQL(ChatStorageAPI):
 
             await session.commit()
 
+    async def append_messages(self, chat_id: str, from_position: int, messages: list[ChatMessage]) -> None:
+        async with self._db.session() as session:
+            result = await session.execute(
+                update(ContextModel)
+                .where(ContextModel.chat_id == chat_id)
+                .values(updated_at=func.now())
+                .returning(ContextModel.id)
+            )
+            db_session_id = result.scalar_one_or_none()
+            if db_session_id is None:
+                raise ValueError(f"Chat not found: {chat_id}")
+
+            if messages:
+                rows = [
+                    _message_to_row(msg, position=from_position + ii, session_id=db_session_id)
+                    for ii, msg in enumerate(messages)
+                ]
+                # retried appends are no-ops thanks to the unique (session_id, position)
+                result = await session.execute(
+                    pg_insert(MessageModel).values(rows).on_conflict_do_nothing().returning(MessageModel.position)
+                )
+                inserted = set(result.scalars())
+                if len(inserted) < len(rows):
+                    await self._check_retried_rows(session, db_session_id, chat_id, rows, inserted)
+            await session.commit()
+
+    async def _check_retried_rows(
+        self, session: AsyncSession, db_session_id: int, chat_id: str, rows: list[dict[str, Any]], inserted: set[int]
+    ) -> None:
+        """Rows skipped on conflict must be the same messages (a retry), not another writer's ones."""
+        skipped = {row["position"]: row for row in rows if row["position"] not in inserted}
+        stmt = select(MessageModel).where(
+            MessageModel.session_id == db_session_id, MessageModel.position.in_(list(skipped))
+        )
+        result = await session.execute(stmt)
+        for model in result.scalars():
+            if not _same_row(model, skipped[model.position]):
+                # the session is not committed: the rows inserted above are rolled back
+                raise ValueError(f"Conflicting append to chat {chat_id}: position {model.position} is already taken")
+
     async def has_chat(self, context: Context) -> bool:
         chat_id = context.create_id()
         async with self._db.session() as session:
@@ -146,43 +221,47 @@ class ChatStorageSQL(ChatStorageAPI):
                 return f"Chat not found: {chat_id}", None
             return None, None
 
-    # TODO: optimize N+1 queries — consider JOIN or selectinload for messages
-    async def load_chat_previews_by_user_id(self, client_id: str, user_id: str) -> DBChatPreviews:
+    async def load_chat_previews_by_user_id(
+        self, client_id: str, user_id: str, limit: int | None = None, cursor: str | None = None
+    ) -> DBChatPreviews:
+        # one query: sessions newest first, each joined with its first replica (unique index on session_id, position)
+        stmt = (
+            select(
+                ContextModel.id,
+                ContextModel.chat_id,
+                ContextModel.track_id,
+                MessageModel.content,
+                MessageModel.date_time,
+            )
+            .outerjoin(
+                MessageModel,
+                and_(MessageModel.session_id == ContextModel.id, MessageModel.position == FIRST_REPLICA_POSITION),
+            )
+            .where(ContextModel.client_id == client_id, ContextModel.user_id == user_id)
+            .order_by(ContextModel.id.desc())
+        )
+        if cursor is not None:
+            if not cursor.isdigit():
+                raise ValueError(f"Invalid cursor: {cursor}")
+            stmt = stmt.where(ContextModel.id < int(cursor))
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+
         async with self._db.session() as session:
-            rows = await session.execute(
-                select(ContextModel).where(
-                    ContextModel.client_id == client_id,
-                    ContextModel.user_id == user_id,
-                )
+            rows = (await session.execute(stmt)).all()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = str(rows[-1].id)
+
+        chat_previews = [
+            DBChatInfoItem(
+                chat_id=row.chat_id,
+                first_replica=_content_to_text(row.content) if row.content is not None else None,
+                first_replica_date=row.date_time,
+                track_id=row.track_id,
             )
-            db_sessions = rows.scalars().all()
-
-            chat_previews: list[DBChatInfoItem] = []
-            for db_session in db_sessions:
-                try:
-                    messages_rows = await session.execute(
-                        select(MessageModel)
-                        .where(MessageModel.session_id == db_session.id)
-                        .order_by(MessageModel.position)
-                        .limit(3)
-                    )
-                    messages = messages_rows.scalars().all()
-
-                    first_message, first_message_date = None, None
-                    if len(messages) > 2:
-                        msg = _model_to_message(messages[2])
-                        first_message = msg.text
-                        first_message_date = messages[2].date_time
-
-                    chat_previews.append(
-                        DBChatInfoItem(
-                            chat_id=db_session.chat_id,
-                            first_replica=first_message,
-                            first_replica_date=first_message_date,
-                            track_id=db_session.track_id,
-                        )
-                    )
-                except Exception:
-                    logger.exception(f"Failed to load preview for chat_id={db_session.chat_id}")
-
-            return DBChatPreviews(chat_previews=chat_previews)
+            for row in rows
+        ]
+        return DBChatPreviews(chat_previews=chat_previews, next_cursor=next_cursor)
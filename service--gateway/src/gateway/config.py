@@ -26,7 +26,7 @@ class FilesConfig(BaseModel):
         "application/vnd.openxmlformats-officedocument.presentationml.presentation",
     }  # only if mime-type != content-type
     max_file_size: int = 200 * 1024**2  # 200 MB
-    read_chunk_size: int = 10 * 1024  # 10 KB
+    read_chunk_size: int = 1024**2  # 1 MB
 
 
 class FastApiConfig(BaseModel):
@@ -52,6 +52,11 @@ class ChatStorageConfig(BaseModel):
     extra: dict[str, Any] | None = None
 
 
+class HotChatsConfig(BaseModel):
+    # recently active chats kept in memory (write-through); 0 disables
+    max_bytes: int = 64 * 1024**2  # 64 MB
+
+
 class Config(BaseSettings):
     model_config = SettingsConfigDict(env_nested_delimiter="__", extra="ignore")
     version: str = "dev"
@@ -61,6 +66,7 @@ class Config(BaseSettings):
     fastapi: FastApiConfig = FastApiConfig()
     addresses: AddressesConfig = AddressesConfig()
     chat_storage: ChatStorageConfig
+    hot_chats: HotChatsConfig = HotChatsConfig()
 
     openai_api_base: str = ""
     openai_api_key: str = ""
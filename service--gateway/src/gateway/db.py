@@ -29,7 +29,8 @@ class ContextModel(Base):
     messages: Mapped[list["MessageModel"]] = relationship(back_populates="session", cascade="all, delete-orphan")
 
     __table_args__ = (
-        Index("idx__sessions__client_id__user_id", "client_id", "user_id"),
+        # listing chats of a user newest first, keyset-paginated by id
+        Index("idx__sessions__client_id__user_id__id", "client_id", "user_id", "id"),
     )
 
 
@@ -1,39 +1,33 @@
-import io
-from urllib.parse import quote
+import asyncio
 
 import magic
 from fastapi import UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse
 from loguru import logger
+from mmar_mapi import FileStorage, ResourceId
 
 from gateway.config import Config
-from gateway.fastapi_errors import MaxFileSizeExceededException, WrongContentTypeException, WrongMimeTypeException
+from gateway.fastapi_errors import (
+    FileNotFoundException,
+    MaxFileSizeExceededException,
+    WrongContentTypeException,
+    WrongMimeTypeException,
+)
 
 FileName = str
-FileData = tuple[FileName, bytes]
 
 
-def make_streaming_response(f_data: FileData) -> StreamingResponse:
-    f_name, f_bytes = f_data
-    file_like = io.BytesIO(f_bytes)
-    try:
-        ascii_filename = f_name.encode("ascii").decode("ascii")
-        content_disposition = f'attachment; filename="{ascii_filename}"'
-    except UnicodeEncodeError:
-        encoded_filename = quote(f_name)
-        content_disposition = f"attachment; filename*=UTF-8''{encoded_filename}"
-    headers = {
-        "Content-Disposition": content_disposition,
-        "Content-Length": str(len(f_bytes)),
-    }
-    return StreamingResponse(
-        file_like,
-        media_type="application/octet-stream",
-        headers=headers,
-    )
+def make_file_response(file_storage: FileStorage, resource_id: ResourceId) -> FileResponse:
+    """Stream the stored file from disk in chunks; `Range` requests get partial content (206)."""
+    path = file_storage.get_path(resource_id)
+    if path is None:
+        raise FileNotFoundException()
+    f_name = file_storage.get_fname(resource_id) or f"result.{path.suffix.removeprefix('.')}"
+    # Content-Disposition (with RFC 5987 encoding for non-ascii names) and Content-Length are set from the file
+    return FileResponse(path, media_type="application/octet-stream", filename=f_name)
 
 
-async def load_file(config: Config, file: UploadFile) -> FileData:
+async def make_file_name(config: Config, file: UploadFile) -> FileName:
     file_name = file.filename
     if not file_name:
         extension = await validate_allowed_type(config, file)
@@ -41,20 +35,21 @@ async def load_file(config: Config, file: UploadFile) -> FileData:
     elif "." not in file_name:
         extension = await validate_allowed_type(config, file)
         file_name = f"{file_name}.{extension}"
-    content: bytes = await read_file(config, file)
-    return file_name, content
+    return file_name
 
 
-async def read_file(config: Config, file: UploadFile) -> bytes:
-    file_length: int = 0
-    file_contents = bytes(0)
-    while content := await file.read(config.fastapi.files.read_chunk_size):
-        file_length += len(content)
-        if file_length > config.fastapi.files.max_file_size:
-            raise MaxFileSizeExceededException()
-
-        file_contents += content
-    return file_contents
+async def upload_file(config: Config, file_storage: FileStorage, file: UploadFile, file_name: FileName) -> ResourceId:
+    """
+    Copy the upload into the storage chunk by chunk: it is spooled to a temporary file while hashed
+    and atomically renamed into the storage, so the whole file is never held in memory.
+    """
+    max_file_size = config.fastapi.files.max_file_size
+    with file_storage.open_upload(file_name) as upload:
+        while content := await file.read(config.fastapi.files.read_chunk_size):
+            if upload.size + len(content) > max_file_size:
+                raise MaxFileSizeExceededException()
+            await asyncio.to_thread(upload.write, content)
+        return await asyncio.to_thread(upload.commit)
 
 
 async def validate_allowed_type(config: Config, file: UploadFile) -> str:
@@ -0,0 +1,101 @@
+import asyncio
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from loguru import logger
+from mmar_mapi import Chat, ChatMessage
+
+
+# rough size of a chat without messages, so that empty chats still count
+CHAT_OVERHEAD = 256
+
+
+@dataclass
+class _HotChat:
+    chat: Chat
+    # number of messages known to be stored
+    version: int
+    size: int
+
+
+def _copy_chat(chat: Chat) -> Chat:
+    # messages are never modified in place: copying the list is enough
+    return chat.model_copy(update={"messages": list(chat.messages)})
+
+
+def _messages_size(messages: list[ChatMessage]) -> int:
+    return sum(len(message.model_dump_json()) for message in messages)
+
+
+class HotChats:
+    """
+    Write-through cache of recently active chats, LRU-evicted by the total size of their messages.
+
+    Callers get copies, change them, write the change to storage and then `commit` it here.
+    The `version` of an entry is the number of stored messages: a commit that doesn't continue
+    from it means the cached copy diverged from storage, and the entry is dropped.
+    Per-chat locks serialize turns of one chat, so concurrent messages don't lose writes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, _HotChat] = OrderedDict()
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def lock(self, chat_id: str) -> asyncio.Lock:
+        lock = self._locks.get(chat_id)
+        if lock is None:
+            lock = self._locks[chat_id] = asyncio.Lock()
+        return lock
+
+    def get(self, chat_id: str) -> Chat | None:
+        entry = self._entries.get(chat_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(chat_id)
+        return _copy_chat(entry.chat)
+
+    def put(self, chat: Chat) -> None:
+        """Cache a chat just loaded from or fully written to storage."""
+        chat_id = chat.context.create_id()
+        self.invalidate(chat_id)
+        size = CHAT_OVERHEAD + _messages_size(chat.messages)
+        self._insert(chat_id, _HotChat(_copy_chat(chat), len(chat.messages), size))
+
+    def commit(self, chat: Chat, from_position: int, messages: list[ChatMessage]) -> None:
+        """Record `messages` stored at `from_position`; `chat` already contains them."""
+        chat_id = chat.context.create_id()
+        entry = self._entries.get(chat_id)
+        if entry is None:
+            return
+        if entry.version != from_position or len(chat.messages) != from_position + len(messages):
+            logger.warning(f"Hot chat {chat_id} diverged (version {entry.version}, append at {from_position}), dropped")
+            self.invalidate(chat_id)
+            return
+        self._remove(chat_id)
+        entry.chat = _copy_chat(chat)
+        entry.version += len(messages)
+        entry.size += _messages_size(messages)
+        self._insert(chat_id, entry)
+
+    def invalidate(self, chat_id: str) -> None:
+        if chat_id in self._entries:
+            self._remove(chat_id)
+
+    def _insert(self, chat_id: str, entry: _HotChat) -> None:
+        if entry.size > self.max_bytes:
+            return
+        self._entries[chat_id] = entry
+        self.size += entry.size
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, chat_id: str) -> None:
+        entry = self._entries.pop(chat_id)
+        self.size -= entry.size
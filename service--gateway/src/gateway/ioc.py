@@ -32,13 +32,16 @@ class IOC(Provider):
         raw_extra = storage_config.extra or {}
 
         if scheme in ("", "file"):
-            unknown_keys = set(raw_extra) - {"archive_dir"}
+            unknown_keys = set(raw_extra) - {"archive_dir", "compact_every"}
             if unknown_keys:
                 raise ValueError("Invalid chat_storage.extra for fs storage")
 
             archive_dir = raw_extra.get("archive_dir")
             if archive_dir is not None and not isinstance(archive_dir, str):
                 raise ValueError("Invalid chat_storage.extra for fs storage")
+            compact_every = raw_extra.get("compact_every", 32)
+            if not isinstance(compact_every, int) or compact_every < 1:
+                raise ValueError("Invalid chat_storage.extra for fs storage")
 
             if scheme == "":
                 uri_path = storage_config.uri
@@ -54,6 +57,7 @@ class IOC(Provider):
             yield ChatStorageFS(
                 logs_dir=uri_path,
                 logs_dir_archived=archive_dir,
+                compact_every=compact_every,
             )
             return
 
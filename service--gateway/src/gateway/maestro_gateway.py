@@ -12,6 +12,7 @@ from openai import OpenAI
 
 from gateway.chat_storage import ChatStorageAPI
 from gateway.config import Config
+from gateway.hot_chats import HotChats
 from gateway.legacy import ChatRequestOld, ChatResponseOld, make_async
 from gateway.models import (
     ChatRequest,
@@ -41,6 +42,7 @@ class MaestroGateway(MaestroClientI):
         self.hide_models = set(config.hide_models)
         self.file_storage = file_storage
         self.chat_storage = chat_storage
+        self.hot_chats = HotChats(max_bytes=config.hot_chats.max_bytes)
 
     @make_async
     def get_domains(self, language_code: str, client_id: str) -> list[DomainInfo]:
@@ -74,17 +76,45 @@ class MaestroGateway(MaestroClientI):
                 default_model=self.default_model,
             )
 
-    async def get_chat_previews(self, client_id: str, user_id: str) -> DBChatPreviews:
-        return await self.chat_storage.load_chat_previews_by_user_id(client_id, user_id)
+    async def get_chat_previews(
+        self, client_id: str, user_id: str, limit: int | None = None, cursor: str | None = None
+    ) -> DBChatPreviews:
+        return await self.chat_storage.load_chat_previews_by_user_id(client_id, user_id, limit=limit, cursor=cursor)
 
     async def delete_chat(self, chat_id: str) -> Either[Error, None]:
-        err, _ = await self.chat_storage.delete_chat_by_chat_id(chat_id)
+        async with self.hot_chats.lock(chat_id):
+            self.hot_chats.invalidate(chat_id)
+            err, _ = await self.chat_storage.delete_chat_by_chat_id(chat_id)
         if err:
             return err, None
         return None, None
 
     async def get_chat(self, chat_id: str) -> Either[str, Chat]:
-        return await self.chat_storage.load_chat_by_chat_id(chat_id)
+        chat = self.hot_chats.get(chat_id)
+        if chat is not None:
+            return None, chat
+        # a load racing with a turn would cache a copy older than storage
+        async with self.hot_chats.lock(chat_id):
+            return await self._get_chat_locked(chat_id)
+
+    async def _get_chat_locked(self, chat_id: str) -> Either[str, Chat]:
+        """Expects the chat lock (`hot_chats.lock`) to be held by the caller."""
+        chat = self.hot_chats.get(chat_id)
+        if chat is not None:
+            return None, chat
+        err, chat = await self.chat_storage.load_chat_by_chat_id(chat_id)
+        if chat is not None:
+            self.hot_chats.put(chat)
+        return err, chat
+
+    async def _append_messages(self, chat: Chat, from_position: int, messages: list[ChatMessage]) -> None:
+        chat_id = chat.context.create_id()
+        try:
+            await self.chat_storage.append_messages(chat_id, from_position, messages)
+        except Exception:
+            self.hot_chats.invalidate(chat_id)
+            raise
+        self.hot_chats.commit(chat, from_position, messages)
 
     async def send_message_by_chat_request_old(self, chat_request: ChatRequestOld) -> ChatResponse:
         context = chat_request.context
@@ -96,10 +126,6 @@ class MaestroGateway(MaestroClientI):
 
     async def send_message_by_request(self, chat_request: ChatRequest) -> ChatResponse:
         chat_id = chat_request.chat_id
-        err, chat = await self.chat_storage.load_chat_by_chat_id(chat_id)
-        if err:
-            raise ValueError(f"Failed to load chat {chat_id}")
-        assert chat is not None
         # context = chat_request.context
         messages = chat_request.messages
         if not len(messages) == 1:
@@ -107,14 +133,20 @@ class MaestroGateway(MaestroClientI):
         msg = messages[0]
         if not isinstance(msg, HumanMessage):
             raise ValueError(f"Expected only human message, found: {msg}")
-        return await self.send_message_by_chat(chat, msg)
+        async with self.hot_chats.lock(chat_id):
+            err, chat = await self._get_chat_locked(chat_id)
+            if err:
+                raise ValueError(f"Failed to load chat {chat_id}")
+            assert chat is not None
+            return await self.send_message_by_chat(chat, msg)
 
     async def send_message_by_chat_id(self, chat_id: str, msg: HumanMessage) -> ChatResponse:
-        err, chat = await self.get_chat(chat_id)
-        if err:
-            raise ValueError(err)
-        assert chat is not None
-        return await self.send_message_by_chat(chat, msg)
+        async with self.hot_chats.lock(chat_id):
+            err, chat = await self._get_chat_locked(chat_id)
+            if err:
+                raise ValueError(err)
+            assert chat is not None
+            return await self.send_message_by_chat(chat, msg)
 
     async def _touch_chat(self, context: Context) -> None:
         if not await self.chat_storage.has_chat(context):
@@ -123,14 +155,24 @@ class MaestroGateway(MaestroClientI):
 
     async def create_chat(self, context: Context) -> CreateResponse:
         chat_id = context.create_id()
-        chat = await self.chat_storage.load_chat(context)
-        await self.chat_storage.dump_chat(chat)
+        async with self.hot_chats.lock(chat_id):
+            chat = await self.chat_storage.load_chat(context)
+            await self.chat_storage.dump_chat(chat)
+            self.hot_chats.put(chat)
         return CreateResponse(chat_id=chat_id)
 
     async def send_message_by_context(self, context: Context, msg: HumanMessage) -> ChatResponseOld:
         # todo align short everywhere
-        chat = await self.chat_storage.load_chat(context)
-        cr = await self.send_message_by_chat(chat, msg)
+        chat_id = context.create_id()
+        async with self.hot_chats.lock(chat_id):
+            chat = self.hot_chats.get(chat_id)
+            if chat is None:
+                chat = await self.chat_storage.load_chat(context)
+                if not chat.messages:
+                    # new chat: messages are appended to a stored one
+                    await self.chat_storage.dump_chat(chat)
+                self.hot_chats.put(chat)
+            cr = await self.send_message_by_chat(chat, msg)
         res = ChatResponseOld(
             context=context,
             messages=[msg],
@@ -139,10 +181,11 @@ class MaestroGateway(MaestroClientI):
         return res
 
     async def send_message_by_chat(self, chat: Chat, msg: HumanMessage) -> ChatResponse:
+        """Expects the chat lock (`hot_chats.lock`) to be held by the caller."""
         chat_id = chat.context.create_id()
         logger.info(f"Request to chat_manager, context={chat.context}, user message={msg}, chat_id={chat_id}")
         chat.add_message(msg)
-        await self.chat_storage.dump_chat(chat)
+        await self._append_messages(chat, len(chat.messages) - 1, [msg])
         trace_id = chat.context.create_trace_id()
 
         def get_response() -> list[ChatMessage]:
@@ -150,10 +193,11 @@ class MaestroGateway(MaestroClientI):
                 return self._chat_manager.get_response(chat=chat)
 
         messages = await asyncio.to_thread(get_response)
+        from_position = len(chat.messages)
         for message in messages:
             chat.messages.append(message)
 
-        await self.chat_storage.dump_chat(chat)
+        await self._append_messages(chat, from_position, messages)
         response_messages = [msg for msg in messages if isinstance(msg, AIMessage)]
         if not response_messages:
             logger.warning("Not found messages to response...")
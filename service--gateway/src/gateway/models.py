@@ -30,6 +30,8 @@ class DBChatInfoItem(Base):
 
 class DBChatPreviews(Base):
     chat_previews: Sequence[DBChatInfoItem]
+    # pass as `cursor` to get the next page; None: no more chats
+    next_cursor: str | None = None
 
 
 class DomainsResponse(Base):
@@ -2,15 +2,14 @@ from http import HTTPStatus
 from typing import Annotated
 
 from dishka.integrations.fastapi import FromDishka, inject
-from fastapi import APIRouter, Depends, Header, HTTPException, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse
 from loguru import logger
 from mmar_mapi import Context, FileStorage
 
 from gateway.config import Config
-from gateway.fastapi_errors import ERR_STATUSES, FailedToUploadException, FileNotFoundException, MalformedException
-from gateway.fastapi_files import load_file, make_streaming_response
-from gateway.legacy import as_file_data, upload_resource_maybe
+from gateway.fastapi_errors import ERR_STATUSES, FileNotFoundException, MalformedException
+from gateway.fastapi_files import make_file_name, make_file_response, upload_file
 from gateway.maestro_gateway import MaestroGateway
 from gateway.models import (
     ChatRequestMessages,
@@ -18,7 +17,6 @@ from gateway.models import (
     CreateResponse,
     DBChatPreviews,
     DomainsResponse,
-    FileData,
     HistoryResponse,
     ModelsResponse,
     TracksResponse,
@@ -38,8 +36,13 @@ async def get_chat_previews(
     client_id: ClientIdHeader,
     user_id: str,
     gateway: FromDishka[MaestroGateway],
+    limit: Annotated[int | None, Query(ge=1, le=1000)] = None,
+    cursor: str | None = None,
 ) -> DBChatPreviews:
-    return await gateway.get_chat_previews(client_id, user_id)
+    try:
+        return await gateway.get_chat_previews(client_id, user_id, limit=limit, cursor=cursor)
+    except ValueError as ex:
+        raise MalformedException(str(ex))
 
 
 @router.post("/api/v3/chats")
@@ -117,15 +120,12 @@ async def upload(
     config: FromDishka[Config] = Depends(),
     file_storage: FromDishka[FileStorage] = Depends(),
 ) -> UploadResponse:
-    f_data: FileData | None = await load_file(config, file) if file else None
-    if not f_data:
+    if not file:
         raise FileNotFoundException()
-    f_name, f_content = f_data
-    named_resource_id = upload_resource_maybe(file_storage, f_data)
-    if not named_resource_id:
-        raise FailedToUploadException()
-    resource_name, resource_id = named_resource_id
-    logger.info(f"Uploaded resource to {resource_id}, size: {len(f_content)}, name: {resource_name}")
+    file_name = await make_file_name(config, file)
+    resource_id = await upload_file(config, file_storage, file, file_name)
+    resource_name = file_storage.get_fname(resource_id) or file_name
+    logger.info(f"Uploaded resource to {resource_id}, size: {file.size}, name: {resource_name}")
     return UploadResponse(resource_id=resource_id, resource_name=resource_name)
 
 
@@ -158,10 +158,8 @@ async def download_bytes(
     client_id: ClientIdHeader,
     resource_id: str,
     file_storage: FromDishka[FileStorage] = Depends(),
-) -> StreamingResponse:
-    f_data = as_file_data(file_storage, resource_id)
-    res = make_streaming_response(f_data)
-    return res
+) -> FileResponse:
+    return make_file_response(file_storage, resource_id)
 
 
 @router.get("/api/v3/info/domains")
@@ -0,0 +1,197 @@
+"""Per-model admission control with a bounded priority queue and AIMD concurrency limit."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from llm_hub.config import AdmissionConfig
+
+# Request header selecting the priority class of a request
+PRIORITY_HEADER = "x-priority"
+PRIORITY_CLASSES = {"high": 0, "normal": 1, "low": 2}
+DEFAULT_PRIORITY = PRIORITY_CLASSES["normal"]
+
+# Upstream status codes treated as overload signals
+OVERLOAD_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+def parse_priority(headers: dict[str, str] | None) -> int:
+    """Read the priority class from request headers (lower value is served first).
+
+    Args:
+        headers: Forwarded request headers.
+
+    Returns:
+        Priority value of the class; anything but a class name (numbers included,
+        so that clients can't jump ahead of "high") falls back to "normal".
+    """
+    for key, value in (headers or {}).items():
+        if key.lower() == PRIORITY_HEADER:
+            return PRIORITY_CLASSES.get(value.strip().lower(), DEFAULT_PRIORITY)
+    return DEFAULT_PRIORITY
+
+
+def is_overload(result: Any) -> bool:
+    """Check whether a provider result signals upstream overload."""
+    return isinstance(result, Response) and result.status_code in OVERLOAD_STATUS_CODES
+
+
+@dataclass
+class AdmissionTicket:
+    """Slot granted by the admission controller; records the request outcome."""
+
+    controller: "AdmissionController"
+    started_at: float
+    overloaded: bool = False
+
+    def observe(self, result: Any) -> None:
+        """Record the provider result (upstream 429/5xx reduce the limit)."""
+        self.overloaded = is_overload(result)
+
+
+class AdmissionController:
+    """Admission controller for one model.
+
+    Requests run while fewer than ``limit`` are in flight; the rest wait in a
+    bounded priority queue. A full queue is rejected with 429 immediately and a
+    request that waits longer than ``queue_timeout`` gets 503, so clients can back
+    off instead of hanging. With ``adaptive`` enabled the limit follows AIMD: it
+    grows by about one per limit-worth of successful requests and is multiplied
+    by ``decrease_factor`` on upstream overload or latency above the target,
+    staying within ``[min_limit, max_limit]``.
+    """
+
+    def __init__(self, model: str, max_limit: int, config: AdmissionConfig):
+        self.model = model
+        self.config = config
+        self.max_limit = max_limit
+        self.min_limit = max(1, min(config.min_limit, max_limit))
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._last_decrease = 0.0
+
+        # Metrics
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a slot."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int = DEFAULT_PRIORITY) -> AdmissionTicket:
+        """Wait for a slot.
+
+        Args:
+            priority: Priority class (lower is served first).
+
+        Returns:
+            Ticket to pass to ``release``.
+
+        Raises:
+            HTTPException: 429 if the queue is full, 503 if the queue timeout expires.
+        """
+        enqueued_at = time.monotonic()
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return self._admit(enqueued_at)
+
+        if self.queue_depth >= self.config.max_queue:
+            self.rejected += 1
+            raise self._error(429, "queue_full", f"Too many queued requests for model '{self.model}'")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        # Stale (cancelled) waiters may have left free slots behind
+        self._wake()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.config.queue_timeout)
+        except TimeoutError:
+            if future.done() and not future.cancelled():
+                # Slot was granted at the same moment: give it back
+                self.in_flight -= 1
+                self._wake()
+            future.cancel()
+            self.timed_out += 1
+            raise self._error(503, "queue_timeout", f"Timed out waiting for model '{self.model}'") from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            future.cancel()
+            raise
+        return self._admit(enqueued_at)
+
+    def release(self, ticket: AdmissionTicket, *, failed: bool = False) -> None:
+        """Return a slot and adjust the limit from the request outcome.
+
+        Args:
+            ticket: Ticket returned by ``acquire``.
+            failed: True if the request raised an error.
+        """
+        self.in_flight -= 1
+        if self.config.adaptive:
+            latency = time.monotonic() - ticket.started_at
+            target = self.config.latency_target
+            if failed or ticket.overloaded or (target is not None and latency > target):
+                self._decrease()
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def metrics(self) -> dict[str, Any]:
+        """Current queue and limit metrics."""
+        return {
+            "limit": int(self.limit),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_time_avg": self.wait_time_total / self.admitted if self.admitted else 0.0,
+            "wait_time_max": self.wait_time_max,
+        }
+
+    def _admit(self, enqueued_at: float) -> AdmissionTicket:
+        now = time.monotonic()
+        wait = now - enqueued_at
+        self.admitted += 1
+        self.wait_time_total += wait
+        self.wait_time_max = max(self.wait_time_max, wait)
+        return AdmissionTicket(controller=self, started_at=now)
+
+    def _decrease(self) -> None:
+        # Multiplicative decrease at most once per cooldown so one burst of errors counts once
+        now = time.monotonic()
+        if now - self._last_decrease < self.config.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * self.config.decrease_factor)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _error(self, status_code: int, code: str, message: str) -> HTTPException:
+        retry_after = max(1, round(self.config.queue_timeout))
+        return HTTPException(
+            status_code=status_code,
+            detail={"error": {"message": message, "type": "rate_limit_error", "code": code}},
+            headers={"Retry-After": str(retry_after)},
+        )
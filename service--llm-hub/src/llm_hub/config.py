@@ -11,6 +11,13 @@ class BaseConnectionConfig(BaseModel):
 
     max_concurrent: int | None = None
 
+    # Upstream HTTP connection pool (one long-lived client per connection)
+    timeout: float = 120.0
+    max_connections: int | None = 100
+    max_keepalive_connections: int | None = 20
+    keepalive_expiry: float | None = 30.0
+    http2: bool = False
+
 
 class OpenAIConnectionConfig(BaseConnectionConfig):
     """Configuration for OpenAI-compatible connections."""
@@ -68,6 +75,43 @@ class ModelInfo(BaseModel):
     default_embeddings: bool | None = None
 
 
+class ResponseCacheConfig(BaseModel):
+    """Configuration of the opt-in response cache for chat completions and embeddings."""
+
+    enabled: bool = False
+    ttl_seconds: float = 3600.0
+    backend: Literal["memory", "sqlite"] = "memory"
+    max_memory_bytes: int = 64 * 1024 * 1024
+    sqlite_path: str = "llm-hub-cache.sqlite3"
+    max_disk_bytes: int = 1024 * 1024 * 1024
+    # By default only deterministic chat requests (temperature == 0 or seed set) are cached
+    cache_nondeterministic: bool = False
+
+
+class EmbeddingsBatchingConfig(BaseModel):
+    """Configuration of micro-batching for concurrent single-input embedding requests."""
+
+    enabled: bool = False
+    max_batch_size: int = 64
+    max_wait_ms: float = 5.0
+
+
+class AdmissionConfig(BaseModel):
+    """Per-model admission control for models with max_concurrent set."""
+
+    # Waiting requests per model; beyond that new requests get 429
+    max_queue: int = 100
+    # Seconds a request may wait for a slot before getting 503
+    queue_timeout: float = 30.0
+    # AIMD adjustment of the concurrency limit (max_concurrent is the ceiling)
+    adaptive: bool = False
+    min_limit: int = 1
+    decrease_factor: float = 0.7
+    decrease_cooldown: float = 1.0
+    # Requests slower than this (seconds) count as overload signals
+    latency_target: float | None = None
+
+
 class LLMConfig(BaseModel):
     connections: dict[str, ConnectionConfig] = Field(default_factory=dict)
     routing: dict[str, str] = Field(default_factory=dict)
@@ -75,6 +119,9 @@ class LLMConfig(BaseModel):
     groups: dict[str, Any] = Field(default_factory=dict)
     middleware: list[dict[str, Any]] = Field(default_factory=list)
     fallback_to_default: bool = True
+    cache: ResponseCacheConfig = Field(default_factory=ResponseCacheConfig)
+    embeddings_batching: EmbeddingsBatchingConfig = Field(default_factory=EmbeddingsBatchingConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
 
 
 class Config(SettingsModel):
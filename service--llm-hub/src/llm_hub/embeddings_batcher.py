@@ -0,0 +1,132 @@
+"""Micro-batching of concurrent single-input embedding requests."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+
+from llm_hub.config import EmbeddingsBatchingConfig
+from llm_hub.response_cache import json_response, response_to_json
+
+# Sends one upstream embeddings request: (texts, headers) -> provider result
+SendBatch = Callable[[list[str], dict[str, str] | None], Awaitable[Any]]
+
+
+@dataclass
+class _PendingBatch:
+    send: SendBatch
+    headers: dict[str, str] | None
+    texts: list[str] = field(default_factory=list)
+    futures: list[asyncio.Future] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+def _split_usage(usage: dict[str, Any] | None, count: int) -> list[dict[str, int]]:
+    """Split batch token usage between callers (remainder goes to the first ones)."""
+    usage = usage or {}
+    shares = []
+    for i in range(count):
+        share = {}
+        for name in ("prompt_tokens", "total_tokens"):
+            total = int(usage.get(name) or 0)
+            share[name] = total // count + (1 if i < total % count else 0)
+        shares.append(share)
+    return shares
+
+
+class EmbeddingsBatcher:
+    """Coalesces concurrent single-text embedding requests into one upstream call.
+
+    Requests with the same batch key (model, request options and forwarded headers)
+    arriving within ``max_wait_ms`` are sent together, up to ``max_batch_size`` texts
+    per call.
+    Each caller receives an OpenAI-style response with its own vector at index 0.
+    """
+
+    def __init__(self, config: EmbeddingsBatchingConfig):
+        self.max_batch_size = max(1, config.max_batch_size)
+        self.max_wait = config.max_wait_ms / 1000
+        self._pending: dict[str, _PendingBatch] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, key: str, text: str, headers: dict[str, str] | None, send: SendBatch) -> Any:
+        """Queue a text for batching and wait for its embedding response.
+
+        Args:
+            key: Batch key; only requests with equal keys share an upstream call.
+            text: Input text.
+            headers: Forwarded headers; part of the key, so equal within a batch.
+            send: Coroutine function performing the upstream request.
+
+        Returns:
+            Provider-compatible response for this single text.
+        """
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = _PendingBatch(send=send, headers=headers)
+            self._pending[key] = batch
+            batch.timer = loop.call_later(self.max_wait, self._flush, key)
+
+        future = loop.create_future()
+        batch.texts.append(text)
+        batch.futures.append(future)
+        if len(batch.texts) >= self.max_batch_size:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: str) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer:
+            batch.timer.cancel()
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: _PendingBatch) -> None:
+        try:
+            result = await batch.send(batch.texts, batch.headers)
+        except BaseException as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        payload = response_to_json(result)
+        items = payload.get("data") if payload else None
+        if not isinstance(items, list) or len(items) != len(batch.texts):
+            # Upstream error or unexpected shape: every caller gets the same response
+            for future in batch.futures:
+                if not future.done():
+                    future.set_result(result)
+            return
+
+        logger.trace(f"Embeddings: sent batch of {len(batch.texts)} texts upstream")
+        items = sorted(items, key=lambda item: item.get("index", 0))
+        usages = _split_usage(payload.get("usage"), len(items))
+        for future, item, usage in zip(batch.futures, items, usages, strict=True):
+            if future.done():
+                continue
+            future.set_result(
+                json_response(
+                    {
+                        "object": "list",
+                        "data": [{"object": "embedding", "embedding": item["embedding"], "index": 0}],
+                        "model": payload.get("model"),
+                        "usage": usage,
+                    }
+                )
+            )
+
+    async def aclose(self) -> None:
+        """Flush pending batches and wait for in-flight upstream calls."""
+        for key in list(self._pending):
+            self._flush(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,78 @@
+"""Shared upstream HTTP clients with per-connection pool limits."""
+
+import importlib.util
+
+import httpx
+from loguru import logger
+
+from llm_hub.config import ConnectionConfig
+
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def build_limits(connection: ConnectionConfig, limits_cls: type = httpx.Limits) -> httpx.Limits:
+    """Build httpx pool limits from connection configuration.
+
+    Args:
+        connection: Connection configuration.
+        limits_cls: Limits class of the httpx package the client is built on.
+
+    Returns:
+        Pool limits for the connection's HTTP client.
+    """
+    return limits_cls(
+        max_connections=connection.max_connections,
+        max_keepalive_connections=connection.max_keepalive_connections,
+        keepalive_expiry=connection.keepalive_expiry,
+    )
+
+
+def client_key(connection: ConnectionConfig) -> tuple:
+    """Build a hashable key identifying a pooled client for a connection.
+
+    Connections pointing at the same upstream with the same pool settings share one client.
+
+    Args:
+        connection: Connection configuration.
+
+    Returns:
+        Tuple usable as a dictionary key.
+    """
+    return (
+        connection.api_base,
+        connection.api_key,
+        connection.timeout,
+        connection.max_connections,
+        connection.max_keepalive_connections,
+        connection.keepalive_expiry,
+        connection.http2,
+    )
+
+
+def create_async_client(
+    connection: ConnectionConfig,
+    client_cls: type = httpx.AsyncClient,
+    limits_cls: type = httpx.Limits,
+    **kwargs,
+) -> httpx.AsyncClient:
+    """Create a long-lived pooled HTTP client for a connection.
+
+    Args:
+        connection: Connection configuration.
+        client_cls: Client class; SDKs bundling their own httpx flavour pass theirs.
+        limits_cls: Limits class from the same httpx package as ``client_cls``.
+        **kwargs: Extra arguments for the client.
+
+    Returns:
+        HTTP client that keeps upstream connections alive between requests.
+    """
+    http2 = connection.http2
+    if http2 and not _HTTP2_AVAILABLE:
+        logger.warning(f"HTTP/2 requested for {connection.api_base} but 'h2' is not installed, using HTTP/1.1")
+        http2 = False
+    return client_cls(
+        timeout=connection.timeout,
+        limits=build_limits(connection, limits_cls),
+        http2=http2,
+        **kwargs,
+    )
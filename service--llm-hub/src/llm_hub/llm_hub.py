@@ -1,6 +1,7 @@
 """LLM Hub OpenAI client that mimics the OpenAI API structure."""
 
 import asyncio
+import json
 from collections.abc import Callable
 from contextlib import asynccontextmanager
 from functools import wraps
@@ -11,11 +12,20 @@ from fastapi import HTTPException
 from fastapi.responses import Response
 from loguru import logger
 
+from llm_hub.admission import AdmissionController, parse_priority
 from llm_hub.config import ConnectionConfig, LLMConfig
+from llm_hub.embeddings_batcher import EmbeddingsBatcher
 from llm_hub.providers_anthropic import AnthropicProvider
 from llm_hub.providers_base import BaseProvider
 from llm_hub.providers_gigachat import GigachatProvider
 from llm_hub.providers_openai import OpenAIProvider
+from llm_hub.response_cache import (
+    CACHE_STATUS_HEADER,
+    ResponseCache,
+    json_response,
+    make_cache_key,
+    response_to_json,
+)
 
 # Provider registry: maps api_type to provider class
 PROVIDER_CLASSES: dict[str, type[BaseProvider]] = {
@@ -116,10 +126,13 @@ class LLMHub(OpenAIProto):
         """
         self._config = config
         self._providers: dict[str, BaseProvider] = {}
-        self._semaphores: dict[str, asyncio.Semaphore] = {}
-        self._semaphore_lock = asyncio.Lock()
+        self._admission: dict[str, AdmissionController | None] = {}
+        self._cache = ResponseCache(config.cache) if config.cache.enabled else None
+        self._embeddings_batcher = (
+            EmbeddingsBatcher(config.embeddings_batching) if config.embeddings_batching.enabled else None
+        )
 
-        # Initialize provider instances
+        # Initialize provider instances (each keeps pooled upstream clients until aclose)
         for api_type, provider_class in PROVIDER_CLASSES.items():
             self._providers[api_type] = provider_class()
 
@@ -128,10 +141,25 @@ class LLMHub(OpenAIProto):
         self.embeddings = SNS(create=self._embeddings_create)
         self.models = SNS(list=self._build_models_list)
 
-    def _create_semaphore_for_model(self, model: str) -> asyncio.Semaphore | None:
-        """Create semaphore for model if configured.
+    async def aclose(self) -> None:
+        """Close pooled upstream connections of all providers.
+
+        Should be called once on application shutdown.
+        """
+        if self._embeddings_batcher:
+            await self._embeddings_batcher.aclose()
+        for api_type, provider in self._providers.items():
+            try:
+                await provider.aclose()
+            except Exception:
+                logger.exception(f"Failed to close provider '{api_type}'")
+        if self._cache:
+            self._cache.close()
+
+    def _get_model_limit(self, model: str) -> int | None:
+        """Get concurrency limit for model if configured.
 
-        Returns semaphore or None if no limit set.
+        Returns max_concurrent or None if no limit set.
         """
         config = self._config
 
@@ -140,9 +168,9 @@ class LLMHub(OpenAIProto):
             model_info = config.model_info[model]
             if model_info.max_concurrent is not None and model_info.max_concurrent > 0:
                 logger.info(
-                    f"Created semaphore for model '{model}' with max_concurrent={model_info.max_concurrent} (from model_info)"
+                    f"Created admission controller for model '{model}' with max_concurrent={model_info.max_concurrent} (from model_info)"
                 )
-                return asyncio.Semaphore(model_info.max_concurrent)
+                return model_info.max_concurrent
 
         # Then check connection config for connection-level limits
         if model in config.routing:
@@ -153,48 +181,47 @@ class LLMHub(OpenAIProto):
                     connection = config.connections[conn_name]
                     if connection.max_concurrent is not None and connection.max_concurrent > 0:
                         logger.info(
-                            f"Created semaphore for model '{model}' with max_concurrent={connection.max_concurrent} (from connection '{conn_name}')"
+                            f"Created admission controller for model '{model}' with max_concurrent={connection.max_concurrent} (from connection '{conn_name}')"
                         )
-                        return asyncio.Semaphore(connection.max_concurrent)
+                        return connection.max_concurrent
 
         return None
 
+    def _get_admission_controller(self, model: str) -> AdmissionController | None:
+        """Get admission controller for model (lazy creation), None if unlimited."""
+        if model not in self._admission:
+            limit = self._get_model_limit(model)
+            self._admission[model] = AdmissionController(model, limit, self._config.admission) if limit else None
+        return self._admission[model]
+
     @asynccontextmanager
-    async def _get_semaphore(self, model: str):
-        """Acquire semaphore for model if configured (lazy creation)."""
-        # Fast path: semaphore already exists
-        semaphore = self._semaphores.get(model)
-        if semaphore:
-            await semaphore.acquire()
-            try:
-                yield
-            finally:
-                semaphore.release()
+    async def _admit(self, model: str, headers: dict[str, str] | None):
+        """Wait for an admission slot for model if a limit is configured.
+
+        Yields:
+            Ticket to report the provider result to, or None if the model is unlimited.
+
+        Raises:
+            HTTPException: 429/503 when the model's queue is full or the wait times out.
+        """
+        controller = self._get_admission_controller(model)
+        if controller is None:
+            yield None
             return
 
-        # Slow path: create semaphore if needed
-        async with self._semaphore_lock:
-            # Check again in case another thread created it
-            semaphore = self._semaphores.get(model)
-            if semaphore:
-                await semaphore.acquire()
-                try:
-                    yield
-                finally:
-                    semaphore.release()
-                return
+        ticket = await controller.acquire(parse_priority(headers))
+        failed = False
+        try:
+            yield ticket
+        except Exception:
+            failed = True
+            raise
+        finally:
+            controller.release(ticket, failed=failed)
 
-            # Create and cache semaphore
-            semaphore = self._create_semaphore_for_model(model)
-            if semaphore:
-                self._semaphores[model] = semaphore
-                await semaphore.acquire()
-                try:
-                    yield
-                finally:
-                    semaphore.release()
-            else:
-                yield
+    def admission_metrics(self) -> dict[str, dict[str, Any]]:
+        """Queue depth, wait time and concurrency limit per model."""
+        return {model: controller.metrics() for model, controller in self._admission.items() if controller}
 
     async def _chat_completion_create(
         self,
@@ -221,8 +248,48 @@ class LLMHub(OpenAIProto):
         model = self._fix_model_if_needed(model, is_embedding=False)
         connection, provider, resolved_model = self._resolve_connection(model, is_embedding=False)
 
-        async with self._get_semaphore(model):
-            return await self._do_chat_completion(provider, connection, resolved_model, headers, messages, kwargs)
+        cache = self._cache
+        if cache and cache.should_cache_chat(kwargs, headers):
+            return await self._cached_chat_completion(
+                cache, model, provider, connection, resolved_model, headers, messages, kwargs
+            )
+
+        async with self._admit(model, headers) as ticket:
+            result = await self._do_chat_completion(provider, connection, resolved_model, headers, messages, kwargs)
+            if ticket:
+                ticket.observe(result)
+            return result
+
+    async def _cached_chat_completion(
+        self,
+        cache: ResponseCache,
+        model: str,
+        provider: BaseProvider,
+        connection: ConnectionConfig,
+        resolved_model: str,
+        headers: dict[str, str] | None,
+        messages: list[dict[str, Any]],
+        kwargs: dict,
+    ) -> Response | dict[str, Any]:
+        """Serve chat completion from cache, storing successful upstream responses."""
+        key = make_cache_key("chat", self._config.routing[model], {"messages": messages, **kwargs})
+        found = await cache.get_many([key])
+        if key in found:
+            logger.trace(f"Chat completion: cache hit, model={model}")
+            return json_response(found[key], "hit")
+
+        async with self._admit(model, headers) as ticket:
+            result = await self._do_chat_completion(provider, connection, resolved_model, headers, messages, kwargs)
+            if ticket:
+                ticket.observe(result)
+
+        payload = response_to_json(result)
+        if payload is not None:
+            body = bytes(result.body) if isinstance(result, Response) else json.dumps(payload).encode()
+            await cache.set_many({key: body})
+            if isinstance(result, Response):
+                result.headers[CACHE_STATUS_HEADER] = "miss"
+        return result
 
     async def _do_chat_completion(
         self,
@@ -277,8 +344,99 @@ class LLMHub(OpenAIProto):
         model = self._fix_model_if_needed(model, is_embedding=True)
         connection, provider, resolved_model = self._resolve_connection(model, is_embedding=True)
 
-        async with self._get_semaphore(model):
-            return await self._do_embeddings(provider, connection, resolved_model, headers, input, kwargs, model)
+        cache = self._cache
+        texts_only = isinstance(input, str) or (isinstance(input, list) and all(isinstance(t, str) for t in input))
+        if cache and texts_only and cache.should_cache_embeddings(headers):
+            return await self._cached_embeddings(cache, model, provider, connection, resolved_model, headers, input, kwargs)
+
+        return await self._send_embeddings(model, provider, connection, resolved_model, headers, input, kwargs)
+
+    async def _send_embeddings(
+        self,
+        model: str,
+        provider: BaseProvider,
+        connection: ConnectionConfig,
+        resolved_model: str,
+        headers: dict[str, str] | None,
+        input: str | list[str] | list[int] | list[list[int]],  # noqa: A002
+        kwargs: dict,
+    ) -> Response | dict[str, Any]:
+        """Send embeddings upstream, coalescing single-text requests when batching is enabled."""
+        batcher = self._embeddings_batcher
+        text = input if isinstance(input, str) else None
+        if isinstance(input, list) and len(input) == 1 and isinstance(input[0], str):
+            text = input[0]
+        if batcher is None or text is None:
+            async with self._admit(model, headers) as ticket:
+                result = await self._do_embeddings(provider, connection, resolved_model, headers, input, kwargs, model)
+                if ticket:
+                    ticket.observe(result)
+                return result
+
+        async def send(texts: list[str], batch_headers: dict[str, str] | None) -> Response | dict[str, Any]:
+            async with self._admit(model, batch_headers) as ticket:
+                result = await self._do_embeddings(
+                    provider, connection, resolved_model, batch_headers, texts, kwargs, model
+                )
+                if ticket:
+                    ticket.observe(result)
+                return result
+
+        # callers with different headers (customer, priority) must not be sent upstream as one
+        forwarded = {name.lower(): value for name, value in (headers or {}).items()}
+        key = make_cache_key("embeddings-batch", self._config.routing[model], {"kwargs": kwargs, "headers": forwarded})
+        return await batcher.submit(key, text, headers, send)
+
+    async def _cached_embeddings(
+        self,
+        cache: ResponseCache,
+        model: str,
+        provider: BaseProvider,
+        connection: ConnectionConfig,
+        resolved_model: str,
+        headers: dict[str, str] | None,
+        input: str | list[str],  # noqa: A002
+        kwargs: dict,
+    ) -> Response | dict[str, Any]:
+        """Serve embeddings per input item from cache, sending only the misses upstream."""
+        texts = [input] if isinstance(input, str) else input
+        route = self._config.routing[model]
+        keys = [make_cache_key("embeddings", route, {**kwargs, "input": text}) for text in texts]
+        text_by_key = dict(zip(keys, texts, strict=True))
+        found = await cache.get_many(list(text_by_key))
+        missing = [key for key in text_by_key if key not in found]
+
+        usage = {"prompt_tokens": 0, "total_tokens": 0}
+        response_model = self._get_target_model(resolved_model)
+        if missing:
+            result = await self._send_embeddings(
+                model, provider, connection, resolved_model, headers, [text_by_key[k] for k in missing], kwargs
+            )
+            payload = response_to_json(result)
+            items = payload.get("data") if payload else None
+            if not isinstance(items, list) or len(items) != len(missing):
+                # Upstream error or unexpected shape: pass the response through untouched
+                return result
+            items = sorted(items, key=lambda item: item.get("index", 0))
+            fresh = {key: json.dumps(item["embedding"]).encode() for key, item in zip(missing, items, strict=True)}
+            await cache.set_many(fresh)
+            found.update(fresh)
+            usage = payload.get("usage") or usage
+            response_model = payload.get("model") or response_model
+
+        logger.trace(f"Embeddings: {len(texts) - len(missing)}/{len(texts)} served from cache, model={model}")
+        return json_response(
+            {
+                "object": "list",
+                "data": [
+                    {"object": "embedding", "embedding": json.loads(found[key]), "index": i}
+                    for i, key in enumerate(keys)
+                ],
+                "model": response_model,
+                "usage": usage,
+            },
+            "hit" if not missing else ("miss" if len(missing) == len(text_by_key) else "partial"),
+        )
 
     async def _do_embeddings(
         self,
@@ -1,4 +1,5 @@
 import sys
+from contextlib import asynccontextmanager
 
 import uvicorn
 from dishka import make_container
@@ -23,16 +24,29 @@ def create_app(client: LLMHub) -> FastAPI:
     Returns:
         Configured FastAPI application instance.
     """
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        yield
+        # Close pooled upstream connections on shutdown
+        await client.aclose()
+
     app = FastAPI(
         title="LLM Hub",
         description="Unified LLM proxy service supporting OpenAI-compatible and Gigachat APIs",
         version="1.0.0",
+        lifespan=lifespan,
     )
 
     @app.get("/health")
     async def health_check():
         return {"status": "ok", "service": "llm-hub"}
 
+    @app.get("/metrics/admission")
+    async def admission_metrics():
+        """Per-model admission queue depth, wait times and concurrency limits."""
+        return client.admission_metrics()
+
     @app.get("/v1/models")
     async def list_models():
         """List available models."""
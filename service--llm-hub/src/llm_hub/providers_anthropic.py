@@ -2,47 +2,74 @@
 
 import json
 import logging
+import sys
 
 import anthropic
 from fastapi.responses import Response, StreamingResponse
 
 from llm_hub.config import ConnectionConfig
+from llm_hub.http_clients import client_key, create_async_client
 from llm_hub.providers_base import BaseProvider
 
 logger = logging.getLogger(__name__)
 
 
+def _sdk_limits_cls() -> type:
+    """Return the Limits class of the httpx package the anthropic SDK is built on.
+
+    anthropic>=1.0 runs on httpx2 and rejects objects from plain httpx; older releases use httpx.
+    """
+    for cls in anthropic.DefaultAsyncHttpxClient.__mro__:
+        package = cls.__module__.partition(".")[0]
+        if package in ("httpx", "httpx2"):
+            return sys.modules[package].Limits
+    raise TypeError(f"Unsupported anthropic HTTP client: {anthropic.DefaultAsyncHttpxClient!r}")
+
+
 class AnthropicProvider(BaseProvider):
     """Provider for Anthropic API using official anthropic library.
 
     Converts OpenAI-compatible requests to Anthropic's native format
-    and converts responses back to OpenAI format.
+    and converts responses back to OpenAI format. Uses the async client,
+    so streaming never blocks the event loop.
     """
 
     def __init__(self):
         """Initialize the Anthropic provider."""
-        self.clients: dict[str, anthropic.Anthropic] = {}
+        self.clients: dict[tuple, anthropic.AsyncAnthropic] = {}
 
-    def _get_client(self, connection: ConnectionConfig) -> anthropic.Anthropic:
+    def _get_client(self, connection: ConnectionConfig) -> anthropic.AsyncAnthropic:
         """Get or create Anthropic client for connection.
 
         Args:
             connection: Connection configuration.
 
         Returns:
-            Anthropic client instance.
+            AsyncAnthropic client on a pooled httpx client with the connection's limits.
         """
         # Create a unique key for this connection configuration
-        key = (connection.api_base, connection.api_key)
+        key = client_key(connection)
 
         if key not in self.clients:
-            self.clients[key] = anthropic.Anthropic(
+            self.clients[key] = anthropic.AsyncAnthropic(
                 api_key=connection.api_key,
                 base_url=connection.api_base,
+                timeout=connection.timeout,
+                http_client=create_async_client(
+                    connection,
+                    client_cls=anthropic.DefaultAsyncHttpxClient,
+                    limits_cls=_sdk_limits_cls(),
+                ),
             )
 
         return self.clients[key]
 
+    async def aclose(self) -> None:
+        """Close all Anthropic clients and their connection pools."""
+        clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            await client.close()
+
     def _convert_to_openai_format(self, message: anthropic.types.Message) -> dict:
         """Convert Anthropic Message to OpenAI format.
 
@@ -124,8 +151,8 @@ class AnthropicProvider(BaseProvider):
                 # Streaming response
                 async def stream_generator():
                     try:
-                        with client.messages.stream(**params) as stream:
-                            for event in stream:
+                        async with client.messages.stream(**params) as stream:
+                            async for event in stream:
                                 # Convert Anthropic streaming event to OpenAI format
                                 if hasattr(event, "delta") and hasattr(event.delta, "text"):
                                     openai_chunk = {
@@ -183,7 +210,7 @@ class AnthropicProvider(BaseProvider):
                 )
             else:
                 # Non-streaming response
-                message = client.messages.create(**params)
+                message = await client.messages.create(**params)
 
                 # Convert Anthropic response to OpenAI format
                 openai_response = self._convert_to_openai_format(message)
@@ -45,3 +45,10 @@ class BaseProvider(ABC):
             Response compatible with OpenAI API format.
         """
         pass
+
+    async def aclose(self) -> None:
+        """Release upstream clients and pooled connections.
+
+        Called once on application shutdown. Providers without long-lived resources keep the default no-op.
+        """
+        return None
@@ -119,7 +119,11 @@ class GigachatProvider(BaseProvider):
         Returns:
             Dictionary of parameters for GigaChat constructor.
         """
-        giga_params = {"verify_ssl_certs": connection.verify_ssl}
+        giga_params = {
+            "verify_ssl_certs": connection.verify_ssl,
+            "timeout": connection.timeout,
+            "max_connections": connection.max_connections,
+        }
         GigachatProvider._add_credentials(giga_params, connection)
 
         if connection.authorization:
@@ -150,6 +154,12 @@ class GigachatProvider(BaseProvider):
             self.clients[key] = GigaChat(**giga_params)
         return self.clients[key]
 
+    async def aclose(self) -> None:
+        """Close all GigaChat clients and their connection pools."""
+        clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
     async def chat_completion(self, headers: dict[str, str], data: dict, connection: ConnectionConfig):
         """Handle chat completion request.
 
@@ -1,12 +1,12 @@
 """OpenAI-compatible API pass-through handler."""
 
 import logging
-from contextlib import asynccontextmanager
 
 import httpx
 from fastapi.responses import Response, StreamingResponse
 
 from llm_hub.config import ConnectionConfig
+from llm_hub.http_clients import client_key, create_async_client
 from llm_hub.providers_base import BaseProvider
 
 logger = logging.getLogger(__name__)
@@ -15,19 +15,33 @@ logger = logging.getLogger(__name__)
 class OpenAIProvider(BaseProvider):
     """Provider for OpenAI-compatible APIs (pass-through)."""
 
-    def __init__(self, timeout: float = 120.0):
-        """Initialize the OpenAI provider.
+    def __init__(self):
+        """Initialize the OpenAI provider."""
+        self.clients: dict[tuple, httpx.AsyncClient] = {}
+
+    def _get_client(self, connection: ConnectionConfig) -> httpx.AsyncClient:
+        """Get or create the pooled HTTP client for connection.
+
+        The client is reused across requests so upstream TCP/TLS connections stay alive.
 
         Args:
-            timeout: Request timeout in seconds.
-        """
-        self.timeout = timeout
+            connection: Connection configuration.
 
-    @asynccontextmanager
-    async def _get_client(self):
-        """Get an HTTP client context manager."""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            yield client
+        Returns:
+            Shared HTTP client instance.
+        """
+        key = client_key(connection)
+        client = self.clients.get(key)
+        if client is None or client.is_closed:
+            client = create_async_client(connection)
+            self.clients[key] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close all pooled HTTP clients."""
+        clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            await client.aclose()
 
     async def chat_completion(self, headers: dict[str, str], data: dict, connection: ConnectionConfig):
         """Handle chat completion request.
@@ -46,14 +60,12 @@ class OpenAIProvider(BaseProvider):
                 request_headers[key] = value
 
         url = f"{connection.api_base.rstrip('/')}/chat/completions"
+        client = self._get_client(connection)
 
         if data.get("stream", False):
-            # Streaming response - use generator to keep client alive
+            # Streaming response - the pooled connection is released when the stream closes
             async def stream_generator():
-                async with (
-                    httpx.AsyncClient(timeout=self.timeout) as client,
-                    client.stream("POST", url, json=data, headers=request_headers) as response,
-                ):
+                async with client.stream("POST", url, json=data, headers=request_headers) as response:
                     if response.status_code >= 400:
                         error_content = await response.aread()
                         logger.error(f"Upstream error {response.status_code}: {error_content}")
@@ -74,21 +86,20 @@ class OpenAIProvider(BaseProvider):
             )
         else:
             # Non-streaming response
-            async with self._get_client() as client:
-                response = await client.post(
-                    url,
-                    json=data,
-                    headers=request_headers,
-                )
-
-                if response.status_code >= 400:
-                    logger.error(f"Upstream error {response.status_code}: {response.text}")
-
-                return Response(
-                    content=response.content,
-                    status_code=response.status_code,
-                    headers={"Content-Type": "application/json"},
-                )
+            response = await client.post(
+                url,
+                json=data,
+                headers=request_headers,
+            )
+
+            if response.status_code >= 400:
+                logger.error(f"Upstream error {response.status_code}: {response.text}")
+
+            return Response(
+                content=response.content,
+                status_code=response.status_code,
+                headers={"Content-Type": "application/json"},
+            )
 
     async def embeddings(self, headers: dict[str, str], data: dict, connection: ConnectionConfig):
         """Handle embeddings request.
@@ -108,18 +119,18 @@ class OpenAIProvider(BaseProvider):
 
         url = f"{connection.api_base.rstrip('/')}/embeddings"
 
-        async with self._get_client() as client:
-            response = await client.post(
-                url,
-                json=data,
-                headers=request_headers,
-            )
-
-            if response.status_code >= 400:
-                logger.error(f"Upstream error {response.status_code}: {response.text}")
-
-            return Response(
-                content=response.content,
-                status_code=response.status_code,
-                headers={"Content-Type": "application/json"},
-            )
+        client = self._get_client(connection)
+        response = await client.post(
+            url,
+            json=data,
+            headers=request_headers,
+        )
+
+        if response.status_code >= 400:
+            logger.error(f"Upstream error {response.status_code}: {response.text}")
+
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            headers={"Content-Type": "application/json"},
+        )
@@ -0,0 +1,302 @@
+"""Opt-in response cache for chat completions and embeddings."""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from fastapi.responses import Response, StreamingResponse
+
+from llm_hub.config import ResponseCacheConfig
+
+# Request header that disables the cache for a single request ("1", "true", "yes")
+CACHE_BYPASS_HEADER = "x-llm-hub-no-cache"
+# Response header reporting cache usage ("hit" / "miss" / "partial")
+CACHE_STATUS_HEADER = "x-llm-hub-cache"
+
+
+def make_cache_key(namespace: str, route: str, body: dict[str, Any]) -> str:
+    """Build a cache key from the resolved route and the normalized request body.
+
+    Args:
+        namespace: Cache namespace ("chat" or "embeddings").
+        route: Resolved route ("connection.target_model").
+        body: Request body without transport-only fields.
+
+    Returns:
+        Hex digest identifying the request.
+    """
+    normalized = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    digest = hashlib.sha256()
+    for part in (namespace, route, normalized):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def is_bypassed(headers: dict[str, str] | None) -> bool:
+    """Check whether the request asks to skip the cache.
+
+    Args:
+        headers: Forwarded request headers.
+
+    Returns:
+        True if the bypass header or ``Cache-Control: no-cache``/``no-store`` is present.
+    """
+    for key, value in (headers or {}).items():
+        key = key.lower()
+        value = value.strip().lower()
+        if key == CACHE_BYPASS_HEADER and value in {"1", "true", "yes"}:
+            return True
+        if key == "cache-control" and ("no-cache" in value or "no-store" in value):
+            return True
+    return False
+
+
+def is_deterministic(body: dict[str, Any]) -> bool:
+    """Check whether a chat request is expected to produce a reproducible answer.
+
+    Args:
+        body: Chat completion request body.
+
+    Returns:
+        True for ``temperature == 0`` or an explicit ``seed``.
+    """
+    return body.get("temperature") == 0 or body.get("seed") is not None
+
+
+def response_to_json(result: Any) -> dict[str, Any] | None:
+    """Extract a successful JSON payload from a provider result.
+
+    Args:
+        result: Provider result (dict or fastapi Response).
+
+    Returns:
+        Decoded JSON payload, or None if the result is an error, a stream or not JSON.
+    """
+    if isinstance(result, dict):
+        return None if "error" in result else result
+    if isinstance(result, StreamingResponse) or not isinstance(result, Response):
+        return None
+    if result.status_code != 200:
+        return None
+    try:
+        payload = json.loads(result.body)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(payload, dict) or "error" in payload:
+        return None
+    return payload
+
+
+def json_response(payload: bytes | dict[str, Any], cache_status: str | None = None) -> Response:
+    """Build a JSON response, optionally annotated with the cache status header.
+
+    Args:
+        payload: Serialized or raw JSON payload.
+        cache_status: Value for the cache status header (omitted if None).
+
+    Returns:
+        JSON response.
+    """
+    content = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return Response(
+        content=content,
+        status_code=200,
+        media_type="application/json",
+        headers={CACHE_STATUS_HEADER: cache_status} if cache_status else None,
+    )
+
+
+class CacheBackend(ABC):
+    """Storage backend for cached responses (values are opaque bytes)."""
+
+    @abstractmethod
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        """Return cached values for the keys that are present and not expired."""
+
+    @abstractmethod
+    def set_many(self, items: dict[str, bytes]) -> None:
+        """Store values, evicting least recently used entries beyond the budget."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop all cached entries."""
+
+    def close(self) -> None:
+        """Release backend resources."""
+        return None
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with TTL and a byte budget."""
+
+    def __init__(self, ttl_seconds: float, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        now = time.monotonic()
+        found: dict[str, bytes] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    self._pop(key)
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in items.items():
+                if len(value) > self.max_bytes:
+                    continue
+                self._pop(key)
+                self._entries[key] = (expires_at, value)
+                self._size += len(value)
+            while self._size > self.max_bytes and self._entries:
+                self._pop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """On-disk cache stored in a single SQLite file, shared across restarts."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed_at)")
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        if not keys:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM cache WHERE key IN ({placeholders}) AND expires_at > ?",  # noqa: S608
+                [*keys, now],
+            ).fetchall()
+            if rows:
+                self._conn.executemany("UPDATE cache SET accessed_at = ? WHERE key = ?", [(now, k) for k, _ in rows])
+        return {key: bytes(value) for key, value in rows}
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, value, len(value), now + self.ttl_seconds, now) for key, value in items.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)", rows)
+                self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                self._evict_over_budget()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _evict_over_budget(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+
+
+class ResponseCache:
+    """Async facade over a cache backend with hit/miss counters."""
+
+    def __init__(self, config: ResponseCacheConfig):
+        self.config = config
+        if config.backend == "sqlite":
+            self.backend: CacheBackend = SQLiteCacheBackend(
+                config.sqlite_path, config.ttl_seconds, config.max_disk_bytes
+            )
+        else:
+            self.backend = MemoryCacheBackend(config.ttl_seconds, config.max_memory_bytes)
+        # Disk lookups run in a worker thread to keep the event loop free
+        self._offload = config.backend == "sqlite"
+        self.hits = 0
+        self.misses = 0
+
+    def should_cache_chat(self, body: dict[str, Any], headers: dict[str, str] | None) -> bool:
+        """Check whether a chat completion request may be served from/stored to the cache."""
+        if body.get("stream") or is_bypassed(headers):
+            return False
+        return self.config.cache_nondeterministic or is_deterministic(body)
+
+    def should_cache_embeddings(self, headers: dict[str, str] | None) -> bool:
+        """Check whether an embeddings request may use the cache."""
+        return not is_bypassed(headers)
+
+    async def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        """Look up cached values for keys."""
+        if self._offload:
+            found = await asyncio.to_thread(self.backend.get_many, keys)
+        else:
+            found = self.backend.get_many(keys)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def set_many(self, items: dict[str, bytes]) -> None:
+        """Store values for keys."""
+        if self._offload:
+            await asyncio.to_thread(self.backend.set_many, items)
+        else:
+            self.backend.set_many(items)
+
+    def close(self) -> None:
+        """Close the underlying backend."""
+        self.backend.close()
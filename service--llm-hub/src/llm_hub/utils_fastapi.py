@@ -2,6 +2,9 @@
 
 from fastapi import Request
 
+from llm_hub.admission import PRIORITY_HEADER
+from llm_hub.response_cache import CACHE_BYPASS_HEADER
+
 
 def extract_forwardable_headers(request: Request) -> dict[str, str]:
     """Extract headers from request that should be forwarded to upstream.
@@ -12,5 +15,12 @@ def extract_forwardable_headers(request: Request) -> dict[str, str]:
     Returns:
         Dictionary of headers to forward.
     """
-    forwardable_keys = {"x-request-id", "x-customer-id", "user-agent"}
+    forwardable_keys = {
+        "x-request-id",
+        "x-customer-id",
+        "user-agent",
+        "cache-control",
+        CACHE_BYPASS_HEADER,
+        PRIORITY_HEADER,
+    }
     return {key: value for key, value in request.headers.items() if key.lower() in forwardable_keys}
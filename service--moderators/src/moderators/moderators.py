@@ -1,20 +1,38 @@
 from loguru import logger
 from mmar_mapi.services import BinaryClassifiersAPI
-from mmar_flame import Moderator
+from mmar_flame import Moderator, ModeratorGroup
 
 
 class Moderators(BinaryClassifiersAPI):
     def __init__(self, moderators: dict[str, Moderator]) -> None:
         self.moderators = moderators
+        self.group = ModeratorGroup(moderators)
 
     def get_classifiers(self) -> list[str]:
         return list(self.moderators.keys())
 
+    def _check_classifiers(self, classifiers: list[str]) -> None:
+        for classifier in classifiers:
+            if classifier not in self.moderators:
+                raise ValueError(f"Classifier '{classifier}' not found")
+
     def evaluate(self, *, classifier: str | None = None, text: str) -> bool:
         classifier = classifier or "black"
-
-        if classifier not in self.moderators:
-            raise ValueError(f"Classifier '{classifier}' not found")
+        self._check_classifiers([classifier])
 
         logger.trace(f"Moderator called, label: {classifier}")
-        return self.moderators[classifier].evaluate(text=text)
+        return self.group.evaluate(label=classifier, text=text)
+
+    def evaluate_many(self, *, classifiers: list[str] | None = None, text: str) -> dict[str, bool]:
+        """All requested labels (all if None) in one normalization and matching pass."""
+        classifiers = self.get_classifiers() if classifiers is None else classifiers
+        self._check_classifiers(classifiers)
+
+        logger.trace(f"Moderators called, labels: {classifiers}")
+        return self.group.evaluate_many(labels=classifiers, text=text)
+
+    def evaluate_batch(self, *, classifiers: list[str], texts: list[str]) -> dict[str, list[bool]]:
+        self._check_classifiers(classifiers)
+
+        logger.trace(f"Moderators called, labels: {classifiers}, texts: {len(texts)}")
+        return self.group.evaluate_batch(labels=classifiers, texts=texts)
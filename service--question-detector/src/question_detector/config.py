@@ -34,9 +34,27 @@ class AddressesConfig(BaseModel):
 class LLMConfig(BaseModel):
     max_retries: int = 3
     question_detector_model: str = ""
+    # texts per embeddings request in `evaluate_batch`
+    embedding_batch_size: int = 64
+    # concurrent embeddings / LLM check requests
+    max_concurrency: int = 8
+
+
+class FeatureCacheConfig(BaseModel):
+    # embedding and LLM check vectors by text; 0 disables the memory cache
+    max_bytes: int = 256 * 1024**2  # 256 MB
+    disk_dir: str | None = None
+
+
+class FastModeConfig(BaseModel):
+    # skip the LLM check if the classifier is this confident with either of its answers
+    enabled: bool = False
+    confidence: float = 0.95
 
 
 class Config(SettingsModel):
     addresses: AddressesConfig = AddressesConfig()
     models: ModelsConfig = Field(default_factory=ModelsConfig)
     llm: LLMConfig = Field(default_factory=LLMConfig)
+    feature_cache: FeatureCacheConfig = Field(default_factory=FeatureCacheConfig)
+    fast_mode: FastModeConfig = Field(default_factory=FastModeConfig)
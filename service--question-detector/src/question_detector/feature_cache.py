@@ -0,0 +1,89 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+from loguru import logger
+
+
+def make_key(*parts: str) -> str:
+    """Content address of a feature: model, prompt and text all change the vector."""
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+class FeatureCache:
+    """
+    Feature vectors by content address: LRU in memory bounded by `max_bytes` (0 disables),
+    optionally persisted as `.npy` files in `disk_dir` (written with atomic renames).
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: str | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+        vector = self._load(key)
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._set_memory(key, vector)
+        return vector
+
+    def set(self, key: str, vector: np.ndarray) -> None:
+        self._set_memory(key, vector)
+        self._dump(key, vector)
+
+    def _set_memory(self, key: str, vector: np.ndarray) -> None:
+        if vector.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.nbytes
+            self._entries[key] = vector
+            self.size += vector.nbytes
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.nbytes
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.npy"
+
+    def _load(self, key: str) -> np.ndarray | None:
+        if self.disk_dir is None:
+            return None
+        try:
+            return np.load(self._path(key))
+        except FileNotFoundError:
+            return None
+        except Exception as ex:
+            logger.warning(f"Failed to load cached feature {key}: {ex}")
+            return None
+
+    def _dump(self, key: str, vector: np.ndarray) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f".{uuid4().hex}.tmp")
+        with tmp_path.open("wb") as f:
+            np.save(f, vector)
+        os.replace(tmp_path, path)
@@ -1,4 +1,5 @@
 import numpy as np
+from mmar_mapi import chunked
 from openai import OpenAI
 from question_detector.config import Config
 
@@ -13,17 +14,24 @@ class GigaEmbedding:
         return self.get_embedding(text)
 
     def get_embedding(self, text: str) -> np.ndarray:
-        response = self.client.embeddings.create(model=self.model, input=text)
-        vector = np.array(response.data[0].embedding)
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts: list[str]) -> np.ndarray:
+        """Normalized embeddings of `texts` as rows, requested in batches of `llm.embedding_batch_size`."""
+        vectors = []
+        for texts_chunk in chunked(texts, self.config.llm.embedding_batch_size):
+            response = self.client.embeddings.create(model=self.model, input=texts_chunk)
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        matrix = np.array(vectors)
 
         # Validate embedding dimension
         expected_dim = self.config.models.expected_embedding_dim
-        if vector.shape[0] != expected_dim:
+        if matrix.shape[1] != expected_dim:
             raise ValueError(
                 f"Embedding dimension mismatch: expected {expected_dim} dimensions "
-                f"but got {vector.shape[0]}. "
+                f"but got {matrix.shape[1]}. "
                 f"Make sure the embedding model is configured correctly. "
                 f"Check the 'question_detector_model' in your config."
             )
 
-        return vector / np.linalg.norm(vector)
+        return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
@@ -1,12 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from mmar_mapi.services import BinaryClassifiersAPI
 from loguru import logger
 from sklearn.ensemble import HistGradientBoostingClassifier
 
 from question_detector.config import Config
+from question_detector.feature_cache import FeatureCache, make_key
 from question_detector.models import FirstWordCheck, GigaBasicCheck, GigaEmbedding, QuestionMarkCheck
 
 QUESTION_DETECTOR = "question-detector"
+# GigaBasicCheck answers
+BASIC_NO = np.array([0])
+BASIC_YES = np.array([1])
 
 
 class QuestionDetector(BinaryClassifiersAPI):
@@ -25,32 +31,62 @@ class QuestionDetector(BinaryClassifiersAPI):
         self.first_word = first_word
         self.classifier: HistGradientBoostingClassifier = classifier
         self.config = config
+        self.feature_cache = FeatureCache(config.feature_cache.max_bytes, config.feature_cache.disk_dir)
+        # embeddings and LLM check requests of all calls share this limit
+        self.executor = ThreadPoolExecutor(max_workers=config.llm.max_concurrency, thread_name_prefix="qd-features")
 
     def get_classifiers(self) -> list[str]:
         return [QUESTION_DETECTOR]
 
-    def evaluate(self, *, classifier: str | None = None, text: str) -> bool:
+    def _check_classifier(self, classifier: str | None) -> None:
         if classifier is not None and classifier != QUESTION_DETECTOR:
             raise ValueError(f"Only classifier={QUESTION_DETECTOR} supported, found: {classifier}")
+
+    def evaluate(self, *, classifier: str | None = None, text: str) -> bool:
+        self._check_classifier(classifier)
         vector: np.ndarray = self._get_vector(text)
         prediction = bool(int(self._predict(vector)[0]))
         logger.debug(f"Evaluating text: {text} -> {prediction}")
         return prediction
 
+    def evaluate_batch(self, *, classifiers: list[str], texts: list[str]) -> dict[str, list[bool]]:
+        for classifier in classifiers:
+            self._check_classifier(classifier)
+        if not texts:
+            return {classifier: [] for classifier in classifiers}
+        # one embeddings request per batch and one `predict` over the stacked features
+        predictions = [bool(int(prediction)) for prediction in self._predict(self._get_matrix(texts))]
+        logger.debug(f"Evaluating {len(texts)} texts -> {sum(predictions)} questions")
+        return {classifier: list(predictions) for classifier in classifiers}
+
     def _predict(self, vector: np.ndarray):
         return self.classifier.predict(vector)
 
     def _get_vector(self, text: str) -> np.ndarray:
-        embedding_v = self.giga_embedding(text)
-        question_mark_v = self.question_mark(text)
-        giga_basic_v = self.giga_basic(text)
-        first_word_v = self.first_word(text)
-        vector = np.concat([embedding_v, question_mark_v, giga_basic_v, first_word_v], axis=0).reshape(1, -1)
+        return self._get_matrix([text])
+
+    def _get_matrix(self, texts: list[str]) -> np.ndarray:
+        """Feature rows of `texts`: embedding, question mark, LLM check, first word."""
+        question_mark = [self.question_mark(text) for text in texts]
+        first_word = [self.first_word(text) for text in texts]
+        if self.config.fast_mode.enabled:
+            embeddings = self._get_embeddings(texts)
+            giga_basic = self._get_basic_checks_unless_confident(texts, embeddings, question_mark, first_word)
+        else:
+            # both remote features are fetched concurrently
+            embeddings_future = self.executor.submit(self._get_embeddings, texts)
+            giga_basic = self._get_basic_checks(texts)
+            embeddings = embeddings_future.result()
+        return self._stack(list(zip(embeddings, question_mark, giga_basic, first_word)))
+
+    def _stack(self, features: list[tuple[np.ndarray, ...]]) -> np.ndarray:
+        matrix = np.stack([np.concat(row, axis=0) for row in features])
 
         # Validate vector dimension matches classifier expectations
         expected_features = self.classifier.n_features_in_
-        actual_features = vector.shape[1]
+        actual_features = matrix.shape[1]
         if actual_features != expected_features:
+            embedding_v, question_mark_v, giga_basic_v, first_word_v = features[0]
             raise ValueError(
                 f"Feature dimension mismatch: classifier expects {expected_features} features "
                 f"but got {actual_features}. "
@@ -60,4 +96,48 @@ class QuestionDetector(BinaryClassifiersAPI):
                 f"FirstWord dim: {first_word_v.shape[0]}. "
                 f"Check the embedding model configuration."
             )
-        return vector
+        return matrix
+
+    def _get_cached(self, keys: list[str], texts: list[str], compute) -> list[np.ndarray]:
+        """Cached vectors of `texts`; the missing (distinct) texts are computed with `compute(texts) -> vectors`."""
+        vectors = {key: self.feature_cache.get(key) for key in dict.fromkeys(keys)}
+        missing = {key: text for key, text in zip(keys, texts) if vectors[key] is None}
+        if missing:
+            for key, vector in zip(missing, compute(list(missing.values()))):
+                self.feature_cache.set(key, vector)
+                vectors[key] = vector
+        return [vectors[key] for key in keys]
+
+    def _get_embeddings(self, texts: list[str]) -> list[np.ndarray]:
+        keys = [make_key("embedding", self.giga_embedding.model, text) for text in texts]
+        return self._get_cached(keys, texts, lambda texts: list(self.giga_embedding.get_embeddings(texts)))
+
+    def _get_basic_checks(self, texts: list[str]) -> list[np.ndarray]:
+        prompt = self.config.models.basic_check_prompt
+        keys = [make_key("basic_check", self.giga_basic.model, prompt, text) for text in texts]
+        return self._get_cached(keys, texts, lambda texts: list(self.executor.map(self.giga_basic, texts)))
+
+    def _get_basic_checks_unless_confident(
+        self,
+        texts: list[str],
+        embeddings: list[np.ndarray],
+        question_mark: list[np.ndarray],
+        first_word: list[np.ndarray],
+    ) -> list[np.ndarray]:
+        """
+        LLM checks only for texts whose prediction depends on them: if the classifier is confident
+        in the same class with both answers of the check, the check is skipped.
+        """
+        cheap_features = list(zip(embeddings, question_mark, first_word))
+        proba_no, proba_yes = (
+            self.classifier.predict_proba(self._stack([(e, q, answer, f) for e, q, f in cheap_features]))
+            for answer in (BASIC_NO, BASIC_YES)
+        )
+        same_class = proba_no.argmax(axis=1) == proba_yes.argmax(axis=1)
+        confidence = np.minimum(proba_no.max(axis=1), proba_yes.max(axis=1))
+        confident = same_class & (confidence >= self.config.fast_mode.confidence)
+        undecided = [ii for ii, is_confident in enumerate(confident) if not is_confident]
+        checks = dict(zip(undecided, self._get_basic_checks([texts[ii] for ii in undecided])))
+        logger.debug(f"Fast mode: LLM check skipped for {len(texts) - len(undecided)}/{len(texts)} texts")
+        # the answer doesn't change the prediction of confident texts
+        return [checks.get(ii, BASIC_NO) for ii in range(len(texts))]
@@ -1,13 +1,33 @@
 import os
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class PdfConfig(BaseModel):
+    # documents with fewer pages are extracted sequentially, without the process pool
+    parallel_min_pages: int = 64
+    # 1 disables the process pool
+    workers: int = Field(default_factory=lambda: min(8, os.cpu_count() or 1))
+    shard_pages: int = 16
+
+
+class OcrConfig(BaseModel):
+    lang: str = "rus+eng"
+    # images are rescaled to this resolution (tesseract works best around 300 DPI)
+    target_dpi: int = 300
+    max_upscale: float = 2.0
+    # taller images are split into strips OCR-ed in parallel
+    tile_height: int = 1600
+    workers: int = Field(default_factory=lambda: min(4, os.cpu_count() or 1))
+
+
 class Config(BaseSettings):
     model_config = SettingsConfigDict(env_nested_delimiter="__", extra="ignore")
 
     files_dir: str = "/mnt/data/maestro/files"
+    pdf: PdfConfig = PdfConfig()
+    ocr: OcrConfig = OcrConfig()
 
 
 def load_config(env_file=None):
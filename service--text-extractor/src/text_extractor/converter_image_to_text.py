@@ -1,17 +1,151 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from io import BytesIO
 
 import pytesseract
 from loguru import logger
-from PIL import Image
+from PIL import Image, ImageOps
 
 from mmar_utils import postprocess_text
+from text_extractor.config import Config, OcrConfig
+
+try:
+    import tesserocr
+except ImportError:  # pytesseract (a tesseract subprocess per call) is used instead
+    tesserocr = None
+
+# A4 in square inches: images without a usable DPI (photos) are scaled as if they were a page at the target DPI
+A4_SQUARE_INCHES = 8.27 * 11.69
+# a DPI giving a larger page (A2) is not trusted: cameras write a nominal one, often 72
+MAX_PAGE_SQUARE_INCHES = 4 * A4_SQUARE_INCHES
+
+# warm tesseract of a worker process
+_api = None
+_lang: str = ""
+
+
+def _init_worker(lang: str) -> None:
+    global _api, _lang
+    _lang = lang
+    if tesserocr is not None:
+        _api = tesserocr.PyTessBaseAPI(lang=lang)
+
+
+def ocr_tile(tile: Image.Image) -> str:
+    """Runs in a worker process."""
+    if _api is None:
+        return pytesseract.image_to_string(image=tile, lang=_lang)
+    _api.SetImage(tile)
+    return _api.GetUTF8Text()
+
+
+def normalize_dpi(image: Image.Image, dpi: float, target_dpi: int, max_upscale: float) -> Image.Image:
+    pixels = image.width * image.height
+    if dpi and pixels / dpi**2 <= MAX_PAGE_SQUARE_INCHES:
+        scale = min(target_dpi / dpi, max_upscale)
+    else:
+        # only downscaling: small images without DPI are usually screenshots with large text
+        scale = min(1.0, (A4_SQUARE_INCHES * target_dpi**2 / pixels) ** 0.5)
+    if abs(scale - 1) < 0.05:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.Resampling.LANCZOS)
+
+
+def preprocess(image: Image.Image, cfg: OcrConfig) -> Image.Image:
+    dpi = float(image.info.get("dpi", (0, 0))[0] or 0)
+    # phone photos are often stored rotated with an EXIF orientation tag
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("L")
+    return normalize_dpi(image, dpi, cfg.target_dpi, cfg.max_upscale)
+
+
+def split_tiles(image: Image.Image, tile_height: int) -> list[Image.Image]:
+    """
+    Horizontal strips of about `tile_height`, cut at the lightest row near each boundary,
+    so that cuts go between text lines rather than through them.
+    """
+    if image.height <= tile_height * 1.5:
+        return [image]
+    # mean brightness of every row
+    rows = list(image.resize((1, image.height), Image.Resampling.BOX).getdata())
+    window = tile_height // 4
+    cuts = [0]
+    while image.height - cuts[-1] > tile_height * 1.5:
+        target = cuts[-1] + tile_height
+        # among equally light rows the one closest to the target
+        cut = max(range(target - window, target + window), key=lambda row: (rows[row], -abs(row - target)))
+        cuts.append(cut)
+    cuts.append(image.height)
+    return [image.crop((0, top, image.width, bottom)) for top, bottom in zip(cuts, cuts[1:])]
 
 
 class ImageToTextConverter:
+    """
+    OCR pipeline: decode -> preprocess (EXIF rotation, grayscale, DPI normalization) -> split into tiles
+    -> OCR of tiles on a process pool with warm tesseract instances -> postprocess.
+    Time of every stage is logged and accumulated in `metrics()`.
+    """
+
+    def __init__(self, config: Config):
+        self.ocr_cfg: OcrConfig = config.ocr
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.timings: dict[str, float] = {}
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                engine = "tesserocr" if tesserocr is not None else "pytesseract"
+                logger.info(f"Starting {self.ocr_cfg.workers} OCR workers ({engine})")
+                # spawn: forking a process with running gRPC threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.ocr_cfg.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.ocr_cfg.lang,),
+                )
+            return self._executor
+
+    def _record(self, timings: dict[str, float]) -> None:
+        with self._lock:
+            self.calls += 1
+            for stage, elapsed in timings.items():
+                self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+    def metrics(self) -> dict[str, float]:
+        """Mean seconds per stage."""
+        with self._lock:
+            return {stage: total / self.calls for stage, total in self.timings.items()}
+
     def __call__(self, img_bytes: bytes) -> str:
+        timings: dict[str, float] = {}
+        start = time.perf_counter()
+
+        def lap(stage: str) -> None:
+            nonlocal start
+            now = time.perf_counter()
+            timings[stage] = now - start
+            start = now
+
         image = Image.open(BytesIO(img_bytes))
-        logger.info(f"Start tesseract, image size = {image.size}")
-        txt: str = pytesseract.image_to_string(image=image, lang="rus+eng")
-        txt = postprocess_text(txt)
-        logger.info(f"Len text from image: {len(txt)}")
+        image.load()
+        size = image.size
+        lap("decode")
+        image = preprocess(image, self.ocr_cfg)
+        lap("preprocess")
+        tiles = split_tiles(image, self.ocr_cfg.tile_height)
+        lap("split")
+        logger.info(f"Start tesseract, image size = {size} -> {image.size}, tiles: {len(tiles)}")
+        texts = list(self._get_executor().map(ocr_tile, tiles))
+        lap("ocr")
+        txt: str = postprocess_text("\n".join(texts))
+        lap("postprocess")
+
+        self._record(timings)
+        timings_str = ", ".join(f"{stage}: {elapsed:.3f}s" for stage, elapsed in timings.items())
+        logger.info(f"Len text from image: {len(txt)}, {timings_str}")
         return txt
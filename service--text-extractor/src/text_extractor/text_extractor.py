@@ -20,13 +20,24 @@ class TextExtractor(TextExtractorAPI):
     def extract(self, *, resource_id: ResourceId) -> ResourceId:
         logger.info(f"Received request with resource_id={resource_id}")
 
-        doc_bytes = self.file_storage.download(resource_id)
         doc_type = resource_id.split(".")[-1].lower()
+        if doc_type == "pdf":
+            return self._extract_pdf(resource_id)
 
+        doc_bytes = self.file_storage.download(resource_id)
         text = self._get_text(doc_bytes, doc_type)
         ext_resource_id = self.file_storage.upload(content=text, fname="text.txt")
         return ext_resource_id
 
+    def _extract_pdf(self, resource_id: ResourceId) -> ResourceId:
+        pdf_path = self.file_storage.get_path(resource_id)
+        if pdf_path is None:
+            raise FileNotFoundError(f"Not found resource: {resource_id}")
+        # the text goes to the storage as it is extracted, not accumulated in memory
+        with self.file_storage.open_upload("text.txt") as upload:
+            self.pdf_to_text.extract_to(pdf_path, lambda text: upload.write(text.encode()))
+            return upload.commit()
+
     def _get_text(self, doc_bytes: bytes, doc_type: str) -> str:
         match doc_type:
             case "pdf":
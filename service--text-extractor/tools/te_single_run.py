@@ -31,11 +31,8 @@ def process_document(
     doc = Path(doc_path)
     image_bytes = doc.read_bytes()
     dtype = doc.suffix[1:]
-    fpath = file_storage._generate_fname_path(image_bytes, dtype)
-    if Path(fpath).exists():
-        resource_id = str(fpath)
-    else:
-        resource_id = file_storage.upload(image_bytes, dtype)
+    # already stored content is not written again
+    resource_id = file_storage.upload(image_bytes, dtype)
 
     local_files_dir_prefix = os.getenv("LOCAL_FILES_DIR_PREFIX", "/mnt/data")
     resource_id = resource_id.replace(local_files_dir_prefix, "/mnt/data")